@@ -0,0 +1,159 @@
+"""
+Benchmark of the RAO codecs on payloads shaped like the values cached in Redis.
+
+Compares the legacy JSON strings (`json.dumps` with `DecimalEncoder`) with the codecs in `src.v1.shared.codec`, and
+reports the stored size and the mean encode and decode times of each.
+
+Usage:
+    python -m benchmarks.rao_codec [--iterations 200]
+"""
+import argparse, json, random, time
+from decimal import Decimal
+
+from src.v1.shared.codec import DecimalEncoder, RAOCodec
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choice("0123456789abcdef") for _ in range(40))
+
+
+def holders_payload(num_holders: int = 1000) -> dict:
+    # Shape of the `holders` rows, token quantities include 18 decimals and exceed 64 bits
+    total_supply = 10**27
+    output = {}
+    for _ in range(num_holders):
+        num_tokens = random.randint(10**18, 10**25)
+        output[random_address()] = {
+            "numTokens": num_tokens,
+            "percentTokens": Decimal(str(num_tokens / total_supply)),
+        }
+    return {"timestamp": int(time.time()), "holders": output}
+
+
+def chart_payload(num_datapoints: int = 300) -> dict:
+    # Shape of `ChartResponse.dict()` as cached by `get_chart_data`
+    now = int(time.time())
+    data = [
+        {
+            "timestamp": now - 900 * i,
+            "price": random.uniform(0.0001, 2.0),
+            "volume": random.uniform(0, 1e6),
+            "marketCap": random.uniform(1e5, 1e9),
+        }
+        for i in range(num_datapoints)
+    ]
+    return {
+        "priceMin": 0.0001,
+        "priceMax": 2.0,
+        "marketCapMin": 1e5,
+        "marketCapMax": 1e9,
+        "timestampMin": now - 900 * num_datapoints,
+        "timestampMax": now,
+        "numDatapoints": num_datapoints,
+        "latestPrice": 1.0,
+        "latestMarketCap": 1e8,
+        "latestReturn": 0.01,
+        "totalVolume": 1e8,
+        "dayVolume": 1e7,
+        "elapsedNumDays": 3.125,
+        "avgCandleDurationMins": 15.0,
+        "data": data,
+    }
+
+
+def feed_payload(num_events: int = 50) -> list:
+    # Shape of the `chainfeeds` token event lists
+    return [
+        {
+            "eventHash": "%064x" % random.getrandbits(256),
+            "blockchain": random.choice(["ethereum", "base"]),
+            "address": random_address(),
+            "eventType": random.choice(["TokenCreated", "LiquidityAdded", "Swap"]),
+            "name": "Token %d" % i,
+            "symbol": "TKN%d" % i,
+            "timestamp": int(time.time()) - i * 60,
+            "value": str(random.uniform(0, 1e6)),
+        }
+        for i in range(num_events)
+    ]
+
+
+def market_data_payload() -> dict:
+    # Shape of the `marketmetrics` entries
+    return {
+        "chain": {"chainId": 1, "name": "Ethereum", "symbol": "ETH"},
+        "tokenAddress": random_address(),
+        "dex": "uniswapv2",
+        "liquidityUsd": Decimal("123456.789"),
+        "volume24hUsd": Decimal("98765.4321"),
+        "priceUsd": Decimal("0.000123"),
+        "marketCap": Decimal("1234567.89"),
+    }
+
+
+class LegacyJSON:
+    """The encoding used by `RAO` before the codecs were introduced."""
+
+    def encode(self, data) -> bytes:
+        return json.dumps(data, cls=DecimalEncoder).encode("utf-8")
+
+    def decode(self, raw) -> object:
+        return json.loads(raw, parse_float=float, parse_int=int)
+
+
+def measure(codec, payload, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        encoded = codec.encode(payload)
+    encode_time = (time.perf_counter() - start) / iterations
+
+    start = time.perf_counter()
+    for _ in range(iterations):
+        codec.decode(encoded)
+    decode_time = (time.perf_counter() - start) / iterations
+
+    return len(encoded), encode_time, decode_time
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    payloads = {
+        "holders (1000)": holders_payload(),
+        "chart (300 candles)": chart_payload(),
+        "feed (50 events)": feed_payload(),
+        "market data": market_data_payload(),
+    }
+    # Codecs fall back when msgpack or zstandard are not installed, so duplicates are only measured once
+    codecs = {"legacy json": LegacyJSON()}
+    for fmt, compression in [
+        ("json", None),
+        ("orjson", None),
+        ("orjson", "zlib"),
+        ("orjson", "zstd"),
+        ("msgpack", "zstd"),
+    ]:
+        codec = RAOCodec(fmt, compression)
+        codecs.setdefault(codec.name, codec)
+
+    print(
+        f"{'payload':<22}{'codec':<16}{'bytes':>10}{'ratio':>8}{'encode ms':>12}{'decode ms':>12}"
+    )
+    for payload_name, payload in payloads.items():
+        baseline = None
+        for codec_name, codec in codecs.items():
+            size, encode_time, decode_time = measure(codec, payload, args.iterations)
+            baseline = baseline or size
+            print(
+                f"{payload_name:<22}{codec_name:<16}{size:>10}{size / baseline:>8.2f}"
+                f"{encode_time * 1000:>12.3f}{decode_time * 1000:>12.3f}"
+            )
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,179 @@
+"""
+Benchmark of the Timestream result decoding used by the token event feeds.
+
+Compares the previous path (a dict per row from `process_row`, then a pandas DataFrame, `pivot` and `to_dict`) with
+the columnar decoder in `src.v1.shared.timestream`, on paginated results shaped like the `tokenevents` table, and
+checks that both return the same records.
+
+Usage:
+    python -m benchmarks.timestream_decoder [--iterations 20]
+"""
+import argparse, random, time
+
+import pandas as pd
+
+from src.v1.shared.timestream import (
+    MEASURE_COLUMNS,
+    query_columns,
+    pivot_measures,
+)
+
+COLUMN_INFO = [
+    {"Name": "eventHash", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "address", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "blockchain", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "timestamp", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "measure_name", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "time", "Type": {"ScalarType": "TIMESTAMP"}},
+    {"Name": "measure_value::double", "Type": {"ScalarType": "DOUBLE"}},
+    {"Name": "measure_value::varchar", "Type": {"ScalarType": "VARCHAR"}},
+]
+
+VARCHAR_MEASURES = ["address", "blockchain", "eventType", "name", "symbol"]
+DOUBLE_MEASURES = ["timestamp", "value", "amount"]
+
+
+def random_address() -> str:
+    return "0x" + "".join(random.choice("0123456789abcdef") for _ in range(40))
+
+
+def tokenevents_pages(num_events: int, page_size: int = 1000) -> list:
+    # One row per measure of each event, split into pages linked by `NextToken`
+    now = int(time.time())
+    rows = []
+    for i in range(num_events):
+        event_hash = "0x%012x" % random.getrandbits(48)
+        address = random_address()
+        blockchain = random.choice(["ethereum", "base"])
+        timestamp = str(float(now - i * 60))
+        dimensions = [
+            {"ScalarValue": event_hash},
+            {"ScalarValue": address},
+            {"ScalarValue": blockchain},
+            {"ScalarValue": timestamp},
+        ]
+        measures = {
+            "address": address,
+            "blockchain": blockchain,
+            "eventType": random.choice(["TokenCreated", "LiquidityAdded", "Swap"]),
+            "name": "Token %d" % i,
+            "symbol": "TKN%d" % i,
+            "timestamp": timestamp,
+            "value": str(random.uniform(0, 1e6)),
+            "amount": str(random.uniform(0, 1e18)),
+        }
+        for measure_name, value in measures.items():
+            is_double = measure_name in DOUBLE_MEASURES
+            rows.append(
+                {
+                    "Data": dimensions
+                    + [
+                        {"ScalarValue": measure_name},
+                        {"ScalarValue": "2024-01-01 00:00:00.000000000"},
+                        {"ScalarValue": value} if is_double else {"NullValue": True},
+                        {"NullValue": True} if is_double else {"ScalarValue": value},
+                    ]
+                }
+            )
+
+    pages = [
+        {"ColumnInfo": COLUMN_INFO, "Rows": rows[i : i + page_size]}
+        for i in range(0, len(rows), page_size)
+    ]
+    for i, page in enumerate(pages[:-1]):
+        page["NextToken"] = str(i + 1)
+    return pages
+
+
+class FakeQueryClient:
+    """Serves pre-built pages in place of the `timestream-query` client."""
+
+    def __init__(self, pages: list) -> None:
+        self.pages = pages
+
+    def query(self, QueryString: str, NextToken: str = None) -> dict:
+        return self.pages[int(NextToken) if NextToken else 0]
+
+
+def process_row(row):
+    if row["Data"][6].get("ScalarValue") is None:
+        value = row["Data"][7]["ScalarValue"]
+    else:
+        value = row["Data"][6]["ScalarValue"]
+
+    return {
+        "eventHash": row["Data"][0]["ScalarValue"],
+        "address": row["Data"][1]["ScalarValue"],
+        "blockchain": row["Data"][2]["ScalarValue"],
+        "timestamp": row["Data"][3]["ScalarValue"],
+        "measureName": row["Data"][4]["ScalarValue"],
+        "time": row["Data"][5]["ScalarValue"],
+        "value": value,
+    }
+
+
+def pandas_decode(client) -> list:
+    """The decoding used by `get_token_events` before the columnar decoder, over every page of the result."""
+    rows = []
+    next_token = None
+    while True:
+        response = client.query(QueryString="", NextToken=next_token)
+        rows.extend(response["Rows"])
+        next_token = response.get("NextToken")
+        if not next_token:
+            break
+
+    processed_rows = [process_row(row) for row in rows]
+
+    df = pd.DataFrame(processed_rows).drop(
+        ["time", "address", "blockchain", "timestamp"], axis=1
+    )
+    pdf = df.pivot(index="eventHash", columns="measureName", values="value")
+    pdf["timestamp"] = pdf["timestamp"].apply(lambda x: int(float(x)))
+
+    return pdf.to_dict("records")
+
+
+def columnar_decode(client) -> list:
+    columns = query_columns(
+        client, "", columns=["eventHash", *MEASURE_COLUMNS], typed=False
+    )
+    return pivot_measures(
+        columns, index="eventHash", converters={"timestamp": lambda x: int(float(x))}
+    )
+
+
+def measure(decode, client, iterations: int) -> float:
+    start = time.perf_counter()
+    for _ in range(iterations):
+        decode(client)
+    return (time.perf_counter() - start) / iterations
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=20)
+    args = parser.parse_args()
+
+    random.seed(0)
+
+    print(
+        f"{'events':>8}{'rows':>10}{'pandas ms':>12}{'columnar ms':>14}{'speedup':>10}"
+    )
+    for num_events in [50, 500, 5000]:
+        pages = tokenevents_pages(num_events)
+        client = FakeQueryClient(pages)
+
+        assert pandas_decode(client) == columnar_decode(client)
+
+        pandas_time = measure(pandas_decode, client, args.iterations)
+        columnar_time = measure(columnar_decode, client, args.iterations)
+        num_rows = sum(len(page["Rows"]) for page in pages)
+        print(
+            f"{num_events:>8}{num_rows:>10}{pandas_time * 1000:>12.3f}"
+            f"{columnar_time * 1000:>14.3f}{pandas_time / columnar_time:>10.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,16 @@ import time, logging
 
 from src.utils.gcs import GCSAdapter
 from src.v1.feeds.constants import *
+from src.v1.feeds.dependencies import PRICE_ORACLE, TIMESTREAM_WRITER
+from src.v1.feeds.indexer import PoolIndexer
+from src.v1.feeds.endpoints import TOKEN_EVENT_FEED
 from router import v1_router
 
 from src.v1.shared.dependencies import load_access_token
+from src.v1.shared.http_client import HTTP_CLIENTS
+from src.v1.shared.DAO import LOCAL_CACHE, LOCAL_CACHE_INVALIDATION_LISTENER
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.redis_client import REDIS_CIRCUIT_BREAKER, ASYNC_REDIS_POOL
 
 from src.v1.shared.exceptions import (
                                     RugAPIException, DatabaseLoadFailureException,
@@ -182,6 +189,53 @@ async def root():
         content={"detail": "rug-api"}
     )
 
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    # Values are per worker process
+    return JSONResponse(
+        status_code=200,
+        content={
+            **METRICS.snapshot(),
+            "redisCircuit": REDIS_CIRCUIT_BREAKER.status(),
+            "localCache": LOCAL_CACHE.status(),
+            "priceOracle": PRICE_ORACLE.status(),
+            "timestreamWriter": TIMESTREAM_WRITER.status(),
+            "tokenEventFeed": TOKEN_EVENT_FEED.status(),
+            "upstreams": HTTP_CLIENTS.status()
+        }
+    )
+
+######################################################
+#                                                    #
+#                 Lifecycle Events                   #
+#                                                    #
+######################################################
+
+@app.on_event("startup")
+async def startup_event():
+    # Keep stable token prices warm for market data calculations
+    PRICE_ORACLE.start()
+
+    # Drop locally cached keys when they are written by other workers
+    LOCAL_CACHE_INVALIDATION_LISTENER.start()
+
+    # Buffer view and click events, writing them to Timestream in batches
+    TIMESTREAM_WRITER.start()
+
+    # Materialise the token event feeds from Timestream, in the worker holding the leader lock
+    TOKEN_EVENT_FEED.start()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    await PRICE_ORACLE.stop()
+    await LOCAL_CACHE_INVALIDATION_LISTENER.stop()
+    await TIMESTREAM_WRITER.stop()
+    await TOKEN_EVENT_FEED.stop()
+
+    # Close keep-alive connections to upstream providers
+    await HTTP_CLIENTS.close()
+    await ASYNC_REDIS_POOL.disconnect()
+
 app.include_router(v1_router)
 app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
 
@@ -189,35 +243,14 @@ app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_credentials=True,
 # bucket = S3Adapter()
 bucket = GCSAdapter()
 
+# Pool index is built by a single leader process and mapped by every worker
+pool_indexer = PoolIndexer(bucket=bucket, networks=["ethereum", "base"])
+
 # Cronjob updates the token JSON every 5 minutes
 def cron_update_data():
     logging.info("Running cronjob to update data")
     start_time = time.time()
-    networks = ["ethereum", "base"]
-    for network in networks:
-        pools = bucket.get(f"pools/{network}/pools.json")
-        pools_ = pools[::-1]
-
-        for pool in pools_:
-            token0 = pool["token0"].lower()
-            token1 = pool["token1"].lower()
-
-            if not POOL_INDEXER[network].get(token0):
-                POOL_INDEXER[network][token0] = [pool]
-            else:
-                POOL_INDEXER[network][token0].append(pool)
-
-            if not POOL_INDEXER[network].get(token1):
-                POOL_INDEXER[network][token1] = [pool]
-            else:
-                POOL_INDEXER[network][token1].append(pool)
-
-        for key in POOL_INDEXER[network].keys():
-            pools_list = POOL_INDEXER[network][key]
-            POOL_INDEXER[network][key] = list(
-                {v["address"]: v for v in pools_list}.values()
-            )
-
+    pool_indexer.refresh()
     logging.warning(f"Pool indexer job is finished in {time.time() - start_time}")
 
 # Load latest data on startup
@@ -226,4 +259,5 @@ cron_update_data()
 # Background scheduler to run cronjob to update data
 scheduler = BackgroundScheduler()
 scheduler.add_job(cron_update_data, "interval", minutes=5)
+scheduler.add_job(pool_indexer.load, "interval", seconds=POOL_INDEX_RELOAD_INTERVAL)
 scheduler.start()
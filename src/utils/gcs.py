@@ -49,6 +49,41 @@ class GCSAdapter:
             )
             raise e
 
+    def get_if_modified(self, key, generation=None):
+        """
+        Fetch and parse `key` only if its GCS object generation differs from `generation`.
+
+        Returns:
+            tuple: The parsed JSON data (or None if the object is unchanged) and the current object generation
+        """
+        start_time = time.time()
+        try:
+            blob = self.bucket.get_blob(key)
+
+            if blob is None:
+                logging.info(
+                    f"Could not find {key} in GCS bucket {self.bucket}, returning an empty list..."
+                )
+                return [], None
+
+            if generation is not None and blob.generation == generation:
+                logging.info(
+                    f"{key} in GCS bucket {self.bucket.name} is unchanged at generation {generation}."
+                )
+                return None, generation
+
+            # Pin the download to the generation that was checked, in case the object is overwritten in between
+            json_data = blob.download_as_text(if_generation_match=blob.generation)
+            logging.info(
+                f"Fetched {key} at generation {blob.generation} from GCS bucket {self.bucket.name} in {(time.time() - start_time):.2f} seconds."
+            )
+            return json.loads(json_data), blob.generation
+        except Exception as e:
+            logging.error(
+                f"Error fetching {key} from GCS bucket {self.bucket.name}: {e}"
+            )
+            raise e
+
     def put(self, data, key) -> None:
         start_time = time.time()
         updated_json_data = json.dumps(data, indent=2)
@@ -1,10 +1,12 @@
 from fastapi import HTTPException, APIRouter, Depends
-import requests, logging, json, dotenv, os
+import logging, json, dotenv, os
 
 from src.v1.shared.models import ChainEnum, validate_token_address
 from src.v1.shared.exceptions import UnsupportedChainException, GoPlusDataException
 from src.v1.shared.constants import CHAIN_ID_MAPPING
-from src.v1.shared.DAO import RAO
+from src.v1.shared.DAO import AsyncRAO
+from src.v1.shared.http_client import HTTP_CLIENTS
+from src.v1.tokens.dependencies import get_go_plus_data
 
 from src.v1.chart.constants import FREQUENCY_MAPPING, DURATION_MAPPING
 from src.v1.chart.dependencies import process_market_data
@@ -20,8 +22,8 @@ dotenv.load_dotenv()
 
 router = APIRouter()
 
-POOL_ADDRESS_RAO = RAO("pool_address", tte=60 * 60 * 24 * 1)
-CHART_RAO = RAO("chart", tte=60 * 10)
+POOL_ADDRESS_RAO = AsyncRAO("pool_address", tte=60 * 60 * 24 * 1)
+CHART_RAO = AsyncRAO("chart", tte=60 * 10, local_tte=60)
 
 
 async def get_pool_address(
@@ -32,7 +34,7 @@ async def get_pool_address(
     _key = f"{chain_id}_{token_address}"
 
     try:
-        data = POOL_ADDRESS_RAO.get(_key)
+        data = await POOL_ADDRESS_RAO.get(_key)
     except Exception as e:
         logging.error(f"An exception occurred whilst fetching data from RAO: {e}")
         data = None
@@ -46,25 +48,15 @@ async def get_pool_address(
 
     # Get the leading pool address from GoPlus API for a token and return it
     try:
-        url = f"https://api.gopluslabs.io/api/v1/token_security/{chain_id}?contract_addresses={token_address}"
-
-        request_response = requests.get(url)
-        request_response.raise_for_status()
+        data = await get_go_plus_data(chain, token_address)
     except Exception as e:
         logging.error(
             f"Exception: Whilst calling GoPlus Labs for the response for token {token_address} on chain {chain}: {e}"
         )
         raise GoPlusDataException(chain=chain, token_address=token_address)
 
-    data = request_response.json()
-
     try:
-        pair_address = data.get("result").get(token_address).get("dex")
-    except KeyError as e:
-        logging.error(
-            f"Exception: KeyError in `data` from the GoPlus response: {data}. Exception: {e}"
-        )
-        raise GoPlusDataException(chain=chain, token_address=token_address)
+        pair_address = data.get("dex")
     except Exception as e:
         logging.error(
             f"Exception: An uncaught Exception whilst attempting to extract the pair address from the GoPlus response: {e}"
@@ -75,7 +67,7 @@ async def get_pool_address(
         output = pair_address[0].get("pair")
 
         try:
-            POOL_ADDRESS_RAO.put(_key, output)
+            await POOL_ADDRESS_RAO.put(_key, output)
         except Exception as e:
             logging.error(
                 f"Exception: An exception occurred whilst attempting to store the pool address for token {token_address} on chain {chain} in RAO: {e}"
@@ -102,13 +94,16 @@ async def get_chart_data(
     _key = f"{chain.value}_{token_address}_{frequency.value}"
 
     try:
-        data = CHART_RAO.get(_key)
+        data = await CHART_RAO.get(_key)
     except Exception as e:
         logging.error(f"An exception occurred whilst fetching data from RAO: {e}")
         data = None
 
     if data:
-        return ChartResponse(**json.loads(data))
+        # Values cached before the RAO codec were stored as an encoded JSON string
+        if isinstance(data, str):
+            data = json.loads(data)
+        return ChartResponse(**data)
 
     # TODO: Eventually want to store pool address as part of the metadata, and do a call to fetch it from there
     pool_address = await get_pool_address(chain, token_address)
@@ -150,7 +145,7 @@ async def get_chart_data(
 
         params = {"aggregate": frequency_aggregate, "limit": frequency_limit}
 
-        response = requests.get(url, params=params)
+        response = await HTTP_CLIENTS.get("geckoterminal", url, params=params)
         response.raise_for_status()
     except Exception as e:
         logging.error(f"Exception: Whilst calling the CoinGecko API: {e}")
@@ -188,7 +183,7 @@ async def get_chart_data(
         output = process_market_data(market_data, DURATION_MAPPING.get(frequency.value))
 
         try:
-            CHART_RAO.put(_key, output.json())
+            await CHART_RAO.put(_key, output.dict())
         except Exception as e:
             logging.error()
 
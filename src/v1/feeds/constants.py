@@ -1,4 +1,4 @@
-import json
+import os, json
 
 MOST_VIEWED_TOKENS_STALENESS_THRESHOLD = 60 * 3  # 3 hours
 MOST_VIEWED_TOKENS_LIMIT = 10
@@ -6,6 +6,27 @@ MOST_VIEWED_TOKENS_NUM_MINUTES = 60 * 60 * 6  # 6 hours
 TOP_EVENTS_STALENESS_THRESHOLD = 60 * 60 * 3  # 3 hours
 TOP_EVENTS_LIMIT = 5
 TOP_EVENTS_NUM_MINUTES = 60 * 60 * 6  # 6 hours
+FEEDS_ENRICHMENT_CONCURRENCY = 8
+FEEDS_ENRICHMENT_TIMEOUT = 20  # 20 seconds
+PRICE_ORACLE_REFRESH_INTERVAL = 30  # 30 seconds
+PRICE_ORACLE_MAX_STALENESS = 60 * 2  # 2 minutes
+VIEW_COUNTER_WINDOW = 60 * 60 * 6  # 6 hours
+VIEW_COUNTER_BUCKET_SIZE = 60  # 1 minute
+TIMESTREAM_WRITE_BATCH_SIZE = 100  # Maximum number of records in a WriteRecords call
+TIMESTREAM_WRITE_FLUSH_INTERVAL = 0.5  # 500 milliseconds
+TIMESTREAM_WRITE_QUEUE_SIZE = 10000
+TIMESTREAM_WRITE_ENQUEUE_TIMEOUT = 2  # 2 seconds
+TIMESTREAM_WRITE_MAX_RETRIES = 5
+TIMESTREAM_WRITE_RETRY_BACKOFF = 0.2  # 200 milliseconds, doubled after every retry
+TIMESTREAM_WRITE_SHUTDOWN_TIMEOUT = 10  # 10 seconds
+TOKEN_FEED_LENGTH = 50
+TOKEN_FEED_POLL_INTERVAL = 10  # 10 seconds
+TOKEN_FEED_OVERLAP = 60  # 1 minute
+TOKEN_FEED_BOOTSTRAP_WINDOW = 60 * 60 * 24 * 30  # 30 days, only bounds the scan of the bootstrap query
+TOKEN_FEED_LEADER_TTL = 30  # 30 seconds
+TOKEN_FEED_TTE = 60 * 60  # 1 hour
+MOST_VIEWED_TOKENS_QUERY_TTL = 60  # 1 minute
+TOP_EVENTS_QUERY_TTL = 60  # 1 minute
 
 with open("src/v1/shared/files/erc20.json", "r") as f:
     ERC20_ABI = json.load(f)
@@ -40,3 +61,5 @@ SYMBOLS = {
 }
 
 POOL_INDEXER = {"ethereum": {}, "base": {}}
+POOL_INDEX_DIRECTORY = os.environ.get("POOL_INDEX_DIRECTORY", "/tmp/rug-api/pools")
+POOL_INDEX_RELOAD_INTERVAL = 15  # 15 seconds
@@ -0,0 +1,105 @@
+"""
+Sliding-window view counters kept in Redis, used to rank the most viewed tokens and events without scanning the
+Timestream logs.
+
+Every view increments its member in a sorted set for the current time bucket, which expires once it has left the
+window. The leaderboard is the union of the buckets in the window, which is materialised under its own key for one
+bucket duration, so that reading the top K members costs O(log N + K) for every request but the first.
+"""
+import logging, time
+from typing import List, Optional, Tuple
+
+from src.v1.shared.redis_client import (
+    REDIS_CIRCUIT_BREAKER,
+    get_async_redis_client,
+    acall,
+)
+
+
+class ViewCounter:
+    """
+    Args:
+        name (str): Name of the counter, used as a prefix for its Redis keys
+        window (int): Length of the sliding window in seconds
+        bucket_size (int): Duration of each bucket in seconds, which is also how long the leaderboard is cached for
+    """
+
+    def __init__(self, name: str, window: int, bucket_size: int) -> None:
+        self.name = name
+        self.window = window
+        self.bucket_size = bucket_size
+
+        self.client = get_async_redis_client()
+
+    def generate_bucket_key(self, bucket: int) -> str:
+        return f"viewcounter_{self.name}_{bucket}"
+
+    def generate_leaderboard_key(self, bucket: int) -> str:
+        return f"viewcounter_{self.name}_top_{bucket}"
+
+    def get_buckets(self) -> List[int]:
+        current_bucket = int(time.time()) // self.bucket_size
+        num_buckets = max(1, self.window // self.bucket_size)
+        return list(range(current_bucket - num_buckets + 1, current_bucket + 1))
+
+    async def increment(self, member: str) -> None:
+        """
+        Count one view of `member`. Failures are logged rather than raised, since counting is best effort.
+        """
+        if not REDIS_CIRCUIT_BREAKER.allow():
+            return
+
+        key = self.generate_bucket_key(self.get_buckets()[-1])
+
+        try:
+            async with self.client.pipeline(transaction=False) as pipeline:
+                pipeline.zincrby(key, 1, member)
+                pipeline.expire(key, self.window + self.bucket_size)
+                await acall("zincrby", pipeline.execute)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst incrementing the {self.name} counter for {member}: {e}"
+            )
+
+    async def top(self, limit: int) -> Optional[List[Tuple[str, int]]]:
+        """
+        Returns the `limit` members with the most views in the window as (member, count) tuples, or None if Redis is
+        unavailable.
+        """
+        if not REDIS_CIRCUIT_BREAKER.allow():
+            return None
+
+        buckets = self.get_buckets()
+        leaderboard_key = self.generate_leaderboard_key(buckets[-1])
+
+        try:
+            if not await acall("exists", self.client.exists, leaderboard_key):
+                async with self.client.pipeline(transaction=False) as pipeline:
+                    pipeline.zunionstore(
+                        leaderboard_key,
+                        [self.generate_bucket_key(bucket) for bucket in buckets],
+                    )
+                    pipeline.expire(leaderboard_key, self.bucket_size)
+                    await acall("zunionstore", pipeline.execute)
+
+            members = await acall(
+                "zrevrange",
+                self.client.zrevrange,
+                leaderboard_key,
+                0,
+                limit - 1,
+                withscores=True,
+            )
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst reading the {self.name} leaderboard: {e}"
+            )
+            return None
+
+        return [
+            (
+                member.decode("utf-8") if isinstance(member, bytes) else member,
+                int(count),
+            )
+            for member, count in members
+        ]
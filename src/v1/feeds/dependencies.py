@@ -1,32 +1,20 @@
-import time, boto3, logging, json, requests, random
+import time, boto3, logging, json, random, asyncio
 from botocore.exceptions import BotoCoreError, ClientError
 from decimal import Decimal
 from datetime import datetime, timedelta
 
 from src.v1.shared.constants import CHAIN_ID_MAPPING, CHAIN_SYMBOL_MAPPING
 from src.v1.shared.dependencies import get_rpc_provider
+from src.v1.shared.http_client import HTTP_CLIENTS
+from src.v1.shared.rate_limiter import REQUEST_PRIORITY, PRIORITY_BACKGROUND
+from src.v1.shared.multicall import Multicall
+from src.v1.tokens.dependencies import get_go_plus_data
 from src.v1.feeds.exceptions import TimestreamWriteException
+from src.v1.feeds.writer import TimestreamBatchWriter
 from src.v1.feeds.constants import *
 from src.v1.feeds.schemas import MarketDataResponse
 
 
-def process_row(row):
-    if row["Data"][6].get("ScalarValue") is None:
-        value = row["Data"][7]["ScalarValue"]
-    else:
-        value = row["Data"][6]["ScalarValue"]
-
-    return {
-        "eventHash": row["Data"][0]["ScalarValue"],
-        "address": row["Data"][1]["ScalarValue"],
-        "blockchain": row["Data"][2]["ScalarValue"],
-        "timestamp": row["Data"][3]["ScalarValue"],
-        "measureName": row["Data"][4]["ScalarValue"],
-        "time": row["Data"][5]["ScalarValue"],
-        "value": value,
-    }
-
-
 def convert_floats_to_decimals(data):
     if isinstance(data, dict):
         for key, value in data.items():
@@ -174,34 +162,120 @@ class TimestreamEventAdapter:
             raise TimestreamWriteException(message=message)
 
 
+TIMESTREAM_WRITER = TimestreamBatchWriter(TimestreamEventAdapter())
+
+
 decoder = lambda x: ftfy.fix_text(x.decode("utf-8", errors="ignore")).strip()
 int_decoder = lambda b: int.from_bytes(b, "big")
 
 
-def get_usd_price(symbol):
-    url = f"https://min-api.cryptocompare.com/data/price?fsym={symbol}&tsyms=USD"
-    request_response = requests.get(url)
-    request_response.raise_for_status()
+class PriceOracle:
+    """
+    In-process cache of USD prices for the stable tokens in `SYMBOLS`.
 
-    data = request_response.json()
-    price = data.get("USD")
-    if price:
-        return Decimal(price)
-    else:
-        return 0
+    Every symbol is refreshed together with a single CryptoCompare `pricemulti` request, on a background task which
+    runs every `refresh_interval` seconds. Lookups are served from memory as long as the last refresh is at most
+    `max_staleness` seconds old, otherwise the lookup refreshes the prices itself before answering.
+    """
+
+    URL = "https://min-api.cryptocompare.com/data/pricemulti"
+
+    def __init__(
+        self,
+        symbols,
+        refresh_interval: int = PRICE_ORACLE_REFRESH_INTERVAL,
+        max_staleness: int = PRICE_ORACLE_MAX_STALENESS,
+    ) -> None:
+        self.symbols = sorted(set(symbols))
+        self.refresh_interval = refresh_interval
+        self.max_staleness = max_staleness
+
+        self.prices = {}
+        self.last_refreshed = None
+
+        self._lock = asyncio.Lock()
+        self._task = None
+
+    @property
+    def is_stale(self) -> bool:
+        return (
+            self.last_refreshed is None
+            or time.time() - self.last_refreshed > self.max_staleness
+        )
+
+    async def refresh(self) -> None:
+        params = {"fsyms": ",".join(self.symbols), "tsyms": "USD"}
+        request_response = await HTTP_CLIENTS.get("cryptocompare", self.URL, params=params)
+        request_response.raise_for_status()
+
+        data = request_response.json()
+
+        prices = {}
+        for symbol in self.symbols:
+            price = data.get(symbol, {}).get("USD")
+            if price:
+                prices[symbol] = Decimal(str(price))
+            else:
+                logging.warning(f"No USD price was returned for symbol {symbol}.")
+
+        # Swap the whole mapping so that readers never see a partial refresh
+        self.prices = prices
+        self.last_refreshed = time.time()
+
+        logging.info(f"Stable token prices refreshed: {prices}")
+
+    async def get(self, symbol: str) -> Decimal:
+        if self.is_stale:
+            async with self._lock:
+                # Another request may have refreshed the prices whilst this one was waiting
+                if self.is_stale:
+                    await self.refresh()
+
+        return self.prices.get(symbol, 0)
+
+    def status(self) -> dict:
+        return {
+            "prices": {symbol: float(price) for symbol, price in self.prices.items()},
+            "lastRefreshed": self.last_refreshed,
+            "isStale": self.is_stale,
+        }
+
+    async def run(self) -> None:
+        REQUEST_PRIORITY.set(PRIORITY_BACKGROUND)
+
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst refreshing stable token prices: {e}"
+                )
+
+            await asyncio.sleep(self.refresh_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
 
 
-def get_pools(chain, token_address):
-    lower_address = token_address.lower()
-    chain_id = CHAIN_ID_MAPPING[chain]
-    # Get the leading pool address from GoPlus API for a token and return it
-    url = f"https://api.gopluslabs.io/api/v1/token_security/{chain_id}?contract_addresses={lower_address}"
+PRICE_ORACLE = PriceOracle(
+    symbols=[symbol for symbols in SYMBOLS.values() for symbol in symbols.values()]
+)
 
-    request_response = requests.get(url)
-    request_response.raise_for_status()
 
-    data = request_response.json()
-    pair_addresses = data.get("result").get(lower_address).get("dex")
+async def get_usd_price(symbol):
+    return await PRICE_ORACLE.get(symbol)
+
+
+async def get_pools(chain, token_address):
+    # Get the pools of a token from the shared GoPlus response cache
+    data = await get_go_plus_data(chain, token_address)
+    pair_addresses = data.get("dex")
 
     return pair_addresses
 
@@ -217,66 +291,125 @@ def get_block_from_24h_ago(w3):
     return current_block["number"]
 
 
-def get_metadata(token_address, network):
-    start_time = time.time()
-    w3 = get_rpc_provider(network)
+async def get_metadata(token_address, network):
+    metadata = await get_metadata_many([token_address], network)
+    return metadata.get(token_address.lower())
 
-    token_address_ = w3.to_checksum_address(token_address)
 
-    # process_multicall = Multicall(w3, network)
+async def get_metadata_many(token_addresses, network):
+    """
+    Calculate the market cap and liquidity for several tokens on the same network.
 
-    # Define your token's contract address and create a contract object
-    # token_contract = w3.eth.contract(address=token_address, abi=ERC20_ABI)
+    The on-chain analytics calls for every pool of every token are aggregated with Multicall3, so the whole batch
+    costs one RPC round trip per `MULTICALL_BATCH_SIZE` pools rather than one per pool.
+
+    Returns:
+        dict: Mapping of lowercase token address to a MarketDataResponse, or None if the token has no indexed pools
+    """
+    start_time = time.time()
+    w3 = get_rpc_provider(network)
 
     metadata_analytics_contract = w3.eth.contract(
         address=METADATA_ANALYTICS_ADDRESS[network], abi=METADATA_ANALYTICS_ABI
     )
 
-    pools = POOL_INDEXER[network].get(token_address.lower())
-    if pools == None or len(pools) == 0:
-        return None
+    process_multicall = Multicall(w3, network)
 
-    total_market_caps = 0
-    total_liquidity = 0
-    pool_count = 0
+    # Queue up one analytics call for each pool of each token
+    call_indexes, output = {}, {}
+    for token_address in token_addresses:
+        _token_address = token_address.lower()
+        output[_token_address] = None
 
-    # Single call
-    for pool_data in pools:
-        pool_address = pool_data["address"]
+        pools = POOL_INDEXER[network].get(_token_address)
+        if pools == None or len(pools) == 0:
+            continue
 
-        pool_address_ = w3.to_checksum_address(pool_address)
-        if pool_data["dex"] == "UniswapV3":
-            result = metadata_analytics_contract.functions.getUniswapV3Data(
-                pool_address_, token_address_
-            ).call()
-        else:
-            result = metadata_analytics_contract.functions.getUniswapV2Data(
-                pool_address_, token_address_
-            ).call()
+        token_address_ = w3.to_checksum_address(token_address)
+        call_indexes[_token_address] = []
 
-        # Extracting results
-        liquidity_raw, market_cap_raw, stable_token_addr, stable_token_decimals = result
+        for pool_data in pools:
+            pool_address_ = w3.to_checksum_address(pool_data["address"])
+            fn_name = (
+                "getUniswapV3Data"
+                if pool_data["dex"] == "UniswapV3"
+                else "getUniswapV2Data"
+            )
 
-        symbol = SYMBOLS[network].get(stable_token_addr.lower())
+            call_indexes[_token_address].append(
+                process_multicall.add(
+                    metadata_analytics_contract,
+                    fn_name,
+                    [pool_address_, token_address_],
+                )
+            )
 
-        if symbol is None:
-            continue
+    if len(process_multicall) == 0:
+        return output
 
-        stable_token_price = get_usd_price(symbol)
+    # web3 calls are blocking, so the batch is executed off the event loop
+    results = await asyncio.to_thread(process_multicall.execute)
 
-        # Adjust for stableTokenDecimals and multiply by token price in USD
-        liquidity_usd = liquidity_raw * stable_token_price / (10**stable_token_decimals)
-        market_cap_usd = (
-            market_cap_raw * stable_token_price / (10**stable_token_decimals)
-        )
+    # Fetch each stable token price once for the whole batch
+    symbols = set()
+    for result in results:
+        if result:
+            symbol = SYMBOLS[network].get(result[2].lower())
+            if symbol:
+                symbols.add(symbol)
+
+    symbols = list(symbols)
+    prices = dict(
+        zip(symbols, await asyncio.gather(*[get_usd_price(s) for s in symbols]))
+    )
 
-        total_market_caps += market_cap_usd
-        total_liquidity += liquidity_usd
-        pool_count += 1
+    for _token_address, indexes in call_indexes.items():
+        total_market_caps = 0
+        total_liquidity = 0
+        pool_count = 0
 
-    # Calculate the average market cap and total liquidity across all pools
-    average_market_cap = total_market_caps / pool_count if pool_count else 0
-    
-    return MarketDataResponse(
-        marketCap=average_market_cap, liquidityUsd=total_liquidity
+        for index in indexes:
+            result = results[index]
+
+            if result is None:
+                continue
+
+            # Extracting results
+            (
+                liquidity_raw,
+                market_cap_raw,
+                stable_token_addr,
+                stable_token_decimals,
+            ) = result
+
+            symbol = SYMBOLS[network].get(stable_token_addr.lower())
+
+            if symbol is None:
+                continue
+
+            stable_token_price = prices[symbol]
+
+            # Adjust for stableTokenDecimals and multiply by token price in USD
+            liquidity_usd = (
+                liquidity_raw * stable_token_price / (10**stable_token_decimals)
+            )
+            market_cap_usd = (
+                market_cap_raw * stable_token_price / (10**stable_token_decimals)
+            )
+
+            total_market_caps += market_cap_usd
+            total_liquidity += liquidity_usd
+            pool_count += 1
+
+        # Calculate the average market cap and total liquidity across all pools
+        average_market_cap = total_market_caps / pool_count if pool_count else 0
+
+        output[_token_address] = MarketDataResponse(
+            marketCap=average_market_cap, liquidityUsd=total_liquidity
+        )
+
+    logging.info(
+        f"Market data for {len(token_addresses)} tokens on chain {network} calculated in {(time.time() - start_time):.2f} seconds."
     )
+
+    return output
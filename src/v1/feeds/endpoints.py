@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, Cookie
 from fastapi.responses import JSONResponse
 from fastapi_jwt_auth import AuthJWT
-import json, boto3, os, dotenv, pandas as pd, logging, time, random
+import json, boto3, os, dotenv, logging, time, random
 from botocore.exceptions import ClientError
 from decimal import Decimal
 from typing import List, Tuple
@@ -14,13 +14,26 @@ from src.v1.feeds.constants import (
     MOST_VIEWED_TOKENS_LIMIT,
     MOST_VIEWED_TOKENS_NUM_MINUTES,
     TOP_EVENTS_NUM_MINUTES,
+    FEEDS_ENRICHMENT_CONCURRENCY,
+    FEEDS_ENRICHMENT_TIMEOUT,
+    VIEW_COUNTER_WINDOW,
+    VIEW_COUNTER_BUCKET_SIZE,
+    TOKEN_FEED_LENGTH,
+)
+from src.v1.feeds.counters import ViewCounter
+from src.v1.feeds.enrichment import fetch_unique
+from src.v1.feeds.materialiser import TokenEventFeed, ALL_CHAINS
+from src.v1.feeds.queries import (
+    MOST_VIEWED_TOKENS_QUERY,
+    MOST_VIEWED_EVENTS_QUERY,
+    TOKEN_EVENTS_BY_HASH_QUERY,
 )
 from src.v1.feeds.dependencies import (
-    process_row,
-    TimestreamEventAdapter,
+    TIMESTREAM_WRITER,
     convert_floats_to_decimals,
     get_swap_link,
     get_metadata,
+    get_metadata_many,
 )
 from src.v1.feeds.models import EventClick, TokenView
 from src.v1.feeds.exceptions import TimestreamReadException, TimestreamWriteException
@@ -28,9 +41,14 @@ from src.v1.feeds.schemas import MarketDataResponse, TokenData
 
 from src.v1.shared.models import ChainEnum
 from src.v1.shared.models import DexEnum
-from src.v1.shared.DAO import DAO, RAO
+from src.v1.shared.DAO import AsyncDAO, AsyncRAO
 from src.v1.shared.models import validate_token_address
 from src.v1.shared.dependencies import get_token_contract_details, get_chain
+from src.v1.shared.timestream import (
+    MEASURE_COLUMNS,
+    pivot_measures,
+)
+from src.v1.shared.timestream_query import TimestreamQueryClient
 from src.v1.shared.exceptions import (
     DatabaseLoadFailureException,
     DatabaseInsertFailureException,
@@ -50,13 +68,23 @@ read_client = boto3.client(
     region_name="eu-west-1",
 )
 
-write_client = TimestreamEventAdapter()
-
 router = APIRouter()
 
-FEEDS_DAO = DAO("feeds")
-CHAIN_FEEDS_RAO = RAO("chainfeeds", tte=5 * 60)
-MARKET_METRICS_RAO = RAO("marketmetrics", tte=2 * 60)
+FEEDS_DAO = AsyncDAO("feeds", local_tte=60)
+MARKET_METRICS_RAO = AsyncRAO("marketmetrics", tte=2 * 60, local_tte=30)
+
+TOKEN_VIEW_COUNTER = ViewCounter(
+    "tokenviews", window=VIEW_COUNTER_WINDOW, bucket_size=VIEW_COUNTER_BUCKET_SIZE
+)
+EVENT_CLICK_COUNTER = ViewCounter(
+    "eventclicks", window=VIEW_COUNTER_WINDOW, bucket_size=VIEW_COUNTER_BUCKET_SIZE
+)
+
+TIMESTREAM_QUERIES = TimestreamQueryClient(read_client)
+
+TOKEN_EVENT_FEED = TokenEventFeed(
+    TIMESTREAM_QUERIES, chains=[chain.value for chain in ChainEnum]
+)
 
 
 @router.post("/eventclick", dependencies=[Depends(decode_token)])
@@ -79,7 +107,8 @@ async def post_event_click(eventClick: EventClick):
 
     data = {"event_hash": eventHash, "user_id": userId}
 
-    write_client.post(table_name="eventlogs", message=data)
+    await TIMESTREAM_WRITER.post(table_name="eventlogs", message=data)
+    await EVENT_CLICK_COUNTER.increment(eventHash)
 
     return JSONResponse(
         status_code=200,
@@ -110,7 +139,8 @@ async def post_token_view(tokenView: TokenView):
             },
         )
 
-    write_client.post(table_name="reviewlogs", message=data)
+    await TIMESTREAM_WRITER.post(table_name="reviewlogs", message=data)
+    await TOKEN_VIEW_COUNTER.increment(f"{_chain}:{token_address.lower()}")
     return JSONResponse(
         status_code=200,
         content={
@@ -123,7 +153,7 @@ async def post_token_view(tokenView: TokenView):
 async def get_most_viewed_tokens(limit: int = 50):
     # Add a DAO check for most viewed reel
     try:
-        _most_viewed_tokens = FEEDS_DAO.find_most_recent_by_pk("mostviewed")
+        _most_viewed_tokens = await FEEDS_DAO.find_most_recent_by_pk("mostviewed")
     except ClientError as e:
         logging.error(
             f"Exception: Boto3 exception whilst fetching data from 'feeds' with PK 'mostviewed': {e}"
@@ -226,7 +256,7 @@ async def get_most_viewed_tokens(limit: int = 50):
         if len(output) > MOST_VIEWED_TOKENS_LIMIT:
             try:
                 logging.info(f"Writing most viewed tokens to DAO...")
-                FEEDS_DAO.insert_one(
+                await FEEDS_DAO.insert_one(
                     partition_key_value="mostviewed",
                     item={"timestamp": int(time.time()), "value": output},
                 )
@@ -252,116 +282,117 @@ async def get_most_viewed_token_result(limit: int = 50, num_minutes: int = 30):
     if limit > 50:
         limit = 50
 
-    # Query to calculate the most viewed tokens in the past numMinutes minutes
-    query = f"""
-        SELECT "chain", "token_address", COUNT("token_address") as "count"
-        FROM "rug_api_db"."reviewlogs" AS te
-        WHERE time between ago({num_minutes}m) and now()
-        GROUP BY "chain", "token_address"
-        ORDER BY "count" DESC
-        LIMIT {limit}
-        """
-
-    response = read_client.query(QueryString=query)
-
-    def process_row(row):
-        try:
-            chain = row["Data"][0]["ScalarValue"]
-            token_address = row["Data"][1]["ScalarValue"]
-            count = int(row["Data"][2]["ScalarValue"])
-        except Exception as e:
-            logging.error(
-                f"An exception occurred whilst processing the row: {row}. Exception: {e}"
-            )
-            return None
-
-        validate_token_address(token_address)
+    # Read the leaderboard from the view counters, falling back to scanning the Timestream logs whilst the counters
+    # are unavailable or still filling up
+    result = await read_most_viewed_tokens_from_counter(limit)
 
-        return {"chain": chain, "token_address": token_address, "count": count}
-
-    result = [process_row(row) for row in response["Rows"]]
-
-    # Filter out process entries for which an exception occurred
-    result = [row for row in result if row]
+    if len(result) < MOST_VIEWED_TOKENS_LIMIT:
+        logging.info(
+            f"Only {len(result)} tokens found in the view counter, querying Timestream..."
+        )
+        result = await query_most_viewed_tokens(limit, num_minutes)
 
     if len(result) == 0:
-        logging.warning(f"No results returned from query: {query}")
+        logging.warning(f"No most viewed tokens found.")
         return []
 
+    # Fetch token details and scores concurrently for every row
+    enrichments = await enrich_tokens(
+        [(item.get("chain"), item.get("token_address")) for item in result]
+    )
+
     output = []
     for item in result:
-        if item.get("token_address") and item.get("chain"):
-            logging.info(
-                f'Fetching token details for token {item.get("token_address")} on chain {item.get("chain")}...'
-            )
+        enrichment = enrichments.get(
+            (item.get("chain"), item.get("token_address").lower())
+        )
+
+        if enrichment is None:
+            continue
+
+        token_contract_info, score_ = enrichment
+
+        chain_ = get_chain(item.get("chain")).json()
+
+        if chain_:
             try:
-                token_contract_info = await get_token_details(
-                    item.get("chain"), item.get("token_address")
-                )
+                if isinstance(chain_, str):
+                    chain_ = json.loads(chain_)
+                elif isinstance(chain_, dict):
+                    chain_ = chain_
+                else:
+                    logging.error(f"Chain was an unexpected type: {type(chain_)}")
+                    chain_ = None
             except Exception as e:
                 logging.error(
-                    f'An exception occurred whilst fetching token details for token {item.get("token_address")} on chain {item.get("chain")}: {e}'
+                    f'An exception occurred whilst parsing the chain info for token {item.get("token_address")} on chain {item.get("chain")}: {e}'
                 )
-                continue
+                chain_ = None
+
+        output.append(
+            {
+                "name": token_contract_info.get("name"),
+                "symbol": token_contract_info.get("symbol"),
+                "tokenAddress": item.get("token_address"),
+                "chain": chain_,
+                "score": score_,
+            }
+        )
 
-            logging.info(
-                f'Token name and symbol identified as {token_contract_info.get("name")} ({token_contract_info.get("symbol")})'
+    return output
+
+
+async def read_most_viewed_tokens_from_counter(limit: int) -> List[dict]:
+    leaderboard = await TOKEN_VIEW_COUNTER.top(limit)
+
+    if leaderboard is None:
+        return []
+
+    result = []
+    for member, count in leaderboard:
+        chain, _, token_address = member.partition(":")
+
+        try:
+            validate_token_address(token_address)
+        except Exception as e:
+            logging.error(
+                f"An exception occurred whilst processing the view counter member: {member}. Exception: {e}"
             )
+            continue
+
+        result.append({"chain": chain, "token_address": token_address, "count": count})
+
+    return result
 
-            try:
-                score_info = await get_score_info(
-                    eval(f"ChainEnum.{item.get('chain')}"), item.get("token_address")
-                )
-            except Exception as e:
-                logging.error(
-                    f'An exception occurred whilst fetching score info for token {item.get("token_address")} on chain {item.get("chain")}: {e}'
-                )
-                score_info = None
-
-            chain_ = get_chain(item.get("chain")).json()
-            score_ = score_info.json() if score_info else None
-
-            if chain_:
-                try:
-                    if isinstance(chain_, str):
-                        chain_ = json.loads(chain_)
-                    elif isinstance(chain_, dict):
-                        chain_ = chain_
-                    else:
-                        logging.error(f"Chain was an unexpected type: {type(chain_)}")
-                        chain_ = None
-                except Exception as e:
-                    logging.error(
-                        f'An exception occurred whilst parsing the chain info for token {item.get("token_address")} on chain {item.get("chain")}: {e}'
-                    )
-                    chain_ = None
 
-            if score_:
-                try:
-                    if isinstance(score_, str):
-                        score_ = json.loads(score_)
-                    elif isinstance(score_, dict):
-                        score_ = score_
-                    else:
-                        logging.error(f"Score was an unexpected type: {type(score_)}")
-                        score_ = None
-                except Exception as e:
-                    logging.error(
-                        f'An exception occurred whilst parsing the score info for token {item.get("token_address")} on chain {item.get("chain")}: {e}'
-                    )
-                    score_ = None
-
-            output.append(
-                {
-                    "name": token_contract_info.get("name"),
-                    "symbol": token_contract_info.get("symbol"),
-                    "tokenAddress": item.get("token_address"),
-                    "chain": chain_,
-                    "score": score_,
-                }
+async def query_most_viewed_tokens(limit: int, num_minutes: int) -> List[dict]:
+    # Query to calculate the most viewed tokens in the past numMinutes minutes
+    columns = await TIMESTREAM_QUERIES.query(
+        MOST_VIEWED_TOKENS_QUERY,
+        columns=["chain", "token_address", "count"],
+        num_minutes=num_minutes,
+        limit=limit,
+    )
+
+    result = []
+    for chain, token_address, count in zip(
+        columns["chain"], columns["token_address"], columns["count"]
+    ):
+        # Filter out entries for which an exception occurred
+        try:
+            validate_token_address(token_address)
+        except Exception as e:
+            logging.error(
+                f"An exception occurred whilst processing the row: {(chain, token_address, count)}. Exception: {e}"
             )
+            continue
 
-    return output
+        result.append({"chain": chain, "token_address": token_address, "count": count})
+
+    if len(result) == 0:
+        logging.warning(f"No results returned from the most viewed tokens query.")
+
+    return result
 
 
 # TODO: Add more robust exception handling to this endpoint
@@ -371,7 +402,7 @@ async def get_top_events(limit: int = 50):
 
     # Add a DAO check for both supply and transferrability summary
     try:
-        _top_events = FEEDS_DAO.find_most_recent_by_pk("topevents")
+        _top_events = await FEEDS_DAO.find_most_recent_by_pk("topevents")
     except ClientError as e:
         logging.error(
             f"Exception: Boto3 exception whilst fetching data from 'feeds' with PK 'topevents': {e}"
@@ -429,7 +460,7 @@ async def get_top_events(limit: int = 50):
         if len(output) > TOP_EVENTS_LIMIT:
             try:
                 logging.info(f"Writing top events to DAO...")
-                FEEDS_DAO.insert_one(
+                await FEEDS_DAO.insert_one(
                     partition_key_value="topevents",
                     item={"timestamp": int(time.time()), "value": output},
                 )
@@ -447,24 +478,15 @@ async def get_top_events(limit: int = 50):
     return output[:limit] if output else []
 
 
-# TODO: Add more robust exception handling to this endpoint
-async def get_most_viewed_events_result(limit: int = 50, numMinutes: int = 30):
-    # Fetch (chain, tokenAddress) pairs for most viewed tokens
-    if limit > 50:
-        limit = 50
-
-    # Query to calculate the most viewed tokens in the past numMinutes minutes
-    query = f"""
-        SELECT "event_hash", COUNT("event_hash") as "count"
-        FROM "rug_api_db"."eventlogs" AS te
-        WHERE time between ago({numMinutes}m) and now()
-        GROUP BY "event_hash"
-        ORDER BY "count" DESC
-        LIMIT {limit}
-        """
-
+async def query_most_viewed_event_hashes(limit: int, numMinutes: int) -> List[str]:
+    # Query to calculate the most viewed events in the past numMinutes minutes
     try:
-        response = read_client.query(QueryString=query)
+        columns = await TIMESTREAM_QUERIES.query(
+            MOST_VIEWED_EVENTS_QUERY,
+            columns=["event_hash"],
+            num_minutes=numMinutes,
+            limit=limit,
+        )
     except ClientError as e:
         if e.response["Error"]["Code"] == "ThrottlingException":
             message = (
@@ -497,42 +519,47 @@ async def get_most_viewed_events_result(limit: int = 50, numMinutes: int = 30):
         logging.error(message)
         raise TimestreamReadException(message=message)
 
-    logging.info(
-        f'Response fetched successfully! Length of response: {len(response["Rows"])}.'
-    )
+    # Filter out null event hashes
+    result = [item for item in columns["event_hash"] if item]
 
-    def process_row(row):
-        try:
-            return {
-                "event_hash": row["Data"][0]["ScalarValue"],
-                "count": int(row["Data"][1]["ScalarValue"]),
-            }
-        except Exception as e:
-            logging.error(f"process_row(row) error: {e}")
-            logging.error(f"row: {row}")
-            return
+    logging.info(f"Success! Processed result length: {len(result)}")
 
-    # Highly robust, very optimised filtering for invalid rows
-    result = [process_row(row) for row in response["Rows"]]
-    result = [row.get("event_hash") for row in result if row]
-    result = [item for item in result if item]
+    if len(result) == 0:
+        logging.warning(f"No results returned from the most viewed events query.")
 
-    logging.info(f"Success! Processed result length: {len(result)}")
+    return result
+
+
+# TODO: Add more robust exception handling to this endpoint
+async def get_most_viewed_events_result(limit: int = 50, numMinutes: int = 30):
+    # Fetch (chain, tokenAddress) pairs for most viewed tokens
+    if limit > 50:
+        limit = 50
+
+    # Read the leaderboard from the view counters, falling back to scanning the Timestream logs whilst the counters
+    # are unavailable or still filling up
+    leaderboard = await EVENT_CLICK_COUNTER.top(limit)
+    result = [member for member, _ in leaderboard] if leaderboard else []
+
+    if len(result) < TOP_EVENTS_LIMIT:
+        logging.info(
+            f"Only {len(result)} events found in the view counter, querying Timestream..."
+        )
+        result = await query_most_viewed_event_hashes(limit, numMinutes)
 
     if len(result) == 0:
-        logging.warning(f"No results returned from query: {query}")
+        logging.warning(f"No most viewed events found.")
         return []
 
-    query = f"""
-        SELECT te.*
-        FROM "rug_feed_db"."tokenevents" AS te
-        WHERE te.eventHash IN ({','.join([f"'{item}'" for item in result])})
-    """
-
     logging.info(f"Event hashes in result list: {result}")
 
     try:
-        response = read_client.query(QueryString=query)
+        columns = await TIMESTREAM_QUERIES.query(
+            TOKEN_EVENTS_BY_HASH_QUERY,
+            columns=["eventHash", *MEASURE_COLUMNS],
+            typed=False,
+            event_hashes=result,
+        )
     except ClientError as e:
         if e.response["Error"]["Code"] == "ThrottlingException":
             message = (
@@ -565,79 +592,28 @@ async def get_most_viewed_events_result(limit: int = 50, numMinutes: int = 30):
         logging.error(message)
         raise TimestreamReadException(message=message)
 
-    def process_row(row):
-        try:
-            if row["Data"][6].get("ScalarValue") is None:
-                value = row["Data"][7]["ScalarValue"]
-            else:
-                value = row["Data"][6]["ScalarValue"]
-
-            return {
-                "event_hash": row["Data"][0]["ScalarValue"],
-                "address": row["Data"][1]["ScalarValue"],
-                "blockchain": row["Data"][2]["ScalarValue"],
-                "timestamp": row["Data"][3]["ScalarValue"],
-                "measure_name": row["Data"][4]["ScalarValue"],
-                "time": row["Data"][5]["ScalarValue"],
-                "value": value,
-            }
-        except Exception as e:
-            logging.error(f"process_row(row) error: {e}")
-            return
-
-    logging.info(f'Length of response["Rows"]: {len(response["Rows"])}')
-
-    processed_rows = [process_row(row) for row in response["Rows"]]
-    processed_rows = [row for row in processed_rows if row]
-
-    logging.info(f"Length of processed_rows: {len(processed_rows)}")
-
-    if len(processed_rows) == 0:
+    if len(columns.get("eventHash", [])) == 0:
         return []
 
     try:
-        # Handle the data as a pandas dataframe to pivot the data
-        df = (
-            pd.DataFrame(processed_rows)
-            .drop(["time", "address", "blockchain", "timestamp"], axis=1)
-            .drop_duplicates()
+        # Pivot the measures of each event into a single record, converting the timestamp to an integer
+        output = pivot_measures(
+            columns,
+            index="eventHash",
+            converters={"timestamp": lambda x: int(float(x))},
         )
-        pdf = df.pivot(index="event_hash", columns="measure_name", values="value")
-        # Convert the timestamp to an integer
-        pdf["timestamp"] = pdf["timestamp"].apply(lambda x: int(float(x)))
 
-        output = pdf.to_dict("records")
+        # Fetch scores concurrently for every event, events without a score are still returned
+        enrichments = await enrich_tokens(
+            [(item.get("blockchain"), item.get("address")) for item in output],
+            include_details=False,
+        )
 
-        for idx, item in enumerate(output):
-            try:
-                score_info = await get_score_info(
-                    eval(f"ChainEnum.{item.get('blockchain')}"), item.get("address")
-                )
-                score_ = score_info.json() if score_info else None
-
-                if score_:
-                    try:
-                        if isinstance(score_, str):
-                            score_ = json.loads(score_)
-                        elif isinstance(score_, dict):
-                            score_ = score_
-                        else:
-                            logging.error(
-                                f"Score was an unexpected type: {type(score_)}"
-                            )
-                            score_ = None
-                    except Exception as e:
-                        logging.error(
-                            f'An exception occurred whilst parsing the score info for token {item.get("address")} on chain {item.get("blockchain")}: {e}'
-                        )
-                        score_ = None
-
-                output[idx]["score"] = score_
-            except Exception as e:
-                logging.error(
-                    f'An exception occurred whilst fetching score info for token {item.get("address")} on chain {item.get("blockchain")}: {e}'
-                )
-                output[idx]["score"] = None
+        for item in output:
+            enrichment = enrichments.get(
+                (item.get("blockchain"), str(item.get("address")).lower())
+            )
+            item["score"] = enrichment[1] if enrichment else None
 
         return output
     except KeyError as e:
@@ -652,101 +628,25 @@ async def get_most_viewed_events_result(limit: int = 50, numMinutes: int = 30):
         return []
 
 
-# TODO: Add caching to this endpoint to reduce the number of calls to Timestream
 @router.get(
     "/tokenevents", dependencies=[Depends(decode_token)], include_in_schema=True
 )
 async def get_token_events(number_of_events: int = 50, chain: ChainEnum = None):
-    _chain = str(chain.value) if isinstance(chain, ChainEnum) else "all"
-
-    try:
-        data = CHAIN_FEEDS_RAO.get(_chain)
-    except Exception as e:
-        logging.error(f"An exception occurred whilst fetching data from RAO: {e}")
-        data = None
-        pass
+    _chain = str(chain.value) if isinstance(chain, ChainEnum) else ALL_CHAINS
 
-    if data:
-        return data
+    # Feeds are materialised in the background by `TOKEN_EVENT_FEED`, so reads only query Timestream whilst a feed
+    # is missing from Redis
+    data = await TOKEN_EVENT_FEED.get(_chain)
 
-    if number_of_events > 50:
-        number_of_events = 50
-
-    where_clause = (
-        f"WHERE blockchain = '{chain.value}' AND eventHash IS NOT NULL"
-        if chain
-        else "WHERE eventHash IS NOT NULL"
-    )
-
-    query = f"""
-        SELECT te.*
-        FROM "rug_feed_db"."tokenevents" AS te
-        JOIN (
-            SELECT eventHash, MAX(timestamp) AS max_timestamp
-            FROM "rug_feed_db"."tokenevents"
-            {where_clause}
-            GROUP BY eventHash
-            ORDER BY max_timestamp DESC
-            LIMIT {number_of_events}
-        ) AS subquery
-        ON te.eventHash = subquery.eventHash AND te.timestamp = subquery.max_timestamp
-        """
-
-    try:
-        response = read_client.query(QueryString=query)
-    except ClientError as e:
-        if e.response["Error"]["Code"] == "ThrottlingException":
-            message = (
-                f"Request was throttled. Consider retrying with exponential backoff."
-            )
-            logging.error(message)
-            raise TimestreamReadException(message=message)
-        elif e.response["Error"]["Code"] == "ValidationException":
-            message = (
-                f"A validation error occurred during call to read from Timestream: {e}"
-            )
-            logging.error(message)
-            raise TimestreamReadException(message=message)
-        elif e.response["Error"]["Code"] == "ResourceNotFoundException":
-            message = f"Resource not found during call to read from Timestream: {e}"
-            logging.error(message)
-            raise TimestreamReadException(message=message)
-        elif e.response["Error"]["Code"] == "AccessDeniedException":
-            message = f"Access denied during call to read from Timestream: {e}"
-            logging.error(message)
-            raise TimestreamReadException(message=message)
-        else:
-            message = f"An unknown exception occurred during call to read from Timestream: {e}"
-            logging.error(message)
-            raise TimestreamReadException(message=message)
-    except Exception as e:
-        message = (
-            f"An unknown exception occurred during call to read from Timestream: {e}"
+    if data is None:
+        return JSONResponse(
+            status_code=503,
+            content={
+                "detail": f"The token event feed for {_chain} is not available, please retry shortly."
+            },
         )
-        logging.error(message)
-        raise TimestreamReadException(message=message)
-
-    processed_rows = [process_row(row) for row in response["Rows"]]
 
-    # Handle the data as a pandas dataframe to pivot the data
-    df = pd.DataFrame(processed_rows).drop(
-        ["time", "address", "blockchain", "timestamp"], axis=1
-    )
-    pdf = df.pivot(index="eventHash", columns="measureName", values="value")
-
-    # Convert the timestamp to an integer
-    pdf["timestamp"] = pdf["timestamp"].apply(lambda x: int(float(x)))
-
-    # Return the data as a list of dictionaries
-    output = pdf.to_dict("records")
-
-    try:
-        data = CHAIN_FEEDS_RAO.put(_chain, output)
-    except Exception as e:
-        logging.error(f"An exception occurred whilst writing data to RAO: {e}")
-        pass
-
-    return output
+    return data[: min(number_of_events, TOKEN_FEED_LENGTH)]
 
 
 # TODO: Add more robust exception handling to this endpoint
@@ -765,6 +665,78 @@ async def get_token_details(chain: ChainEnum, token_address: str):
     return token_details
 
 
+def format_score(score_info, chain: str, token_address: str):
+    score_ = score_info.json() if score_info else None
+
+    if score_:
+        try:
+            if isinstance(score_, str):
+                score_ = json.loads(score_)
+            elif isinstance(score_, dict):
+                score_ = score_
+            else:
+                logging.error(f"Score was an unexpected type: {type(score_)}")
+                score_ = None
+        except Exception as e:
+            logging.error(
+                f"An exception occurred whilst parsing the score info for token {token_address} on chain {chain}: {e}"
+            )
+            score_ = None
+
+    return score_
+
+
+async def enrich_tokens(
+    pairs: List[Tuple[str, str]], include_details: bool = True
+) -> dict:
+    """
+    Fetch token details and scores for (chain, token address) pairs concurrently.
+
+    Identical pairs are only fetched once, and at most `FEEDS_ENRICHMENT_CONCURRENCY` pairs are fetched at a time.
+    Pairs which have not finished after `FEEDS_ENRICHMENT_TIMEOUT` seconds are cancelled and left out of the result,
+    so that a few slow tokens do not hold up the whole feed.
+
+    Returns:
+        dict: Mapping of (chain, lowercase token address) to a (token details, score) tuple. Token details are None
+            when `include_details` is False. Pairs whose token details could not be fetched are left out.
+    """
+
+    async def enrich(chain: str, token_address: str):
+        token_contract_info = None
+        if include_details:
+            logging.info(
+                f"Fetching token details for token {token_address} on chain {chain}..."
+            )
+            try:
+                token_contract_info = await get_token_details(chain, token_address)
+            except Exception as e:
+                logging.error(
+                    f"An exception occurred whilst fetching token details for token {token_address} on chain {chain}: {e}"
+                )
+                return None
+
+        try:
+            score_info = await get_score_info(ChainEnum[chain], token_address)
+        except Exception as e:
+            logging.error(
+                f"An exception occurred whilst fetching score info for token {token_address} on chain {chain}: {e}"
+            )
+            score_info = None
+
+        return token_contract_info, format_score(score_info, chain, token_address)
+
+    return await fetch_unique(
+        (
+            (chain, str(token_address).lower())
+            for chain, token_address in pairs
+            if chain and token_address
+        ),
+        enrich,
+        concurrency=FEEDS_ENRICHMENT_CONCURRENCY,
+        timeout=FEEDS_ENRICHMENT_TIMEOUT,
+    )
+
+
 @router.get(
     "/token/marketdata",
     response_model=MarketDataResponse,
@@ -784,12 +756,10 @@ async def get_token_market_data(
     - **chain** (str): The chain name on which the token is deployed.
     - **dex** (str): The DEX name on which the token is deployed.
     """
-    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
-    _dex = str(dex.value) if isinstance(dex, DexEnum) else str(dex)
-    _key = f"{_chain}_{_dex}_{token_address}"
+    _key = get_market_data_key(chain, token_address, dex)
 
     try:
-        data = MARKET_METRICS_RAO.get(_key)
+        data = await MARKET_METRICS_RAO.get(_key)
     except Exception as e:
         logging.error(f"An exception occurred whilst fetching data from RAO: {e}")
         data = None
@@ -797,36 +767,16 @@ async def get_token_market_data(
 
     if not data:
         try:
-            swapLink = get_swap_link(dex.value, chain.value, token_address)
-
             # Calculations for market data are performed in the get_metadata function
-            metadata = get_metadata(token_address, chain.value)
-
-            # TODO: Implement calculations for volume after product launch here
-            volume24h = None
-
-            data = {
-                "chain": chain.value,
-                "tokenAddress": token_address,
-                "dex": dex.value,
-                "marketCap": metadata.marketCap,
-                "liquidityUsd": metadata.liquidityUsd,
-                "volume24h": volume24h,
-                "swapLink": swapLink,
-            }
-
+            metadata = await get_metadata(token_address, chain.value)
         except Exception as e:
             logging.error(f"An exception occurred whilst getting the metadata: {e}")
-            data = {
-                "chain": chain.value,
-                "tokenAddress": token_address,
-                "dex": dex.value,
-                "swapLink": swapLink,
-            }
-            pass
+            metadata = None
+
+        data = format_market_data(chain, token_address, dex, metadata)
 
         try:
-            MARKET_METRICS_RAO.put(_key, data)
+            await MARKET_METRICS_RAO.put(_key, data)
         except Exception as e:
             logging.error(f"An exception occurred whilst writing data to RAO: {e}")
             pass
@@ -834,9 +784,95 @@ async def get_token_market_data(
     return MarketDataResponse(**data)
 
 
+def get_market_data_key(chain: ChainEnum, token_address: str, dex: DexEnum) -> str:
+    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
+    _dex = str(dex.value) if isinstance(dex, DexEnum) else str(dex)
+    return f"{_chain}_{_dex}_{token_address}"
+
+
+def format_market_data(
+    chain: ChainEnum,
+    token_address: str,
+    dex: DexEnum,
+    metadata: MarketDataResponse = None,
+) -> dict:
+    swapLink = get_swap_link(dex.value, chain.value, token_address)
+
+    data = {
+        "chain": chain.value,
+        "tokenAddress": token_address,
+        "dex": dex.value,
+        "swapLink": swapLink,
+    }
+
+    if metadata:
+        # TODO: Implement calculations for volume after product launch here
+        data.update(
+            {
+                "marketCap": metadata.marketCap,
+                "liquidityUsd": metadata.liquidityUsd,
+                "volume24h": None,
+            }
+        )
+
+    return data
+
+
 async def gather_data(tokens: List[TokenData]):
-    tasks = [get_token_market_data(t.chain, t.token_address, t.dex) for t in tokens]
-    results = await asyncio.gather(*tasks, return_exceptions=True)
+    keys = [get_market_data_key(t.chain, t.token_address, t.dex) for t in tokens]
+
+    # Look up every token in a single MGET round trip
+    try:
+        cached = await MARKET_METRICS_RAO.get_many(keys)
+    except Exception as e:
+        logging.error(f"An exception occurred whilst reading data from RAO: {e}")
+        cached = {}
+
+    missing = {idx for idx, key in enumerate(keys) if not cached.get(key)}
+
+    # Batch the on-chain calls for all uncached tokens into one multicall per chain
+    token_addresses = {}
+    for idx in sorted(missing):
+        token_addresses.setdefault(tokens[idx].chain.value, set()).add(
+            tokens[idx].token_address
+        )
+
+    metadata = {}
+    for _chain, addresses in token_addresses.items():
+        try:
+            metadata[_chain] = await get_metadata_many(list(addresses), _chain)
+        except Exception as e:
+            logging.error(
+                f"An exception occurred whilst getting the metadata for chain {_chain}: {e}"
+            )
+            metadata[_chain] = {}
+
+    results, computed = [], {}
+    for idx, token in enumerate(tokens):
+        if idx not in missing:
+            results.append(MarketDataResponse(**cached[keys[idx]]))
+            continue
+
+        try:
+            data = format_market_data(
+                token.chain,
+                token.token_address,
+                token.dex,
+                metadata[token.chain.value].get(token.token_address.lower()),
+            )
+        except Exception as e:
+            logging.error(f"An exception occurred whilst formatting the metadata: {e}")
+            results.append(e)
+            continue
+
+        computed[keys[idx]] = data
+        results.append(MarketDataResponse(**data))
+
+    # Write every newly computed token back in a single pipelined round trip
+    try:
+        await MARKET_METRICS_RAO.put_many(computed)
+    except Exception as e:
+        logging.error(f"An exception occurred whilst writing data to RAO: {e}")
 
     return results
 
@@ -0,0 +1,62 @@
+"""
+Concurrent enrichment of feed rows with data fetched for each of the tokens they reference.
+
+Feeds reference the same token many times, and a few slow upstream lookups should not hold up the whole feed, so
+each distinct key is fetched once, with bounded concurrency and an overall deadline.
+"""
+import asyncio, logging
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Optional
+
+
+async def fetch_unique(
+    keys: Iterable[Hashable],
+    fetch: Callable[..., Awaitable[Optional[Any]]],
+    concurrency: int,
+    timeout: float,
+) -> Dict[Hashable, Any]:
+    """
+    Fetch every distinct key once, with at most `concurrency` fetches running at a time.
+
+    Args:
+        keys: Keys to fetch, which may repeat. Tuple keys are unpacked into the arguments of `fetch`
+        fetch: Coroutine function which returns the value for a key, or None if it has no value
+        concurrency (int): Maximum number of fetches running at a time
+        timeout (float): Time in seconds after which the fetches still running are cancelled
+
+    Returns:
+        dict: Mapping of each key to its value. Keys which returned None, raised or were cancelled are left out.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(key: Hashable):
+        async with semaphore:
+            return await fetch(*key) if isinstance(key, tuple) else await fetch(key)
+
+    keys = list(dict.fromkeys(keys))
+    if len(keys) == 0:
+        return {}
+
+    tasks = {asyncio.ensure_future(fetch_one(key)): key for key in keys}
+    done, pending = await asyncio.wait(tasks, timeout=timeout)
+
+    for task in pending:
+        task.cancel()
+
+    if pending:
+        logging.warning(
+            f"Enrichment deadline of {timeout} seconds was hit, returning {len(done)} of {len(keys)} keys."
+        )
+
+    output = {}
+    for task in done:
+        if task.cancelled():
+            continue
+        if task.exception() is not None:
+            logging.error(
+                f"Exception: Whilst enriching {tasks[task]}: {task.exception()}"
+            )
+            continue
+        if task.result() is not None:
+            output[tasks[task]] = task.result()
+
+    return output
@@ -0,0 +1,422 @@
+"""
+Index of DEX pools by token address, used to look up the pools of a token when calculating market data.
+
+The index is built by a single leader process and written to a read-only, memory-mapped file for each network.
+Every uvicorn worker maps the same file, so the pages are shared between workers through the page cache and a
+lookup only decodes the pools of the requested token.
+
+File layout (all integers little-endian):
+
+    header      magic (8 bytes), token count, reference count, pool count, dex count (uint32 each)
+    tokens      sorted 20-byte token addresses
+    offsets     (token count + 1) uint32 offsets into the reference table
+    references  uint32 indexes into the pool table, newest pool first for each token
+    pools       fixed-size records of pool address, token0, token1 (20 bytes each) and dex id (uint16)
+    dexes       dex names, each as a uint8 length followed by the UTF-8 bytes
+"""
+import os, sys, mmap, time, fcntl, struct, logging
+from typing import Dict, List, Optional, Tuple
+
+from src.v1.feeds.constants import POOL_INDEXER, POOL_INDEX_DIRECTORY
+
+INDEX_MAGIC = b"RUGPIDX1"
+HEADER = struct.Struct("<8sIIII")
+POOL = struct.Struct("<20s20s20sH")
+ADDRESS_SIZE = 20
+
+
+class PoolRecord:
+    """
+    Compact, immutable representation of a single pool.
+
+    Supports item access (`pool["address"]`) so that it can be used wherever the raw pool dictionaries were used.
+    """
+
+    __slots__ = ("address", "token0", "token1", "dex")
+
+    def __init__(self, address: str, token0: str, token1: str, dex: str) -> None:
+        self.address = sys.intern(address.lower())
+        self.token0 = sys.intern(token0.lower())
+        self.token1 = sys.intern(token1.lower())
+        self.dex = sys.intern(dex)
+
+    @classmethod
+    def from_dict(cls, pool: dict) -> "PoolRecord":
+        return cls(
+            address=pool["address"],
+            token0=pool["token0"],
+            token1=pool["token1"],
+            dex=pool.get("dex") or "",
+        )
+
+    def __getitem__(self, key: str) -> str:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key, default)
+
+    def __repr__(self) -> str:
+        return f"PoolRecord(address={self.address}, token0={self.token0}, token1={self.token1}, dex={self.dex})"
+
+
+def apply_pools(
+    index: Dict[str, Tuple[PoolRecord, ...]], pools: List[dict]
+) -> Dict[str, Tuple[PoolRecord, ...]]:
+    """
+    Add `pools`, given in file order (oldest first), to `index` in place.
+
+    The pools of each token are kept newest first and unique by pool address, with the newest record winning.
+    """
+    additions = {}
+
+    for pool in reversed(pools):
+        try:
+            record = PoolRecord.from_dict(pool)
+        except Exception as e:
+            logging.warning(f"Exception: Skipping malformed pool {pool}: {e}")
+            continue
+
+        for token in (record.token0, record.token1):
+            additions.setdefault(token, {}).setdefault(record.address, record)
+
+    for token, records in additions.items():
+        existing = index.get(token, ())
+        index[token] = tuple(records.values()) + tuple(
+            record for record in existing if record.address not in records
+        )
+
+    return index
+
+
+def address_to_bytes(address: str) -> Optional[bytes]:
+    try:
+        value = bytes.fromhex(address[2:] if address.startswith("0x") else address)
+    except ValueError:
+        return None
+
+    return value if len(value) == ADDRESS_SIZE else None
+
+
+def write_index_file(path: str, index: Dict[str, Tuple[PoolRecord, ...]]) -> None:
+    """
+    Serialise `index` into the memory-mapped file format at `path`.
+
+    The file is written next to its destination and moved into place with `os.replace`, so readers either see the
+    previous file or the complete new one. Readers which still map the previous file keep a valid mapping.
+    """
+    tokens = sorted(
+        (key, token)
+        for token, key in ((token, address_to_bytes(token)) for token in index)
+        if key is not None
+    )
+
+    offsets, references, pools = [0], [], []
+    pool_ids, dex_ids = {}, {}
+
+    for _, token in tokens:
+        for record in index[token]:
+            pool_id = pool_ids.get(record.address)
+
+            if pool_id is None:
+                address, token0, token1 = (
+                    address_to_bytes(record.address),
+                    address_to_bytes(record.token0),
+                    address_to_bytes(record.token1),
+                )
+                if None in (address, token0, token1):
+                    continue
+
+                dex_id = dex_ids.setdefault(record.dex, len(dex_ids))
+                pool_id = pool_ids[record.address] = len(pools)
+                pools.append(POOL.pack(address, token0, token1, dex_id))
+
+            references.append(pool_id)
+
+        offsets.append(len(references))
+
+    dexes = b"".join(
+        bytes([len(encoded)]) + encoded
+        for encoded in (dex.encode("utf-8")[:255] for dex in dex_ids)
+    )
+
+    temporary_path = f"{path}.{os.getpid()}.tmp"
+    with open(temporary_path, "wb") as f:
+        f.write(
+            HEADER.pack(
+                INDEX_MAGIC, len(tokens), len(references), len(pools), len(dex_ids)
+            )
+        )
+        f.write(b"".join(key for key, _ in tokens))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        f.write(struct.pack(f"<{len(references)}I", *references))
+        f.write(b"".join(pools))
+        f.write(dexes)
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(temporary_path, path)
+
+
+class MappedPoolIndex:
+    """
+    Read-only view of an index file, mapped into memory.
+
+    `get` mirrors `dict.get`, returning a tuple of `PoolRecord` for the token or `default`. `reload` maps the file
+    again only when it has been replaced since it was last mapped. `to_dict` decodes the whole index.
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.inode = None
+        self.state = None
+
+    def reload(self) -> bool:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return False
+
+        inode = (stat.st_dev, stat.st_ino, stat.st_mtime_ns)
+        if inode == self.inode:
+            return False
+
+        with open(self.path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, token_count, reference_count, pool_count, dex_count = HEADER.unpack_from(
+            mapped, 0
+        )
+        if magic != INDEX_MAGIC:
+            mapped.close()
+            raise ValueError(f"Pool index file {self.path} has an unknown format.")
+
+        tokens_offset = HEADER.size
+        offsets_offset = tokens_offset + token_count * ADDRESS_SIZE
+        references_offset = offsets_offset + (token_count + 1) * 4
+        pools_offset = references_offset + reference_count * 4
+        dexes_offset = pools_offset + pool_count * POOL.size
+
+        dexes, position = [], dexes_offset
+        for _ in range(dex_count):
+            length = mapped[position]
+            dexes.append(
+                sys.intern(mapped[position + 1 : position + 1 + length].decode("utf-8"))
+            )
+            position += 1 + length
+
+        # Swap the new mapping in with a single assignment, the previous mapping is released once unreferenced
+        self.state = (
+            mapped,
+            token_count,
+            tokens_offset,
+            offsets_offset,
+            references_offset,
+            pools_offset,
+            dexes,
+        )
+        self.inode = inode
+        return True
+
+    def __len__(self) -> int:
+        return self.state[1] if self.state else 0
+
+    def get(self, token_address: str, default=None):
+        state = self.state
+        key = address_to_bytes(token_address)
+        if state is None or key is None:
+            return default
+
+        (
+            mapped,
+            token_count,
+            tokens_offset,
+            offsets_offset,
+            references_offset,
+            pools_offset,
+            dexes,
+        ) = state
+
+        low, high = 0, token_count
+        while low < high:
+            middle = (low + high) // 2
+            position = tokens_offset + middle * ADDRESS_SIZE
+            if mapped[position : position + ADDRESS_SIZE] < key:
+                low = middle + 1
+            else:
+                high = middle
+
+        position = tokens_offset + low * ADDRESS_SIZE
+        if low == token_count or mapped[position : position + ADDRESS_SIZE] != key:
+            return default
+
+        return self.read_pools(state, low)
+
+    @staticmethod
+    def read_pools(state: tuple, position: int) -> Tuple[PoolRecord, ...]:
+        """
+        Decodes the pools of the token at `position` in the sorted token table.
+        """
+        mapped, _, _, offsets_offset, references_offset, pools_offset, dexes = state
+
+        start, end = struct.unpack_from("<II", mapped, offsets_offset + position * 4)
+        pool_ids = struct.unpack_from(
+            f"<{end - start}I", mapped, references_offset + start * 4
+        )
+
+        records = []
+        for pool_id in pool_ids:
+            address, token0, token1, dex_id = POOL.unpack_from(
+                mapped, pools_offset + pool_id * POOL.size
+            )
+            records.append(
+                PoolRecord(
+                    "0x" + address.hex(),
+                    "0x" + token0.hex(),
+                    "0x" + token1.hex(),
+                    dexes[dex_id],
+                )
+            )
+
+        return tuple(records)
+
+    def to_dict(self) -> Dict[str, Tuple[PoolRecord, ...]]:
+        state = self.state
+        if state is None:
+            return {}
+
+        mapped, token_count, tokens_offset = state[:3]
+
+        index = {}
+        for position in range(token_count):
+            start = tokens_offset + position * ADDRESS_SIZE
+            token = sys.intern("0x" + mapped[start : start + ADDRESS_SIZE].hex())
+            index[token] = self.read_pools(state, position)
+
+        return index
+
+
+class PoolIndexer:
+    """
+    Keeps the pool index files in `directory` up to date with the `pools/{network}/pools.json` files in the bucket,
+    and keeps `POOL_INDEXER` pointed at mapped views of those files.
+
+    Only one process at a time builds the index: the leader is the process holding an exclusive `flock` on the lock
+    file in `directory`. The lock is released by the kernel when the leader exits, after which the next worker to
+    call `refresh` takes over. Other workers only map the files written by the leader.
+
+    The leader remembers the GCS object generation for each network, so an unchanged file is neither downloaded nor
+    parsed. The pools file is append-only, so when it has changed only the pools after the previously processed
+    count are applied, on top of the index decoded from the current index file. If the file no longer starts with
+    the pools already processed, the index for that network is rebuilt from scratch.
+
+    The leader does not keep the index in memory between refreshes, and serves lookups from the mapped files like
+    every other worker.
+    """
+
+    def __init__(
+        self, bucket, networks: List[str], directory: str = POOL_INDEX_DIRECTORY
+    ) -> None:
+        self.bucket = bucket
+        self.networks = networks
+        self.directory = directory
+
+        os.makedirs(self.directory, exist_ok=True)
+        self.lock_file = None
+
+        self.generations = {}
+        self.counts = {}
+        self.boundaries = {}
+
+        self.views = {
+            network: MappedPoolIndex(self.get_index_path(network))
+            for network in networks
+        }
+
+    def get_index_path(self, network: str) -> str:
+        return os.path.join(self.directory, f"{network}.idx")
+
+    @property
+    def is_leader(self) -> bool:
+        if self.lock_file is not None:
+            return True
+
+        lock_file = open(os.path.join(self.directory, "refresher.lock"), "a")
+        try:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            return False
+
+        logging.info(f"Process {os.getpid()} is now the pool index refresher.")
+        self.lock_file = lock_file
+        return True
+
+    def refresh(self) -> None:
+        if self.is_leader:
+            for network in self.networks:
+                try:
+                    self.refresh_network(network)
+                except Exception as e:
+                    logging.error(
+                        f"Exception: Failed to refresh the pool index for network {network}: {e}"
+                    )
+
+        self.load()
+
+    def load(self) -> None:
+        for network, view in self.views.items():
+            try:
+                if view.reload():
+                    POOL_INDEXER[network] = view
+                    logging.info(
+                        f"Pool index for network {network} mapped with {len(view)} tokens."
+                    )
+            except Exception as e:
+                logging.error(
+                    f"Exception: Failed to map the pool index for network {network}: {e}"
+                )
+
+    def refresh_network(self, network: str) -> None:
+        start_time = time.time()
+
+        pools, generation = self.bucket.get_if_modified(
+            f"pools/{network}/pools.json", self.generations.get(network)
+        )
+
+        if pools is None:
+            return
+
+        previous_count = self.counts.get(network, 0)
+        boundary = self.boundaries.get(network)
+
+        is_incremental = (
+            0 < previous_count <= len(pools)
+            and pools[previous_count - 1]["address"].lower() == boundary
+        )
+
+        if is_incremental:
+            # The current index file is mapped separately, and unmapped once it is no longer referenced
+            previous = MappedPoolIndex(self.get_index_path(network))
+            is_incremental = previous.reload()
+            index = previous.to_dict()
+        else:
+            index = {}
+
+        new_pools = pools[previous_count:] if is_incremental else pools
+
+        apply_pools(index, new_pools)
+        write_index_file(self.get_index_path(network), index)
+
+        num_tokens = len(index)
+        del index
+
+        self.generations[network] = generation
+        self.counts[network] = len(pools)
+        self.boundaries[network] = pools[-1]["address"].lower() if pools else None
+
+        logging.info(
+            f"Pool index for network {network} {'updated' if is_incremental else 'rebuilt'} with {len(new_pools)} pools in {(time.time() - start_time):.2f} seconds. The index now covers {num_tokens} tokens."
+        )
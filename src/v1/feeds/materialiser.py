@@ -0,0 +1,357 @@
+"""
+Token event feeds materialised in Redis, served by `/tokenevents` without querying Timestream.
+
+A single leader process, elected with a Redis lock, polls `rug_feed_db.tokenevents` every `poll_interval` seconds
+for the rows written since its high-water mark (minus a small overlap for late writes). It keeps the latest record
+of each event, and publishes a list of the `length` most recent events for every chain and for "all" chains.
+
+The leader's state, the high-water mark and the events in the published lists, is stored in Redis after each poll,
+so a new leader carries on incrementally from where the previous one stopped. A leader without previous state
+bootstraps from the `length` most recent events of each chain.
+
+Whilst a feed is not materialised, e.g. before the first poll or after Redis lost it, readers rebuild it from the
+leader's state, or failing that from the same bounded query as the bootstrap.
+"""
+import asyncio, logging, time, uuid
+from typing import Dict, List, Optional
+
+from src.v1.feeds.constants import (
+    TOKEN_FEED_LENGTH,
+    TOKEN_FEED_POLL_INTERVAL,
+    TOKEN_FEED_OVERLAP,
+    TOKEN_FEED_BOOTSTRAP_WINDOW,
+    TOKEN_FEED_LEADER_TTL,
+    TOKEN_FEED_TTE,
+)
+from src.v1.feeds.queries import TOKEN_EVENTS_SINCE_QUERY, TOKEN_EVENTS_LATEST_QUERY
+from src.v1.shared.DAO import AsyncRAO
+from src.v1.shared.redis_client import get_async_redis_client, acall
+from src.v1.shared.singleflight import RELEASE_LOCK_SCRIPT
+from src.v1.shared.timestream import MEASURE_COLUMNS, group_measures
+from src.v1.shared.timestream_query import TimestreamQueryClient
+
+# Extend the lock only if it is still held by the caller
+EXTEND_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("pexpire", KEYS[1], ARGV[2])
+else
+    return 0
+end
+"""
+
+ALL_CHAINS = "all"
+
+
+class TokenEventFeed:
+    """
+    Args:
+        query_client (TimestreamQueryClient): Client used to poll Timestream
+        chains (List[str]): Chains with their own feed, in addition to "all"
+        length (int): Number of events kept in each feed
+        poll_interval (float): Time in seconds between polls of Timestream
+        overlap (int): Time in seconds before the high-water mark which is polled again, to catch late writes
+        bootstrap_window (int): Maximum age in seconds of the events loaded by a leader without previous state
+        leader_ttl (int): Expiry of the leader lock in seconds, after which another process takes over
+    """
+
+    LOCK_KEY = "tokenfeed_leader"
+    STATE_KEY = "state"
+
+    def __init__(
+        self,
+        query_client: TimestreamQueryClient,
+        chains: List[str],
+        length: int = TOKEN_FEED_LENGTH,
+        poll_interval: float = TOKEN_FEED_POLL_INTERVAL,
+        overlap: int = TOKEN_FEED_OVERLAP,
+        bootstrap_window: int = TOKEN_FEED_BOOTSTRAP_WINDOW,
+        leader_ttl: int = TOKEN_FEED_LEADER_TTL,
+    ) -> None:
+        self.query_client = query_client
+        self.chains = list(chains)
+        self.length = length
+        self.poll_interval = poll_interval
+        self.overlap = overlap
+        self.bootstrap_window = bootstrap_window
+        self.leader_ttl = leader_ttl
+
+        self.feeds_rao = AsyncRAO(
+            "tokenfeed", tte=TOKEN_FEED_TTE, local_tte=poll_interval
+        )
+        self.state_rao = AsyncRAO("tokenfeedstate", tte=TOKEN_FEED_TTE)
+        self.client = get_async_redis_client()
+
+        self.token = uuid.uuid4().hex
+        self.is_leader = False
+
+        # Latest record of each event in the published feeds, keyed by event hash
+        self.events: Optional[Dict[str, dict]] = None
+        self.high_water_mark: Optional[int] = None
+        self.last_polled = None
+
+        self._task = None
+
+    async def get(self, chain: str) -> Optional[list]:
+        """
+        Returns the feed of `chain`, or of every chain for "all". If it has not been materialised, it is rebuilt from
+        the leader's state or from Timestream, and None is only returned if both fail.
+        """
+        try:
+            feed = await self.feeds_rao.get(chain)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst fetching the {chain} token event feed: {e}"
+            )
+            feed = None
+
+        if feed is not None:
+            return feed
+
+        logging.warning(
+            f"The token event feed for {chain} has not been materialised, rebuilding it."
+        )
+
+        try:
+            state = await self.state_rao.get(self.STATE_KEY)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst fetching the token event feed state: {e}"
+            )
+            state = None
+
+        if state and state.get("events"):
+            return self.to_feeds(self.select(state["events"])).get(chain)
+
+        try:
+            events = {}
+            self.merge(events, await self.query_latest())
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst querying the latest token events: {e}"
+            )
+            return None
+
+        return self.to_feeds(self.select(events)).get(chain)
+
+    async def query_latest(self) -> Dict[str, list]:
+        return await self.query_client.query(
+            TOKEN_EVENTS_LATEST_QUERY,
+            columns=["eventHash", "blockchain", "time_ms", *MEASURE_COLUMNS],
+            typed=False,
+            length=self.length,
+            window=self.bootstrap_window,
+        )
+
+    async def elect(self) -> bool:
+        """
+        Takes the leader lock, or extends it if this process already holds it.
+        """
+        ttl = int(self.leader_ttl * 1000)
+
+        if self.is_leader:
+            extended = await acall(
+                "lock",
+                self.client.eval,
+                EXTEND_LOCK_SCRIPT,
+                1,
+                self.LOCK_KEY,
+                self.token,
+                ttl,
+            )
+            if not extended:
+                logging.warning(f"Lost the token event feed leadership.")
+                self.is_leader = False
+                self.events = None
+        else:
+            self.is_leader = bool(
+                await acall(
+                    "lock", self.client.set, self.LOCK_KEY, self.token, nx=True, px=ttl
+                )
+            )
+            if self.is_leader:
+                logging.info(f"Elected as the token event feed leader.")
+
+        return self.is_leader
+
+    async def load_state(self) -> None:
+        state = await self.state_rao.get(self.STATE_KEY)
+
+        if state:
+            self.events = state.get("events", {})
+            self.high_water_mark = state.get("highWaterMark")
+            logging.info(
+                f"Loaded {len(self.events)} token feed events with high-water mark {self.high_water_mark}."
+            )
+        else:
+            self.events = {}
+            self.high_water_mark = None
+
+    @staticmethod
+    def measures(record: dict) -> dict:
+        return {name: value for name, value in record.items() if value is not None}
+
+    @staticmethod
+    def merge(events: Dict[str, dict], columns: Dict[str, list]) -> int:
+        """
+        Merges the rows of a query into `events`, keeping the latest record of each event. Returns the number of
+        events which were added or updated.
+        """
+        if not columns["time_ms"]:
+            return 0
+
+        # Results may be shared with other callers, so the columns are not modified in place. The measures of an
+        # event are grouped by the time they were written, so records of an event are not mixed
+        times = [int(value) for value in columns["time_ms"]]
+        keys = list(zip(columns["eventHash"], times))
+        chains = dict(zip(keys, columns["blockchain"]))
+        records = group_measures(
+            {**columns, "key": keys},
+            index="key",
+            converters={"timestamp": lambda x: int(float(x))},
+        )
+
+        updated = 0
+        for (event_hash, time_ms), record in records.items():
+            event = events.get(event_hash)
+            if event is not None and event["time"] > time_ms:
+                continue
+
+            # Records are padded with every measure in the poll, so only the measures an event has are compared
+            measures = TokenEventFeed.measures(record)
+            if event is None or TokenEventFeed.measures(event["record"]) != measures:
+                updated += 1
+
+            events[event_hash] = {
+                "chain": chains[(event_hash, time_ms)],
+                "time": time_ms,
+                "timestamp": record.get("timestamp") or time_ms // 1000,
+                "record": record,
+            }
+
+        return updated
+
+    def apply(self, columns: Dict[str, list]) -> int:
+        """
+        Merges the rows of a poll into `events` and moves the high-water mark forward. Returns the number of events
+        which were added or updated.
+        """
+        updated = self.merge(self.events, columns)
+
+        if columns["time_ms"]:
+            self.high_water_mark = max(
+                self.high_water_mark or 0, max(int(t) for t in columns["time_ms"])
+            )
+
+        return updated
+
+    def select(self, events: Dict[str, dict]) -> Dict[str, list]:
+        """
+        Returns the (event hash, event) items of the feed of every chain and of "all" chains, most recent first.
+        """
+        ordered = sorted(
+            events.items(), key=lambda item: item[1]["timestamp"], reverse=True
+        )
+
+        selected = {ALL_CHAINS: ordered[: self.length]}
+        for chain in self.chains:
+            items = [item for item in ordered if item[1]["chain"] == chain]
+            selected[chain] = items[: self.length]
+
+        return selected
+
+    @staticmethod
+    def to_feeds(selected: Dict[str, list]) -> Dict[str, list]:
+        return {
+            chain: [event["record"] for _, event in items]
+            for chain, items in selected.items()
+        }
+
+    def render(self) -> Dict[str, list]:
+        """
+        Returns the feed of every chain and of "all" chains, most recent event first, and drops the events which are
+        no longer in any feed.
+        """
+        selected = self.select(self.events)
+
+        self.events = {
+            event_hash: event
+            for items in selected.values()
+            for event_hash, event in items
+        }
+
+        return self.to_feeds(selected)
+
+    async def poll(self) -> None:
+        if self.events is None:
+            await self.load_state()
+
+        # Measure values are kept as returned, as in the records served before the feeds were materialised
+        if self.high_water_mark is None:
+            columns = await self.query_latest()
+        else:
+            columns = await self.query_client.query(
+                TOKEN_EVENTS_SINCE_QUERY,
+                columns=["eventHash", "blockchain", "time_ms", *MEASURE_COLUMNS],
+                typed=False,
+                since=self.high_water_mark - self.overlap * 1000,
+            )
+
+        updated = self.apply(columns)
+
+        # The feeds are published after every poll, so their expiry is pushed back whilst the leader is alive
+        await self.feeds_rao.put_many(self.render())
+        await self.state_rao.put(
+            self.STATE_KEY,
+            {"highWaterMark": self.high_water_mark, "events": self.events},
+        )
+
+        self.last_polled = time.time()
+        logging.info(
+            f"Token event feeds materialised with {updated} new or updated events from {len(columns['time_ms'])} rows."
+        )
+
+    async def run(self) -> None:
+        while True:
+            try:
+                if await self.elect():
+                    await self.poll()
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst materialising the token event feeds: {e}"
+                )
+
+            await asyncio.sleep(self.poll_interval)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+        # Hand the leadership over straight away rather than after the lock expires
+        if self.is_leader:
+            try:
+                await acall(
+                    "unlock",
+                    self.client.eval,
+                    RELEASE_LOCK_SCRIPT,
+                    1,
+                    self.LOCK_KEY,
+                    self.token,
+                )
+            except Exception as e:
+                logging.error(
+                    f"Exception: Failed to release the token event feed leadership: {e}"
+                )
+            self.is_leader = False
+
+    def status(self) -> dict:
+        return {
+            "isLeader": self.is_leader,
+            "highWaterMark": self.high_water_mark,
+            "events": len(self.events) if self.events is not None else None,
+            "lastPolled": self.last_polled,
+        }
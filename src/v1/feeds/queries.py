@@ -0,0 +1,83 @@
+"""
+Timestream queries used by the feeds, run through `TimestreamQueryClient`.
+"""
+from src.v1.feeds.constants import (
+    MOST_VIEWED_TOKENS_QUERY_TTL,
+    TOP_EVENTS_QUERY_TTL,
+    TOKEN_FEED_POLL_INTERVAL,
+)
+from src.v1.shared.timestream_query import QueryTemplate
+
+# Most viewed tokens in the past `num_minutes` minutes
+MOST_VIEWED_TOKENS_QUERY = QueryTemplate(
+    "mostviewedtokens",
+    """
+    SELECT "chain", "token_address", COUNT("token_address") as "count"
+    FROM "rug_api_db"."reviewlogs" AS te
+    WHERE time between ago({num_minutes}m) and now()
+    GROUP BY "chain", "token_address"
+    ORDER BY "count" DESC
+    LIMIT {limit}
+    """,
+    ttl=MOST_VIEWED_TOKENS_QUERY_TTL,
+)
+
+# Most clicked events in the past `num_minutes` minutes
+MOST_VIEWED_EVENTS_QUERY = QueryTemplate(
+    "mostviewedevents",
+    """
+    SELECT "event_hash", COUNT("event_hash") as "count"
+    FROM "rug_api_db"."eventlogs" AS te
+    WHERE time between ago({num_minutes}m) and now()
+    GROUP BY "event_hash"
+    ORDER BY "count" DESC
+    LIMIT {limit}
+    """,
+    ttl=TOP_EVENTS_QUERY_TTL,
+)
+
+# Every measure of the given events
+TOKEN_EVENTS_BY_HASH_QUERY = QueryTemplate(
+    "tokeneventsbyhash",
+    """
+    SELECT te.*
+    FROM "rug_feed_db"."tokenevents" AS te
+    WHERE te.eventHash IN ({event_hashes})
+    """,
+    ttl=TOP_EVENTS_QUERY_TTL,
+)
+
+# Measures of the token events written since `since`, in milliseconds, polled by `TokenEventFeed`
+TOKEN_EVENTS_SINCE_QUERY = QueryTemplate(
+    "tokeneventssince",
+    """
+    SELECT eventHash, blockchain, to_milliseconds(time) AS time_ms, measure_name,
+        "measure_value::double", "measure_value::varchar"
+    FROM "rug_feed_db"."tokenevents"
+    WHERE time > from_milliseconds({since}) AND eventHash IS NOT NULL
+    ORDER BY time ASC
+    """,
+)
+
+# Measures of the `length` most recent events of each chain written in the past `window` seconds, which fill the
+# feeds of a leader without previous state and are served whilst the feeds are not materialised. Results are cached
+# for one poll interval, so that every worker falling back to this query shares a single query to Timestream
+TOKEN_EVENTS_LATEST_QUERY = QueryTemplate(
+    "tokeneventslatest",
+    """
+    WITH latest AS (
+        SELECT eventHash, blockchain,
+            ROW_NUMBER() OVER (PARTITION BY blockchain ORDER BY max(time) DESC) AS position
+        FROM "rug_feed_db"."tokenevents"
+        WHERE time > ago({window}s) AND eventHash IS NOT NULL
+        GROUP BY eventHash, blockchain
+    )
+    SELECT te.eventHash, te.blockchain, to_milliseconds(te.time) AS time_ms, te.measure_name,
+        te."measure_value::double", te."measure_value::varchar"
+    FROM "rug_feed_db"."tokenevents" AS te
+    JOIN latest ON te.eventHash = latest.eventHash AND te.blockchain = latest.blockchain
+    WHERE te.time > ago({window}s) AND latest.position <= {length}
+    ORDER BY te.time ASC
+    """,
+    ttl=TOKEN_FEED_POLL_INTERVAL,
+)
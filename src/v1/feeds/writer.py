@@ -0,0 +1,211 @@
+"""
+Batched writes of feed events to Timestream, buffered in memory so that recording a view or a click does not wait
+for a `WriteRecords` call.
+"""
+import asyncio, logging, random
+from botocore.exceptions import BotoCoreError, ClientError
+
+from src.v1.shared.DAO import run_in_executor
+from src.v1.shared.metrics import METRICS
+from src.v1.feeds.exceptions import TimestreamWriteException
+from src.v1.feeds.constants import (
+    TIMESTREAM_WRITE_BATCH_SIZE,
+    TIMESTREAM_WRITE_FLUSH_INTERVAL,
+    TIMESTREAM_WRITE_QUEUE_SIZE,
+    TIMESTREAM_WRITE_ENQUEUE_TIMEOUT,
+    TIMESTREAM_WRITE_MAX_RETRIES,
+    TIMESTREAM_WRITE_RETRY_BACKOFF,
+    TIMESTREAM_WRITE_SHUTDOWN_TIMEOUT,
+)
+
+
+class TimestreamBatchWriter:
+    """
+    Buffers Timestream records in memory and writes them in batches on a background task.
+
+    Records are appended to a bounded queue on the request path. Every `flush_interval` seconds after the first record
+    arrives, the queue is drained and its records are written with one `WriteRecords` call per table and per
+    `batch_size` records. Throttled calls, internal server errors and network errors are retried with exponential
+    backoff. When the queue is full, `post` waits for up to `enqueue_timeout` seconds for space before raising a
+    `TimestreamWriteException`, so that a Timestream outage slows ingestion down rather than exhausting memory.
+
+    The records are generated, and written with the client of, the `TimestreamEventAdapter` given as `adapter`.
+    """
+
+    RETRYABLE_ERROR_CODES = {"ThrottlingException", "InternalServerException"}
+
+    def __init__(
+        self,
+        adapter,
+        batch_size: int = TIMESTREAM_WRITE_BATCH_SIZE,
+        flush_interval: float = TIMESTREAM_WRITE_FLUSH_INTERVAL,
+        max_queue_size: int = TIMESTREAM_WRITE_QUEUE_SIZE,
+        enqueue_timeout: float = TIMESTREAM_WRITE_ENQUEUE_TIMEOUT,
+        max_retries: int = TIMESTREAM_WRITE_MAX_RETRIES,
+        retry_backoff: float = TIMESTREAM_WRITE_RETRY_BACKOFF,
+    ) -> None:
+        self.adapter = adapter
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_queue_size = max_queue_size
+        self.enqueue_timeout = enqueue_timeout
+        self.max_retries = max_retries
+        self.retry_backoff = retry_backoff
+
+        self.queue = None
+        self._task = None
+
+    async def post(self, table_name: str, message: dict) -> None:
+        try:
+            records = self.adapter.generate_records(table_name, message)
+        except Exception as e:
+            message = f"Exception: An error occurred whilst generating records: {e}"
+            logging.error(message)
+            raise TimestreamWriteException(message=message)
+
+        # Records are written directly until the background task has been started, e.g. outside of the server
+        if self.queue is None:
+            await run_in_executor(self.adapter.post, table_name, message)
+            return
+
+        for record in records:
+            try:
+                await asyncio.wait_for(
+                    self.queue.put((table_name, record)), timeout=self.enqueue_timeout
+                )
+            except asyncio.TimeoutError:
+                METRICS.increment("timestream_records_rejected_total", table=table_name)
+                raise TimestreamWriteException(
+                    message=f"Exception: The Timestream write queue has been full for {self.enqueue_timeout}s, the record for {table_name} was not recorded."
+                )
+
+    async def write_batch(self, table_name: str, records: list) -> None:
+        for attempt in range(self.max_retries + 1):
+            try:
+                with METRICS.timer("timestream_write_seconds", table=table_name):
+                    await run_in_executor(
+                        self.adapter.client.write_records,
+                        DatabaseName=self.adapter.database,
+                        TableName=table_name,
+                        Records=records,
+                    )
+                METRICS.increment(
+                    "timestream_records_written_total", len(records), table=table_name
+                )
+                return
+            except ClientError as e:
+                code = e.response["Error"]["Code"]
+
+                if code == "RejectedRecordsException":
+                    # The records which were not rejected have been written, so the batch is not sent again
+                    rejected_records = e.response.get(
+                        "RejectedRecords",
+                        e.response["Error"].get("RejectedRecords", []),
+                    )
+                    for record in rejected_records:
+                        logging.error(
+                            f"Exception: Record {record.get('RecordIndex')} for {table_name} was rejected due to: {record.get('Reason')}"
+                        )
+                    METRICS.increment(
+                        "timestream_records_written_total",
+                        len(records) - len(rejected_records),
+                        table=table_name,
+                    )
+                    METRICS.increment(
+                        "timestream_records_dropped_total",
+                        len(rejected_records),
+                        table=table_name,
+                        reason=code,
+                    )
+                    return
+
+                if code not in self.RETRYABLE_ERROR_CODES:
+                    logging.error(
+                        f"Exception: Error code {code}. Dropping a batch of {len(records)} records for {table_name}: {e}"
+                    )
+                    METRICS.increment(
+                        "timestream_records_dropped_total",
+                        len(records),
+                        table=table_name,
+                        reason=code,
+                    )
+                    return
+
+                error = e
+            except BotoCoreError as e:
+                error = e
+
+            if attempt < self.max_retries:
+                delay = self.retry_backoff * 2**attempt
+                logging.warning(
+                    f"Writing a batch of {len(records)} records for {table_name} failed, retrying in {delay:.2f}s: {error}"
+                )
+                await asyncio.sleep(delay * random.uniform(0.5, 1.5))
+
+        logging.error(
+            f"Exception: Dropping a batch of {len(records)} records for {table_name} after {self.max_retries} retries: {error}"
+        )
+        METRICS.increment(
+            "timestream_records_dropped_total",
+            len(records),
+            table=table_name,
+            reason="retries_exhausted",
+        )
+
+    async def flush(self, items: list) -> None:
+        batches = {}
+        for table_name, record in items:
+            batches.setdefault(table_name, []).append(record)
+
+        for table_name, records in batches.items():
+            for i in range(0, len(records), self.batch_size):
+                try:
+                    await self.write_batch(table_name, records[i : i + self.batch_size])
+                except Exception as e:
+                    logging.error(
+                        f"Exception: An exception occurred whilst writing records for {table_name}: {e}"
+                    )
+
+    async def run(self) -> None:
+        while True:
+            items = [await self.queue.get()]
+
+            # Collect the records which arrive within the flush interval of the first one
+            await asyncio.sleep(self.flush_interval)
+            while not self.queue.empty():
+                items.append(self.queue.get_nowait())
+
+            try:
+                await self.flush(items)
+            finally:
+                for _ in items:
+                    self.queue.task_done()
+
+    def start(self) -> None:
+        if self.queue is None:
+            self.queue = asyncio.Queue(maxsize=self.max_queue_size)
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self, timeout: float = TIMESTREAM_WRITE_SHUTDOWN_TIMEOUT) -> None:
+        if self._task is None:
+            return
+
+        # Give the buffered records a chance to be written before the task is cancelled
+        try:
+            await asyncio.wait_for(self.queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logging.error(
+                f"Exception: {self.queue.qsize()} buffered Timestream records were not written before shutdown."
+            )
+
+        self._task.cancel()
+        self._task = None
+
+    def status(self) -> dict:
+        return {
+            "queueDepth": self.queue.qsize() if self.queue is not None else 0,
+            "maxQueueSize": self.max_queue_size,
+            "running": self._task is not None and not self._task.done(),
+        }
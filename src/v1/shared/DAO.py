@@ -1,33 +1,66 @@
 """
 Data Access Object (DAO) class to store and retrieve data from a file.
 """
-import json, logging, boto3, time, redis, logging, os, dotenv
+import json, logging, boto3, time, logging, os, dotenv, asyncio, threading
+from concurrent.futures import ThreadPoolExecutor
+from decimal import Decimal
+from functools import partial
 from typing import Any, Dict, List, Optional
 from boto3.dynamodb.conditions import Key
-from decimal import Decimal
-from json import JSONEncoder
+from redis import asyncio as aioredis
 
+from src.v1.shared.cache import LocalCache, CacheInvalidationListener
+from src.v1.shared.codec import RAOCodec, DEFAULT_CODEC
 from src.v1.shared.exceptions import SQSException
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.redis_client import (
+    CLIENT_URL,
+    CLIENT_PORT,
+    REDIS_CIRCUIT_BREAKER,
+    get_redis_client,
+    get_async_redis_client,
+    call,
+    acall,
+)
 
 dotenv.load_dotenv()
 
-CLIENT_URL = os.environ.get("REDIS_CLIENT_URL")
-CLIENT_PORT = os.environ.get("REDIS_CLIENT_PORT")
+# Blocking boto3 calls made by the asynchronous access objects are offloaded to this pool
+AWS_EXECUTOR = ThreadPoolExecutor(
+    max_workers=int(os.environ.get("AWS_EXECUTOR_MAX_WORKERS", 32)),
+    thread_name_prefix="aws",
+)
+
+
+async def run_in_executor(func, *args, **kwargs):
+    """
+    Run a blocking function on the shared AWS thread pool without blocking the event loop.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(AWS_EXECUTOR, partial(func, *args, **kwargs))
+
 
-if not CLIENT_URL or not CLIENT_PORT:
-    logging.error(
-        f"Exception: Redis Client URL or Port not found in environment variables."
-    )
-    raise Exception(
-        "Exception: Redis Client URL or Port not found in environment variables."
-    )
+def to_dynamodb_number(value: Any) -> Any:
+    """
+    Convert a float back to the `Decimal` boto3 expects for DynamoDB numbers. Documents read from Redis have their
+    numbers decoded as floats, which boto3 rejects.
+    """
+    if isinstance(value, float):
+        return Decimal(int(value)) if value.is_integer() else Decimal(str(value))
+    return value
 
 
-class DecimalEncoder(JSONEncoder):
-    def default(self, o):
-        if isinstance(o, Decimal):
-            return float(o)
-        return super().default(o)
+# In-process cache shared by every RAO created with a `local_tte`, sized in bytes of serialised data
+LOCAL_CACHE = LocalCache(
+    max_bytes=int(os.environ.get("RAO_LOCAL_CACHE_MAX_BYTES", 64 * 1024 * 1024))
+)
+LOCAL_CACHE_INVALIDATION_CHANNEL = "rao_invalidations"
+# The subscription blocks on its connection indefinitely, so it has its own client without the pool's socket timeout
+LOCAL_CACHE_INVALIDATION_LISTENER = CacheInvalidationListener(
+    cache=LOCAL_CACHE,
+    create_client=lambda: aioredis.Redis(host=CLIENT_URL, port=CLIENT_PORT, db=0),
+    channel=LOCAL_CACHE_INVALIDATION_CHANNEL,
+)
 
 
 class RAO:
@@ -38,44 +71,282 @@ class RAO:
 
     It has a TTE (Time-To-Expiry) which determines after which amount of time cached keys expire.
 
-    It stores all data in a JSON-serialised string format on the Redis server.
+    It stores all data on the Redis server encoded by its `codec`, by default orjson with compression of large values.
+    Values stored as plain JSON strings by earlier versions are still decoded.
+
+    If a `local_tte` is given, deserialised values are also kept in the in-process `LOCAL_CACHE` for up to
+    `local_tte` seconds. Writes are published on `LOCAL_CACHE_INVALIDATION_CHANNEL`, so that other workers drop
+    their local copy of the key.
+
+    All RAOs share the connection pools in `src.v1.shared.redis_client`. Whilst `REDIS_CIRCUIT_BREAKER` is open,
+    reads are treated as misses and writes are skipped without contacting Redis.
     """
 
-    def __init__(self, prefix: str, tte: int = 15 * 60) -> None:
+    def __init__(
+        self,
+        prefix: str,
+        tte: int = 15 * 60,
+        local_tte: Optional[int] = None,
+        codec: Optional[RAOCodec] = None,
+    ) -> None:
         self.client_url = CLIENT_URL
         self.client_port = CLIENT_PORT
         self.prefix = prefix
         self.tte = tte  # 5 minutes until keys expire
+        self.local_tte = min(local_tte, tte) if local_tte else None
+        self.codec = codec or DEFAULT_CODEC
 
         if not self.client_url or not self.client_port:
             raise Exception("Exception: Redis Client URL or Port not found.")
 
-        self.client = redis.Redis(host=self.client_url, port=self.client_port, db=0)
+        self.client = self.create_client()
+
+    def create_client(self):
+        return get_redis_client()
 
     def generate_key(self, pk: str):
         return self.prefix + "_" + pk
 
+    def is_available(self) -> bool:
+        if REDIS_CIRCUIT_BREAKER.allow():
+            return True
+
+        logging.debug(f"Redis circuit is open, bypassing RAO {self.prefix}...")
+        METRICS.increment("rao_bypassed_total", prefix=self.prefix)
+        return False
+
+    def record_lookups(self, result: str, count: int = 1) -> None:
+        if count:
+            METRICS.increment(
+                "rao_lookups_total", value=count, prefix=self.prefix, result=result
+            )
+
+    def serialise(self, data: Any) -> bytes:
+        return self.codec.encode(data)
+
+    def deserialise(self, serialised_data) -> Any:
+        return self.codec.decode(serialised_data)
+
+    def cache_locally(self, key: str, data: Any, serialised_data) -> None:
+        if self.local_tte:
+            LOCAL_CACHE.put(key, data, size=len(serialised_data), ttl=self.local_tte)
+
     def put(self, pk: str, data: dict):
         key = self.generate_key(pk)
+        if not self.is_available():
+            return
+
         logging.info(f"Storing key {key} in Redis for {self.tte}s...")
-        serialised_data = json.dumps(data, cls=DecimalEncoder)
-        self.client.set(key, serialised_data, ex=self.tte)
+        # The write and its invalidation message are sent in a single round trip
+        pipeline = self.client.pipeline(transaction=False)
+        self.queue_put_many(pipeline, {pk: data})
+        call("set", pipeline.execute)
         logging.info(f"Key {key} stored in Redis for {self.tte}s...")
         return
 
     def get(self, pk: str):
         key = self.generate_key(pk)
-        serialised_data = self.client.get(key)
 
+        if self.local_tte:
+            data = LOCAL_CACHE.get(key)
+            if data is not None:
+                logging.debug(f"Key {key} was stored in the local cache...")
+                self.record_lookups("local_hit")
+                return data
+
+        if not self.is_available():
+            return None
+
+        serialised_data = call("get", self.client.get, key)
+        return self.deserialise_one(key, serialised_data)
+
+    def deserialise_one(self, key: str, serialised_data):
         if not serialised_data:
             logging.info(f"Key {key} was not stored in Redis...")
+            self.record_lookups("miss")
             return serialised_data
 
         logging.info(f"Key {key} was stored in Redis...")
-        data = json.loads(serialised_data, parse_float=float, parse_int=int)
+        self.record_lookups("hit")
+        data = self.deserialise(serialised_data)
+        self.cache_locally(key, data, serialised_data)
 
         return data
 
+    def get_many_locally(self, pks: List[str]):
+        """
+        Split `pks` into the data found in the local cache and the pks which have to be fetched from Redis.
+        """
+        output, missing = {}, []
+
+        for pk in pks:
+            data = LOCAL_CACHE.get(self.generate_key(pk)) if self.local_tte else None
+
+            if data is not None:
+                output[pk] = data
+            else:
+                missing.append(pk)
+
+        self.record_lookups("local_hit", len(output))
+        return output, missing
+
+    def deserialise_many(
+        self, pks: List[str], serialised_values: list
+    ) -> Dict[str, Any]:
+        output = {}
+
+        for pk, serialised_data in zip(pks, serialised_values):
+            if not serialised_data:
+                output[pk] = None
+                continue
+
+            data = self.deserialise(serialised_data)
+            self.cache_locally(self.generate_key(pk), data, serialised_data)
+            output[pk] = data
+
+        hits = sum(1 for data in output.values() if data)
+        self.record_lookups("hit", hits)
+        self.record_lookups("miss", len(output) - hits)
+        return output
+
+    def queue_put_many(self, pipeline, items: Dict[str, Any]) -> None:
+        for pk, data in items.items():
+            key = self.generate_key(pk)
+            serialised_data = self.serialise(data)
+            pipeline.set(key, serialised_data, ex=self.tte)
+
+            if self.local_tte:
+                # A round-tripped copy is cached, so local hits match Redis hits and later changes to `data` do not leak in
+                self.cache_locally(
+                    key, self.deserialise(serialised_data), serialised_data
+                )
+                pipeline.publish(
+                    LOCAL_CACHE_INVALIDATION_CHANNEL,
+                    CacheInvalidationListener.encode_message(key),
+                )
+
+    def put_many(self, items: Dict[str, Any]):
+        """
+        Store many keys in a single pipelined round trip.
+
+        Args:
+            items (dict): Mapping of pk to the data to store
+        """
+        if not items or not self.is_available():
+            return
+
+        logging.info(
+            f"Storing {len(items)} keys with prefix {self.prefix} in Redis for {self.tte}s..."
+        )
+        pipeline = self.client.pipeline(transaction=False)
+        self.queue_put_many(pipeline, items)
+        call("set_many", pipeline.execute)
+        return
+
+    def get_many(self, pks: List[str]) -> Dict[str, Any]:
+        """
+        Fetch many keys in a single MGET round trip, after checking the local cache.
+
+        Args:
+            pks (list): List of pks to fetch
+
+        Returns:
+            Dict[str, Any]: Mapping of each pk to its data, or None if the key was not stored
+        """
+        output, missing = self.get_many_locally(pks)
+
+        if missing and self.is_available():
+            serialised_values = call(
+                "mget", self.client.mget, [self.generate_key(pk) for pk in missing]
+            )
+            output.update(self.deserialise_many(missing, serialised_values))
+
+        logging.info(
+            f"{sum(1 for data in output.values() if data)} of {len(pks)} keys with prefix {self.prefix} were stored in Redis..."
+        )
+        return output
+
+
+class AsyncRAO(RAO):
+    """
+    Asynchronous Redis Access Object (RAO), backed by the `redis.asyncio` client.
+
+    It has the same method surface as `RAO`, except that `get` and `put` are coroutines, so cache reads and writes
+    from `async def` endpoints do not block the event loop.
+    """
+
+    def create_client(self):
+        return get_async_redis_client()
+
+    async def put(self, pk: str, data: dict):
+        key = self.generate_key(pk)
+        if not self.is_available():
+            return
+
+        logging.info(f"Storing key {key} in Redis for {self.tte}s...")
+        async with self.client.pipeline(transaction=False) as pipeline:
+            self.queue_put_many(pipeline, {pk: data})
+            await acall("set", pipeline.execute)
+        logging.info(f"Key {key} stored in Redis for {self.tte}s...")
+        return
+
+    async def get(self, pk: str):
+        key = self.generate_key(pk)
+
+        if self.local_tte:
+            data = LOCAL_CACHE.get(key)
+            if data is not None:
+                logging.debug(f"Key {key} was stored in the local cache...")
+                self.record_lookups("local_hit")
+                return data
+
+        if not self.is_available():
+            return None
+
+        serialised_data = await acall("get", self.client.get, key)
+        return self.deserialise_one(key, serialised_data)
+
+    async def put_many(self, items: Dict[str, Any]):
+        """
+        Store many keys in a single pipelined round trip.
+
+        Args:
+            items (dict): Mapping of pk to the data to store
+        """
+        if not items or not self.is_available():
+            return
+
+        logging.info(
+            f"Storing {len(items)} keys with prefix {self.prefix} in Redis for {self.tte}s..."
+        )
+        async with self.client.pipeline(transaction=False) as pipeline:
+            self.queue_put_many(pipeline, items)
+            await acall("set_many", pipeline.execute)
+        return
+
+    async def get_many(self, pks: List[str]) -> Dict[str, Any]:
+        """
+        Fetch many keys in a single MGET round trip, after checking the local cache.
+
+        Args:
+            pks (list): List of pks to fetch
+
+        Returns:
+            Dict[str, Any]: Mapping of each pk to its data, or None if the key was not stored
+        """
+        output, missing = self.get_many_locally(pks)
+
+        if missing and self.is_available():
+            serialised_values = await acall(
+                "mget", self.client.mget, [self.generate_key(pk) for pk in missing]
+            )
+            output.update(self.deserialise_many(missing, serialised_values))
+
+        logging.info(
+            f"{sum(1 for data in output.values() if data)} of {len(pks)} keys with prefix {self.prefix} were stored in Redis..."
+        )
+        return output
+
 
 class DAO:
     """
@@ -83,8 +354,14 @@ class DAO:
     Currently, we are using pickle to store data in a file.
     """
 
+    rao_class = RAO
+
     def __init__(
-        self, table_name: str, region_name: str = "eu-west-2", cache: bool = True
+        self,
+        table_name: str,
+        region_name: str = "eu-west-2",
+        cache: bool = True,
+        local_tte: Optional[int] = None,
     ) -> None:
         """
         Initialize DAO with a collection_name.
@@ -92,6 +369,8 @@ class DAO:
         Args:
             table_name (str): Name of DynamoDB table
             region_name (str): Name of the region
+            cache (bool): Whether to cache documents in Redis
+            local_tte (int): If given, documents are also cached in-process for this many seconds
         Raises:
             ValueError: If the partition key is not found
         """
@@ -99,7 +378,11 @@ class DAO:
         partition_range_name = None
         dynamodb = boto3.resource("dynamodb", region_name=region_name)
 
-        self.rao = RAO(prefix=table_name) if cache else None
+        self.table_name = table_name
+        self.region_name = region_name
+        self.rao = (
+            self.rao_class(prefix=table_name, local_tte=local_tte) if cache else None
+        )
 
         logging.info(
             f"DAO initialised for table {table_name}... And it has a RAO: {self.rao}"
@@ -190,6 +473,69 @@ class DAO:
             # Returning None here so that it's easy to do a check on whether a value exists
             return None
 
+    def _query(self, **kwargs) -> Dict[Any, Any]:
+        return self.table.query(**kwargs)
+
+    def _query_most_recent(self, partition_key_value: str) -> Optional[Dict[Any, Any]]:
+        response = self._query(
+            KeyConditionExpression=Key(self.partition_key_name).eq(partition_key_value),
+            ScanIndexForward=False,
+            Limit=1,
+        )
+
+        return response["Items"][0] if len(response["Items"]) == 1 else None
+
+    def find_most_recent_many(
+        self, partition_key_values: List[str]
+    ) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """
+        Find the most recent document for each of many partition key values.
+
+        All values are looked up in Redis with a single MGET, and only the values missing from Redis are queried
+        from DynamoDB. The documents found in DynamoDB are then written back to Redis in a single pipeline.
+
+        Args:
+            partition_key_values (list): Values of the partition key
+
+        Returns:
+            Dict[str, Optional[Dict[Any, Any]]]: Mapping of each partition key value to its most recent document,
+                or None if there is no document
+        """
+        partition_key_values = list(dict.fromkeys(partition_key_values))
+        output = self._get_many_from_cache(partition_key_values)
+
+        missing = [pk for pk in partition_key_values if pk not in output]
+        found = {}
+        for pk in missing:
+            data = self._query_most_recent(pk)
+            if data:
+                found[pk] = data
+
+        if self.rao and found:
+            try:
+                self.rao.put_many(found)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+
+        output.update(found)
+        return {pk: output.get(pk) for pk in partition_key_values}
+
+    def _get_many_from_cache(self, partition_key_values: List[str]) -> Dict[str, Any]:
+        if not self.rao:
+            return {}
+
+        try:
+            cached = self.rao.get_many(partition_key_values)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst fetching data from Redis: {e}"
+            )
+            return {}
+
+        return {pk: data for pk, data in cached.items() if data}
+
     def find_count_by_pk(self, partition_key_value: str) -> bool:
         """
         Find if a document exists that match the partition key and its respective value.
@@ -255,6 +601,342 @@ class DAO:
                 )
                 pass
 
+    def _update_item(self, **kwargs) -> Dict[Any, Any]:
+        return self.table.update_item(**kwargs)
+
+    def _get_update_kwargs(
+        self,
+        partition_key_value: str,
+        item: Dict[Any, Any],
+        attributes: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        key = {self.partition_key_name: to_dynamodb_number(partition_key_value)}
+        if self.partition_range_name:
+            key[self.partition_range_name] = to_dynamodb_number(
+                item[self.partition_range_name]
+            )
+
+        return {
+            "Key": key,
+            "UpdateExpression": "SET "
+            + ", ".join(f"#a{i} = :a{i}" for i in range(len(attributes))),
+            "ExpressionAttributeNames": {
+                f"#a{i}": name for i, name in enumerate(attributes)
+            },
+            "ExpressionAttributeValues": {
+                f":a{i}": to_dynamodb_number(value)
+                for i, value in enumerate(attributes.values())
+            },
+            # Never create a partial document if the original has been deleted
+            "ConditionExpression": f"attribute_exists({self.partition_key_name})",
+        }
+
+    def update_one(
+        self,
+        partition_key_value: str,
+        item: Dict[Any, Any],
+        attributes: Dict[str, Any],
+    ) -> Dict[Any, Any]:
+        """
+        Set some attributes of an existing document, without rewriting the rest of it.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+            item (dict): Document to be updated, which must carry its range key if the table has one
+            attributes (dict): Attributes to set on the document
+        Returns:
+            Dict[Any, Any]: The updated document
+        Raises:
+            ConditionalCheckFailedException: If the document does not exist
+        """
+        self._update_item(
+            **self._get_update_kwargs(partition_key_value, item, attributes)
+        )
+        item = {**item, **attributes}
+
+        if self.rao:
+            try:
+                # Update Redis
+                self.rao.put(partition_key_value, item)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+
+        return item
+
+
+class AsyncDAO(DAO):
+    """
+    Asynchronous Data Access Object (DAO) with the same method surface as `DAO`, where every method is a coroutine.
+
+    Redis reads and writes go through an `AsyncRAO`. The boto3 DynamoDB calls are blocking, so they are offloaded
+    to the shared `AWS_EXECUTOR` thread pool. boto3 resources are not thread-safe, hence each worker thread lazily
+    creates and keeps its own `Table` object.
+    """
+
+    rao_class = AsyncRAO
+
+    def __init__(
+        self,
+        table_name: str,
+        region_name: str = "eu-west-2",
+        cache: bool = True,
+        local_tte: Optional[int] = None,
+    ) -> None:
+        super().__init__(
+            table_name=table_name,
+            region_name=region_name,
+            cache=cache,
+            local_tte=local_tte,
+        )
+        self._local = threading.local()
+
+    def _thread_table(self):
+        table = getattr(self._local, "table", None)
+
+        if table is None:
+            dynamodb = boto3.session.Session().resource(
+                "dynamodb", region_name=self.region_name
+            )
+            table = dynamodb.Table(self.table_name)
+            self._local.table = table
+
+        return table
+
+    def _query(self, **kwargs) -> Dict[Any, Any]:
+        return self._thread_table().query(**kwargs)
+
+    def _put_item(self, **kwargs) -> Dict[Any, Any]:
+        return self._thread_table().put_item(**kwargs)
+
+    def _update_item(self, **kwargs) -> Dict[Any, Any]:
+        return self._thread_table().update_item(**kwargs)
+
+    async def find_all_by_pk(self, partition_key_value: str) -> List[Dict[Any, Any]]:
+        """
+        Find all documents that match the partition key and its respective value.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+
+        Returns:
+            List[Dict[Any, Any]]: List of matching documents
+        """
+        response = await run_in_executor(
+            self._query,
+            KeyConditionExpression=Key(self.partition_key_name).eq(partition_key_value),
+        )
+
+        return response["Items"]
+
+    async def find_most_recent_by_pk(self, partition_key_value: str) -> Dict[Any, Any]:
+        """
+        Find the most recent document that match the partition key and its respective value.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+
+        Returns:
+            Dict[Any, Any]: The most recent document if found, None otherwise
+        """
+        if self.rao:
+            try:
+                # Check if the key is in Redis
+                data = await self.rao.get(partition_key_value)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst fetching data from Redis: {e}"
+                )
+                data = None
+
+            if data:
+                logging.info(f"Key {partition_key_value} was stored in Redis...")
+                return data
+
+        logging.info(f"Key {partition_key_value} was not stored in Redis...")
+
+        # If not, fetch from DynamoDB
+        response = await run_in_executor(
+            self._query,
+            KeyConditionExpression=Key(self.partition_key_name).eq(partition_key_value),
+            ScanIndexForward=False,
+            Limit=1,
+        )
+
+        if len(response["Items"]) == 1:
+            data = response["Items"][0]
+            if self.rao:
+                try:
+                    # Store in Redis
+                    await self.rao.put(partition_key_value, data)
+                except Exception as e:
+                    logging.error(
+                        f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                    )
+                    pass
+
+            logging.info(f"Key {partition_key_value} was stored in Redis...")
+            return data
+        else:
+            # Returning None here so that it's easy to do a check on whether a value exists
+            return None
+
+    async def find_most_recent_many(
+        self, partition_key_values: List[str]
+    ) -> Dict[str, Optional[Dict[Any, Any]]]:
+        """
+        Find the most recent document for each of many partition key values.
+
+        All values are looked up in Redis with a single MGET, and the values missing from Redis are queried from
+        DynamoDB in parallel on the shared AWS thread pool. The documents found in DynamoDB are then written back to
+        Redis in a single pipeline.
+
+        Args:
+            partition_key_values (list): Values of the partition key
+
+        Returns:
+            Dict[str, Optional[Dict[Any, Any]]]: Mapping of each partition key value to its most recent document,
+                or None if there is no document
+        """
+        partition_key_values = list(dict.fromkeys(partition_key_values))
+        output = await self._get_many_from_cache(partition_key_values)
+
+        missing = [pk for pk in partition_key_values if pk not in output]
+        results = await asyncio.gather(
+            *[run_in_executor(self._query_most_recent, pk) for pk in missing]
+        )
+        found = {pk: data for pk, data in zip(missing, results) if data}
+
+        if self.rao and found:
+            try:
+                await self.rao.put_many(found)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+
+        output.update(found)
+        return {pk: output.get(pk) for pk in partition_key_values}
+
+    async def _get_many_from_cache(
+        self, partition_key_values: List[str]
+    ) -> Dict[str, Any]:
+        if not self.rao:
+            return {}
+
+        try:
+            cached = await self.rao.get_many(partition_key_values)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst fetching data from Redis: {e}"
+            )
+            return {}
+
+        return {pk: data for pk, data in cached.items() if data}
+
+    async def find_count_by_pk(self, partition_key_value: str) -> int:
+        """
+        Find if a document exists that match the partition key and its respective value.
+
+        Args:
+            partition_key_value: Value of the partition key
+
+        Returns:
+            int: Number of documents that match the partition key and its respective value
+        """
+        response = await run_in_executor(
+            self._query,
+            KeyConditionExpression=Key(self.partition_key_name).eq(partition_key_value),
+            Select="COUNT",
+        )
+        return response["Count"]
+
+    async def insert_one(self, partition_key_value: str, item: Dict[Any, Any]) -> None:
+        """
+        Insert a document with a partition key.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+            item (dict): Document to be inserted
+        Raises:
+            ConditionalCheckFailedException: If the document already exists
+        """
+        item[self.partition_key_name] = partition_key_value
+
+        logging.info(f"Inserting item {item} into DynamoDB...")
+        await run_in_executor(
+            self._put_item,
+            Item=item,
+            ConditionExpression=f"attribute_not_exists({self.partition_key_name})",
+        )
+
+        if self.rao:
+            try:
+                # Update Redis
+                await self.rao.put(partition_key_value, item)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+                pass
+
+    async def insert_new(self, partition_key_value: str, item: Dict[Any, Any]) -> None:
+        """
+        Insert a document with a partition key.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+            item (dict): Document to be inserted
+        """
+        item[self.partition_key_name] = partition_key_value
+        await run_in_executor(self._put_item, Item=item)
+
+        if self.rao:
+            try:
+                # Update Redis
+                await self.rao.put(partition_key_value, item)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+                pass
+
+    async def update_one(
+        self,
+        partition_key_value: str,
+        item: Dict[Any, Any],
+        attributes: Dict[str, Any],
+    ) -> Dict[Any, Any]:
+        """
+        Set some attributes of an existing document, without rewriting the rest of it.
+
+        Args:
+            partition_key_value (str): Value of the partition key
+            item (dict): Document to be updated, which must carry its range key if the table has one
+            attributes (dict): Attributes to set on the document
+        Returns:
+            Dict[Any, Any]: The updated document
+        Raises:
+            ConditionalCheckFailedException: If the document does not exist
+        """
+        await run_in_executor(
+            self._update_item,
+            **self._get_update_kwargs(partition_key_value, item, attributes),
+        )
+        item = {**item, **attributes}
+
+        if self.rao:
+            try:
+                # Update Redis
+                await self.rao.put(partition_key_value, item)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst storing data in Redis: {e}"
+                )
+
+        return item
+
 
 class DatabaseQueueObject:
     """Object to interact with DynamoDB and SQS."""
@@ -330,3 +1012,73 @@ class DatabaseQueueObject:
                     raise SQSException()
 
         return item
+
+
+class AsyncDatabaseQueueObject(DatabaseQueueObject):
+    """Asynchronous variant of `DatabaseQueueObject`, backed by an `AsyncDAO` and a thread-offloaded SQS client."""
+
+    def __init__(
+        self,
+        table_name: str,
+        queue_url: str,
+        region_name: str = "eu-west-2",
+        staleness: Optional[int] = None,
+    ) -> None:
+        self.DAO = AsyncDAO(table_name=table_name, region_name=region_name)
+        self.sqs = boto3.client("sqs", region_name=region_name)
+        self.queue_url = queue_url
+        self.staleness = staleness
+
+    async def get_item(
+        self,
+        pk: str,
+        MessageGroupId: str,
+        message_data: dict,
+        post_to_queue: bool = True,
+    ) -> Optional[dict]:
+        """Try to find most recent in DynamoDB, otherwise send a message to SQS.
+
+        See `DatabaseQueueObject.get_item` for the full description of the queueing behaviour.
+
+        Args:
+            pk (str): Partition key
+            MessageGroupId (str): MessageGroupId to send to SQS
+            message_data (dict): Message to send to SQS
+
+        Returns:
+            Optional[dict]: If the item is found in DynamoDB, return the item, otherwise create a message
+                in SQS and return None
+        """
+        item = await self.DAO.find_most_recent_by_pk(partition_key_value=pk)
+
+        to_queue = False
+
+        # Check whether the item is stale or exists
+        if item and item.get("timestamp"):
+            if self.staleness:
+                is_stale = (
+                    int(time.time()) - int(item.get("timestamp")) > self.staleness
+                )
+                logging.info(f"Item found is stale: {is_stale}")
+                to_queue = True if is_stale else False
+
+        if item is None or to_queue:
+            if post_to_queue:
+                try:
+                    # boto3 clients are thread-safe, so the shared client can be used from the pool
+                    await run_in_executor(
+                        self.sqs.send_message,
+                        QueueUrl=self.queue_url,
+                        MessageBody=json.dumps(message_data),
+                        MessageGroupId=MessageGroupId,
+                        MessageDeduplicationId=MessageGroupId,
+                    )
+
+                    logging.info(f"Success: Message sent to SQS: {message_data}")
+                except Exception as e:
+                    logging.error(
+                        f"Exception: An error occurred whilst sending a message to SQS: {e}"
+                    )
+                    raise SQSException()
+
+        return item
@@ -0,0 +1,97 @@
+"""
+Micro-batching of concurrent lookups against APIs which accept many keys per call.
+
+Lookups for the same group (e.g. the chain of a token) which arrive within `window` seconds of each other are
+collected and sent as a single call to `fetch_many`, and each caller then receives its own result from the response.
+A batch is sent early once it holds `max_batch_size` distinct keys.
+"""
+import asyncio, logging
+from typing import Any, Awaitable, Callable, Dict, List
+
+
+class Batcher:
+    """
+    Collects concurrent lookups per group into batched calls.
+
+    Args:
+        name (str): Name of the upstream, used in logs
+        fetch_many: Coroutine function taking a group and a list of keys, and returning a dict mapping each key found
+            to its result. Keys missing from the dict raise a `KeyError` in their callers.
+        window (float): Time in seconds for which lookups are collected before the batch is sent
+        max_batch_size (int): Maximum number of distinct keys in a single call
+    """
+
+    def __init__(
+        self,
+        name: str,
+        fetch_many: Callable[[str, List[str]], Awaitable[Dict[str, Any]]],
+        window: float,
+        max_batch_size: int,
+    ) -> None:
+        self.name = name
+        self.fetch_many = fetch_many
+        self.window = window
+        self.max_batch_size = max_batch_size
+
+        self.pending: Dict[str, Dict[str, List[asyncio.Future]]] = {}
+        self.timers: Dict[str, asyncio.TimerHandle] = {}
+
+        # References to the running batches are kept until they finish, so they are not garbage collected
+        self.tasks = set()
+
+    async def get(self, group: str, key: str) -> Any:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        batch = self.pending.setdefault(group, {})
+        batch.setdefault(key, []).append(future)
+
+        if len(batch) >= self.max_batch_size:
+            self.flush(group)
+        elif group not in self.timers:
+            self.timers[group] = loop.call_later(self.window, self.flush, group)
+
+        return await future
+
+    def flush(self, group: str) -> None:
+        timer = self.timers.pop(group, None)
+        if timer is not None:
+            timer.cancel()
+
+        batch = self.pending.pop(group, None)
+        if not batch:
+            return
+
+        task = asyncio.ensure_future(self._execute(group, batch))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _execute(self, group: str, batch: Dict[str, List[asyncio.Future]]):
+        logging.info(
+            f"Sending a batch of {len(batch)} {self.name} lookups for {group}..."
+        )
+
+        try:
+            results = await self.fetch_many(group, list(batch))
+        except Exception as e:
+            logging.error(
+                f"Exception: A batch of {len(batch)} {self.name} lookups for {group} failed: {e}"
+            )
+            results, error = {}, e
+        else:
+            error = None
+
+        for key, futures in batch.items():
+            for future in futures:
+                # Callers which were cancelled whilst waiting are skipped
+                if future.done():
+                    continue
+
+                if error is not None:
+                    future.set_exception(error)
+                elif key in results:
+                    future.set_result(results[key])
+                else:
+                    future.set_exception(
+                        KeyError(f"{key} was not returned by {self.name}.")
+                    )
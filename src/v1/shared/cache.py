@@ -0,0 +1,161 @@
+"""
+In-process (L1) cache which sits in front of the Redis RAO.
+
+Entries are stored already deserialised, so a hit costs neither a Redis round trip nor a `json.loads`. The cache is
+bounded by the total size of the serialised values it holds, evicting the least recently used entries first, and
+every entry expires after its own TTL.
+
+Each worker has its own L1 cache, so writes are broadcast on a Redis pub/sub channel and every other worker drops its
+copy of the written key. Every hit returns a deep copy of the cached object, so callers may modify what they are
+given without corrupting the entry seen by other requests.
+"""
+import asyncio, copy, logging, threading, time, uuid
+from collections import OrderedDict
+from typing import Any, Optional, Tuple
+
+# Identifies this process in invalidation messages, so that a worker ignores its own writes
+ORIGIN = uuid.uuid4().hex
+
+
+class LocalCache:
+    """
+    Thread-safe TTL/LRU cache sized in bytes.
+
+    Args:
+        max_bytes (int): Maximum total size of the cached values, measured by the length of their serialised form
+    """
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+
+        self._entries: "OrderedDict[str, Tuple[float, int, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] < time.time():
+                if entry is not None:
+                    self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            value = entry[2]
+
+        # Copied outside the lock, since the entry itself is never modified
+        return copy.deepcopy(value)
+
+    def put(self, key: str, value: Any, size: int, ttl: float) -> None:
+        # Values which would take up most of the cache are not worth evicting everything else for
+        if size > self.max_bytes // 4:
+            self.invalidate(key)
+            return
+
+        with self._lock:
+            self._remove(key)
+
+            self._entries[key] = (time.time() + ttl, size, value)
+            self.size += size
+
+            while self.size > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= entry[1]
+
+    def status(self) -> dict:
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "maxBytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+class CacheInvalidationListener:
+    """
+    Background task which drops keys from a `LocalCache` when another worker writes them to Redis.
+
+    If the subscription is lost, the whole local cache is cleared before resubscribing, since invalidations may have
+    been missed in the meantime.
+
+    Args:
+        cache (LocalCache): Cache to invalidate
+        create_client: Callable returning a new `redis.asyncio.Redis` client
+        channel (str): Name of the pub/sub channel carrying invalidation messages
+    """
+
+    def __init__(self, cache: LocalCache, create_client, channel: str) -> None:
+        self.cache = cache
+        self.create_client = create_client
+        self.channel = channel
+
+        self._task = None
+
+    @staticmethod
+    def encode_message(key: str) -> str:
+        return f"{ORIGIN}|{key}"
+
+    def handle_message(self, message: bytes) -> None:
+        origin, _, key = message.decode("utf-8").partition("|")
+
+        if origin != ORIGIN:
+            self.cache.invalidate(key)
+
+    async def run(self) -> None:
+        while True:
+            client = self.create_client()
+            pubsub = client.pubsub(ignore_subscribe_messages=True)
+
+            try:
+                await pubsub.subscribe(self.channel)
+                logging.info(f"Subscribed to cache invalidations on {self.channel}.")
+
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        self.handle_message(message["data"])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logging.error(
+                    f"Exception: Lost the cache invalidation subscription on {self.channel}: {e}"
+                )
+            finally:
+                self.cache.clear()
+                try:
+                    await pubsub.close()
+                    await client.close()
+                except Exception:
+                    pass
+
+            await asyncio.sleep(1)
+
+    def start(self) -> None:
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
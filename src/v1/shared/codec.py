@@ -0,0 +1,176 @@
+"""
+Binary codecs for values stored in Redis by the RAO.
+
+Every encoded value starts with a 4-byte header: a magic byte, the header version, the serialisation format and the
+compression applied to the body. The magic byte (0xFF) can never start a UTF-8 encoded JSON document, so values
+written before the header was introduced are recognised and decoded as plain JSON.
+
+Values are serialised with orjson (or msgpack), falling back to the standard library `json` module when neither is
+installed, and bodies above `compression_threshold` bytes are compressed with zstd, or zlib when `zstandard` is not
+installed. Compression is kept only if it makes the value smaller.
+"""
+import json, logging, zlib
+from decimal import Decimal
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+MAGIC = 0xFF
+HEADER_VERSION = 1
+HEADER_SIZE = 4
+
+FORMAT_JSON = 0
+FORMAT_ORJSON = 1
+FORMAT_MSGPACK = 2
+
+COMPRESSION_NONE = 0
+COMPRESSION_ZLIB = 1
+COMPRESSION_ZSTD = 2
+
+FORMATS = {"json": FORMAT_JSON, "orjson": FORMAT_ORJSON, "msgpack": FORMAT_MSGPACK}
+COMPRESSIONS = {
+    None: COMPRESSION_NONE,
+    "zlib": COMPRESSION_ZLIB,
+    "zstd": COMPRESSION_ZSTD,
+}
+
+
+def default(o):
+    if isinstance(o, Decimal):
+        return float(o)
+    raise TypeError(f"Object of type {type(o).__name__} is not serialisable")
+
+
+class DecimalEncoder(json.JSONEncoder):
+    def default(self, o):
+        if isinstance(o, Decimal):
+            return float(o)
+        return super().default(o)
+
+
+def dumps(data: Any, fmt: int) -> bytes:
+    if fmt == FORMAT_ORJSON:
+        return orjson.dumps(data, default=default, option=orjson.OPT_NON_STR_KEYS)
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.packb(data, default=default, use_bin_type=True)
+    return json.dumps(data, cls=DecimalEncoder).encode("utf-8")
+
+
+def loads(body: bytes, fmt: int) -> Any:
+    if fmt == FORMAT_ORJSON:
+        return orjson.loads(body)
+    if fmt == FORMAT_MSGPACK:
+        return msgpack.unpackb(body, raw=False, strict_map_key=False)
+    return json.loads(body, parse_float=float, parse_int=int)
+
+
+class RAOCodec:
+    """
+    Encodes values into the versioned binary format stored in Redis, and decodes both that format and legacy JSON.
+
+    Args:
+        fmt (str): Serialisation format, one of "orjson", "msgpack" or "json"
+        compression (str): Compression applied to large values, one of "zstd", "zlib" or None
+        compression_threshold (int): Bodies of at least this many bytes are compressed
+        compression_level (int): Compression level passed to the compressor
+    """
+
+    def __init__(
+        self,
+        fmt: str = "orjson",
+        compression: Optional[str] = "zstd",
+        compression_threshold: int = 1024,
+        compression_level: int = 3,
+    ) -> None:
+        if fmt == "orjson" and orjson is None:
+            fmt = "json"
+        if fmt == "msgpack" and msgpack is None:
+            fmt = "orjson" if orjson is not None else "json"
+        if compression == "zstd" and zstandard is None:
+            compression = "zlib"
+
+        self.fmt = FORMATS[fmt]
+        self.compression = COMPRESSIONS[compression]
+        self.compression_threshold = compression_threshold
+        self.compression_level = compression_level
+
+    @property
+    def name(self) -> str:
+        fmt = next(name for name, value in FORMATS.items() if value == self.fmt)
+        compression = next(
+            name for name, value in COMPRESSIONS.items() if value == self.compression
+        )
+        return f"{fmt}+{compression}" if compression else fmt
+
+    def __repr__(self) -> str:
+        return (
+            f"RAOCodec({self.name}, compression_threshold={self.compression_threshold})"
+        )
+
+    # zstd contexts are not thread-safe, so one is created per call
+    def compress(self, body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_ZSTD:
+            return zstandard.ZstdCompressor(level=self.compression_level).compress(body)
+        return zlib.compress(body, self.compression_level)
+
+    def decompress(self, body: bytes, compression: int) -> bytes:
+        if compression == COMPRESSION_ZSTD:
+            if zstandard is None:
+                raise ValueError(
+                    "Value is zstd compressed but zstandard is not installed."
+                )
+            return zstandard.ZstdDecompressor().decompress(body)
+        return zlib.decompress(body)
+
+    def encode(self, data: Any) -> bytes:
+        fmt = self.fmt
+
+        try:
+            body = dumps(data, fmt)
+        except (TypeError, OverflowError) as e:
+            # e.g. integers above 64 bits, which orjson and msgpack cannot represent
+            logging.debug(f"Falling back to JSON serialisation: {e}")
+            fmt = FORMAT_JSON
+            body = dumps(data, fmt)
+
+        compression = COMPRESSION_NONE
+        if self.compression and len(body) >= self.compression_threshold:
+            compressed = self.compress(body, self.compression)
+            if len(compressed) < len(body):
+                body, compression = compressed, self.compression
+
+        return bytes((MAGIC, HEADER_VERSION, fmt, compression)) + body
+
+    def decode(self, raw) -> Any:
+        if isinstance(raw, str):
+            raw = raw.encode("utf-8")
+
+        # Values written before the header was introduced are plain JSON
+        if not raw or raw[0] != MAGIC:
+            return loads(raw, FORMAT_JSON)
+
+        version, fmt, compression = raw[1], raw[2], raw[3]
+        if version != HEADER_VERSION:
+            raise ValueError(f"Unsupported RAO codec header version {version}.")
+
+        body = memoryview(raw)[HEADER_SIZE:]
+        if compression != COMPRESSION_NONE:
+            body = self.decompress(body, compression)
+
+        return loads(bytes(body), fmt)
+
+
+DEFAULT_CODEC = RAOCodec()
@@ -1,3 +1,5 @@
+import os
+
 ETHEREUM_CHAIN_ID = 1
 BSC_CHAIN_ID = 56
 ARBITRUM_CHAIN_ID = 42161
@@ -31,3 +33,88 @@ CHAIN_SYMBOL_MAPPING = {
     "arbitrum": "arb",
     "base": "base",
 }
+
+GO_PLUS_TOKEN_SECURITY_URL = "https://api.gopluslabs.io/api/v1/token_security/{}"
+
+# GoPlus responses are shared by the token, simulation and chart endpoints for this many seconds
+GO_PLUS_CACHE_TTL = 60
+GO_PLUS_LOCAL_CACHE_TTL = 30
+
+# Concurrent GoPlus lookups on the same chain are collected for this many seconds and sent as one call
+GO_PLUS_BATCH_WINDOW = 0.02
+GO_PLUS_BATCH_SIZE = 20
+
+# Connection pool, timeout, concurrency and rate limit settings for each upstream data provider
+# Timeouts are in seconds, `concurrency` caps the number of in-flight requests per worker
+# `rate_limit` is the sustained number of requests per second per API key, and `burst` the number sent at once, both
+# shared by every worker. Providers with `per_api_key` set to False have one bucket, whichever credentials are used
+UPSTREAM_HTTP_CONFIG = {
+    "goplus": {
+        "timeout": 10.0,
+        "connect_timeout": 3.0,
+        "max_connections": 20,
+        "max_keepalive_connections": 10,
+        "concurrency": 20,
+        "rate_limit": 5.0,
+        "burst": 10,
+        "per_api_key": False,  # The access token is rotated, but the limit applies to the app
+    },
+    "block_explorer": {
+        "timeout": 10.0,
+        "connect_timeout": 3.0,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "concurrency": 10,
+        "rate_limit": 4.0,  # Etherscan allows 5 calls in any second per API key
+        "burst": 1,
+    },
+    "geckoterminal": {
+        "timeout": 8.0,
+        "connect_timeout": 3.0,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "concurrency": 10,
+        "rate_limit": 0.45,  # GeckoTerminal allows 30 calls/min, including the burst
+        "burst": 3,
+    },
+    "cryptocompare": {
+        "timeout": 5.0,
+        "connect_timeout": 2.0,
+        "max_connections": 10,
+        "max_keepalive_connections": 5,
+        "concurrency": 10,
+        "rate_limit": 10.0,
+        "burst": 10,
+    },
+}
+
+# Requests answered with a 429 are retried this many times, after waiting for at most `UPSTREAM_MAX_RETRY_AFTER` seconds
+UPSTREAM_RATE_LIMIT_RETRIES = 1
+UPSTREAM_MAX_RETRY_AFTER = 10.0
+
+# Rate limit buckets are kept in Redis, and this many seconds after their last use they expire
+UPSTREAM_RATE_LIMIT_TTL = 60
+
+# Number of worker processes, read by uvicorn as the default of `--workers`. If Redis is unavailable, each worker
+# falls back to a local bucket with its share of the rate limit
+WORKER_COUNT = max(1, int(os.environ.get("WEB_CONCURRENCY", 1)))
+
+# Multicall3 is deployed at the same address on every supported chain
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+MULTICALL_BATCH_SIZE = 200
+
+# Single-flight settings for report recomputation, all values are in seconds
+SINGLE_FLIGHT_LOCK_TTL = 30
+SINGLE_FLIGHT_WAIT_TIMEOUT = 20
+SINGLE_FLIGHT_POLL_INTERVAL = 0.1
+
+# Shared Redis connection pool settings, all times are in seconds
+REDIS_MAX_CONNECTIONS = 64
+REDIS_POOL_TIMEOUT = 0.5  # Maximum wait for a free connection when the pool is exhausted
+REDIS_SOCKET_TIMEOUT = 0.5
+REDIS_SOCKET_CONNECT_TIMEOUT = 0.5
+REDIS_HEALTH_CHECK_INTERVAL = 30
+
+# Redis is bypassed for `REDIS_CIRCUIT_COOLDOWN` seconds after this many consecutive connection failures or timeouts
+REDIS_CIRCUIT_FAILURE_THRESHOLD = 5
+REDIS_CIRCUIT_COOLDOWN = 15
@@ -1,5 +1,5 @@
-import random, logging
-from typing import Union
+import random, logging, asyncio
+from typing import Any, Awaitable, Union
 from web3 import Web3
 import json, dotenv, os, time
 from goplus import auth
@@ -60,6 +60,47 @@ def get_primary_key(token_address: str, chain: Union[str, ChainEnum]) -> str:
         return f"{token_address.lower()}_{str(chain)}"
 
 
+# Tasks which outlived their deadline, referenced until they finish since the event loop only keeps weak references
+BACKGROUND_TASKS = set()
+
+
+def run_in_background(task: asyncio.Task, description: str) -> None:
+    def done(task: asyncio.Task) -> None:
+        BACKGROUND_TASKS.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logging.error(
+                f"Exception: {description} failed after its deadline: {task.exception()}"
+            )
+
+    BACKGROUND_TASKS.add(task)
+    task.add_done_callback(done)
+
+
+async def with_deadline(
+    awaitable: Awaitable, timeout: float, default: Any, description: str
+) -> Any:
+    """
+    Await `awaitable` for at most `timeout` seconds, returning `default` if the deadline passes.
+
+    The awaitable runs in its own task, shielded from the deadline, so that work which misses it still completes in
+    the background and fills its caches for the next request.
+    """
+    task = asyncio.ensure_future(awaitable)
+
+    try:
+        return await asyncio.wait_for(asyncio.shield(task), timeout=timeout)
+    except asyncio.TimeoutError:
+        logging.warning(
+            f"Exception: Deadline of {timeout} seconds exceeded for {description}, continuing without it."
+        )
+        run_in_background(task, description)
+        return default
+    except asyncio.CancelledError:
+        # The request was cancelled, e.g. the client disconnected, but the work is still finished for the next one
+        run_in_background(task, description)
+        raise
+
+
 async def get_token_contract_details(chain: ChainEnum, token_address: str) -> dict:
     RPC = get_rpc_provider(chain)
 
@@ -0,0 +1,151 @@
+"""
+Shared asynchronous HTTP clients for calls to upstream data providers (GoPlus, block explorers, GeckoTerminal and
+CryptoCompare).
+
+Each upstream has its own `httpx.AsyncClient`, so connections are kept alive and reused between requests, together
+with its own timeouts and a semaphore which caps the number of in-flight requests. A slow upstream therefore only
+queues requests to itself, rather than blocking the event loop for every request served by the worker.
+
+Requests are also paced by a token bucket per upstream and API key, shared by every worker through Redis, see
+`src.v1.shared.rate_limiter`.
+"""
+import asyncio, logging, time
+import httpx
+from typing import Dict, Optional
+
+from src.v1.shared.constants import (
+    UPSTREAM_HTTP_CONFIG,
+    UPSTREAM_RATE_LIMIT_RETRIES,
+    UPSTREAM_MAX_RETRY_AFTER,
+)
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.rate_limiter import UpstreamRateLimiter
+
+
+class UpstreamClient:
+    """
+    Keep-alive connection pool, timeouts, concurrency cap and rate limit for a single upstream provider.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        connect_timeout: float,
+        max_connections: int,
+        max_keepalive_connections: int,
+        concurrency: int,
+        rate_limit: float,
+        burst: int,
+        per_api_key: bool = True,
+    ) -> None:
+        self.name = name
+        self.timeout = httpx.Timeout(timeout, connect=connect_timeout)
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+        )
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self.rate_limiter = UpstreamRateLimiter(
+            name, rate=rate_limit, burst=burst, per_api_key=per_api_key
+        )
+
+        # The client is created lazily so that it is bound to the event loop of the worker which uses it
+        self._client = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(timeout=self.timeout, limits=self.limits)
+        return self._client
+
+    @staticmethod
+    def get_api_key(params: Optional[dict], headers: Optional[dict]) -> Optional[str]:
+        params, headers = params or {}, headers or {}
+        return (
+            params.get("apikey")
+            or params.get("api_key")
+            or headers.get("Authorization")
+        )
+
+    def get_retry_after(self, response: httpx.Response, limiter) -> float:
+        try:
+            retry_after = float(response.headers.get("Retry-After"))
+        except (TypeError, ValueError):
+            retry_after = 1 / limiter.bucket.rate
+
+        return min(retry_after, UPSTREAM_MAX_RETRY_AFTER)
+
+    async def get(
+        self,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ) -> httpx.Response:
+        limiter = self.rate_limiter[self.get_api_key(params, headers)]
+
+        for attempt in range(UPSTREAM_RATE_LIMIT_RETRIES + 1):
+            await limiter.acquire()
+
+            async with self.semaphore:
+                start_time = time.time()
+                response = await self.client.get(url, params=params, headers=headers)
+
+            logging.debug(
+                f"GET request to upstream {self.name} returned {response.status_code} in {(time.time() - start_time):.2f} seconds."
+            )
+
+            if response.status_code != 429:
+                break
+
+            # Hold back every request with the same API key, in every worker, until the provider accepts requests again
+            retry_after = self.get_retry_after(response, limiter)
+            await limiter.block_for(retry_after)
+            METRICS.increment("upstream_throttled_total", upstream=self.name)
+            logging.warning(
+                f"Upstream {self.name} is rate limiting requests, pausing it for {retry_after:.2f} seconds."
+            )
+
+        return response
+
+    async def close(self) -> None:
+        if self._client is not None and not self._client.is_closed:
+            await self._client.aclose()
+
+
+class HTTPClientPool:
+    """
+    Registry of `UpstreamClient` objects, one for each provider in `UPSTREAM_HTTP_CONFIG`.
+    """
+
+    def __init__(self, config: Dict[str, dict]) -> None:
+        self.clients = {
+            name: UpstreamClient(name=name, **settings)
+            for name, settings in config.items()
+        }
+
+    def __getitem__(self, upstream: str) -> UpstreamClient:
+        if upstream not in self.clients:
+            raise ValueError(f"Upstream {upstream} has no HTTP client configured.")
+        return self.clients[upstream]
+
+    async def get(
+        self,
+        upstream: str,
+        url: str,
+        params: Optional[dict] = None,
+        headers: Optional[dict] = None,
+    ) -> httpx.Response:
+        return await self[upstream].get(url, params=params, headers=headers)
+
+    async def close(self) -> None:
+        for client in self.clients.values():
+            await client.close()
+
+    def status(self) -> dict:
+        return {
+            name: client.rate_limiter.status() for name, client in self.clients.items()
+        }
+
+
+HTTP_CLIENTS = HTTPClientPool(UPSTREAM_HTTP_CONFIG)
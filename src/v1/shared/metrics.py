@@ -0,0 +1,73 @@
+"""
+In-process counters and latency timers, exported by the `/metrics` endpoint.
+
+Metrics are identified by a name and an optional set of labels, e.g. `rao_lookups_total{prefix=chart,result=hit}`.
+Each worker keeps its own registry, so the values are per-process and reset when the worker restarts.
+"""
+import threading, time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Dict
+
+
+class Metrics:
+    """
+    Thread-safe registry of counters and latency timers.
+    """
+
+    def __init__(self) -> None:
+        self._counters: Dict[str, float] = defaultdict(float)
+        self._timers: Dict[str, Dict[str, float]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def generate_key(name: str, labels: dict) -> str:
+        if not labels:
+            return name
+        return (
+            name
+            + "{"
+            + ",".join(f"{label}={value}" for label, value in sorted(labels.items()))
+            + "}"
+        )
+
+    def increment(self, name: str, value: float = 1, **labels) -> None:
+        key = self.generate_key(name, labels)
+        with self._lock:
+            self._counters[key] += value
+
+    def observe(self, name: str, seconds: float, **labels) -> None:
+        key = self.generate_key(name, labels)
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is None:
+                timer = self._timers[key] = {"count": 0, "sum": 0.0, "max": 0.0}
+            timer["count"] += 1
+            timer["sum"] += seconds
+            timer["max"] = max(timer["max"], seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start_time, **labels)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "timers": {
+                    key: {
+                        "count": timer["count"],
+                        "sum": round(timer["sum"], 6),
+                        "mean": round(timer["sum"] / timer["count"], 6),
+                        "max": round(timer["max"], 6),
+                    }
+                    for key, timer in self._timers.items()
+                },
+            }
+
+
+METRICS = Metrics()
@@ -0,0 +1,97 @@
+"""
+Batch executor for read-only contract calls, using the Multicall3 contract to aggregate many `eth_call` requests
+into a single RPC round trip.
+"""
+import json, logging
+from typing import Any, List, Optional
+from eth_utils.abi import collapse_if_tuple
+from web3 import Web3
+
+from src.v1.shared.constants import MULTICALL3_ADDRESS, MULTICALL_BATCH_SIZE
+
+with open("src/v1/shared/files/multicall3.json", "r") as f:
+    MULTICALL3_ABI = json.load(f)
+
+
+class Multicall:
+    """
+    Collects contract calls with `add` and executes all of them with `execute`.
+
+    Calls are sent to Multicall3's `aggregate3` with `allowFailure` set, so a single reverting call does not fail the
+    rest of the batch. Large numbers of calls are split into chunks of `batch_size` to stay within the gas limit of
+    a single `eth_call`.
+    """
+
+    def __init__(
+        self, w3: Web3, network: str, batch_size: int = MULTICALL_BATCH_SIZE
+    ) -> None:
+        self.w3 = w3
+        self.network = network
+        self.batch_size = batch_size
+        self.contract = w3.eth.contract(
+            address=Web3.to_checksum_address(MULTICALL3_ADDRESS), abi=MULTICALL3_ABI
+        )
+        self.calls = []
+
+    def __len__(self) -> int:
+        return len(self.calls)
+
+    def add(self, contract, fn_name: str, args: List[Any]) -> int:
+        """
+        Queue a call to `fn_name` on `contract` with the given arguments.
+
+        Args:
+            contract: A web3 contract object
+            fn_name (str): Name of the function to call
+            args (list): Arguments of the function call
+
+        Returns:
+            int: The index of the call result in the list returned by `execute`
+        """
+        call_data = contract.encodeABI(fn_name=fn_name, args=args)
+        outputs = contract.get_function_by_name(fn_name).abi["outputs"]
+        output_types = [collapse_if_tuple(output) for output in outputs]
+
+        self.calls.append((contract.address, call_data, output_types))
+        return len(self.calls) - 1
+
+    def execute(self) -> List[Optional[tuple]]:
+        """
+        Execute all queued calls and clear the queue.
+
+        Returns:
+            List[Optional[tuple]]: Decoded return values in the order the calls were added, or None for calls which
+                reverted or could not be decoded
+        """
+        results = []
+
+        for start in range(0, len(self.calls), self.batch_size):
+            batch = self.calls[start : start + self.batch_size]
+
+            response = self.contract.functions.aggregate3(
+                [(target, True, call_data) for target, call_data, _ in batch]
+            ).call()
+
+            for (success, return_data), (target, _, output_types) in zip(
+                response, batch
+            ):
+                if not success or len(return_data) == 0:
+                    logging.warning(
+                        f"Multicall to {target} on chain {self.network} failed and is skipped."
+                    )
+                    results.append(None)
+                    continue
+
+                try:
+                    results.append(self.w3.codec.decode(output_types, return_data))
+                except Exception as e:
+                    logging.warning(
+                        f"Exception: Failed to decode the multicall result from {target} on chain {self.network}: {e}"
+                    )
+                    results.append(None)
+
+        logging.info(
+            f"Executed {len(self.calls)} calls on chain {self.network} in {len(range(0, len(self.calls), self.batch_size))} multicall requests."
+        )
+        self.calls = []
+        return results
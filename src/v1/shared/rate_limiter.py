@@ -0,0 +1,304 @@
+"""
+Token bucket rate limiting for calls to upstream data providers.
+
+Each provider, and each API key used with it, has its own token bucket which refills at the provider's sustained
+rate limit and holds at most `burst` tokens. Requests wait for a token rather than being sent into a 429, and
+waiting requests are released by priority, so that user-facing requests overtake background refreshes.
+
+The buckets are kept in Redis and updated atomically by a Lua script, so every worker and every replica draws from
+the same bucket. If Redis is unavailable, each worker falls back to a local bucket refilled at its share of the rate,
+the rate divided by `WORKER_COUNT`.
+
+The priority of a request is read from the `REQUEST_PRIORITY` context variable, which defaults to
+`PRIORITY_USER`. Background tasks set it to `PRIORITY_BACKGROUND` before calling upstream providers.
+"""
+import asyncio, hashlib, heapq, itertools, logging, time
+from contextvars import ContextVar
+from typing import Dict, Optional
+
+from src.v1.shared.constants import UPSTREAM_RATE_LIMIT_TTL, WORKER_COUNT
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.redis_client import (
+    REDIS_CIRCUIT_BREAKER,
+    get_async_redis_client,
+    acall,
+)
+
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+
+REQUEST_PRIORITY: ContextVar[int] = ContextVar(
+    "REQUEST_PRIORITY", default=PRIORITY_USER
+)
+
+# Takes a token from the bucket, or blocks it for ARGV[3] seconds if given, and returns the time to wait in seconds
+# before a token is available, which is 0 if a token was taken. The time is read from Redis, so that workers on
+# different hosts agree on it, and returned as a string, since Lua numbers are truncated to integer replies
+TOKEN_BUCKET_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local burst = tonumber(ARGV[2])
+local block = tonumber(ARGV[3])
+local ttl = tonumber(ARGV[4])
+
+local time = redis.call("time")
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+
+local state = redis.call("hmget", KEYS[1], "tokens", "updatedAt", "blockedUntil")
+local tokens = tonumber(state[1]) or burst
+local updated_at = tonumber(state[2]) or now
+local blocked_until = tonumber(state[3]) or 0
+
+tokens = math.min(burst, tokens + math.max(0, now - updated_at) * rate)
+
+local wait = 0
+if block > 0 then
+    tokens = 0
+    blocked_until = math.max(blocked_until, now + block)
+elseif blocked_until > now then
+    wait = blocked_until - now
+elseif tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = (1 - tokens) / rate
+end
+
+redis.call("hset", KEYS[1], "tokens", tokens, "updatedAt", now, "blockedUntil", blocked_until)
+redis.call("expire", KEYS[1], ttl)
+return tostring(wait)
+"""
+
+
+class TokenBucket:
+    """
+    Token bucket held in the memory of a single worker.
+
+    Args:
+        rate (float): Number of tokens added per second
+        burst (int): Maximum number of tokens held
+    """
+
+    def __init__(self, rate: float, burst: int) -> None:
+        self.rate = rate
+        self.burst = burst
+
+        self.tokens = float(burst)
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.tokens = min(self.burst, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def time_until_token(self) -> float:
+        self._refill()
+        blocked = max(0.0, self.blocked_until - time.monotonic())
+        if self.tokens >= 1:
+            return blocked
+        return max(blocked, (1 - self.tokens) / self.rate)
+
+    def take(self) -> None:
+        self.tokens -= 1
+
+    def try_take(self) -> float:
+        """
+        Takes a token if one is available and returns 0, otherwise returns the time in seconds until one is.
+        """
+        delay = self.time_until_token()
+        if delay == 0:
+            self.take()
+        return delay
+
+    def block_for(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for `seconds`, e.g. after the provider answered with a 429.
+        """
+        self._refill()
+        self.tokens = 0.0
+        self.blocked_until = max(self.blocked_until, time.monotonic() + seconds)
+
+
+class RedisTokenBucket:
+    """
+    Token bucket shared by every worker through Redis, with a local `TokenBucket` used whilst Redis is unavailable.
+
+    Args:
+        key (str): Redis key of the bucket
+        rate (float): Number of tokens added per second, across every worker
+        burst (int): Maximum number of tokens held, across every worker
+        worker_count (int): Number of workers sharing the bucket, which divides the rate of the local fallback
+    """
+
+    def __init__(
+        self, key: str, rate: float, burst: int, worker_count: int = WORKER_COUNT
+    ) -> None:
+        self.key = key
+        self.rate = rate
+        self.burst = burst
+
+        self.fallback = TokenBucket(rate / worker_count, max(1, burst // worker_count))
+        self.client = get_async_redis_client()
+
+    async def _eval(self, block: float = 0.0) -> Optional[float]:
+        if not REDIS_CIRCUIT_BREAKER.allow():
+            return None
+
+        try:
+            wait = await acall(
+                "ratelimit",
+                self.client.eval,
+                TOKEN_BUCKET_SCRIPT,
+                1,
+                self.key,
+                self.rate,
+                self.burst,
+                block,
+                UPSTREAM_RATE_LIMIT_TTL,
+            )
+        except Exception as e:
+            logging.error(
+                f"Exception: Failed to update the rate limit bucket {self.key} in Redis, using the local bucket: {e}"
+            )
+            return None
+
+        return float(wait)
+
+    async def try_take(self) -> float:
+        """
+        Takes a token if one is available and returns 0, otherwise returns the time in seconds until one is.
+        """
+        delay = await self._eval()
+        if delay is None:
+            return self.fallback.try_take()
+        return delay
+
+    async def block_for(self, seconds: float) -> None:
+        """
+        Stop handing out tokens for `seconds`, in every worker.
+        """
+        self.fallback.block_for(seconds)
+        await self._eval(block=seconds)
+
+
+class RateLimiter:
+    """
+    Priority queue of requests waiting for a token from a single `RedisTokenBucket`.
+
+    Args:
+        name (str): Name of the upstream, used in metrics
+        key (str): Redis key of the bucket
+        rate (float): Sustained number of requests per second
+        burst (int): Number of requests which can be sent at once after an idle period
+    """
+
+    def __init__(self, name: str, key: str, rate: float, burst: int) -> None:
+        self.name = name
+        self.bucket = RedisTokenBucket(key, rate, burst)
+
+        self.waiters = []
+        self._counter = itertools.count()
+        self._task = None
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self.waiters if not future.done())
+
+    async def acquire(self, priority: Optional[int] = None) -> None:
+        priority = REQUEST_PRIORITY.get() if priority is None else priority
+
+        if not self.waiters and await self.bucket.try_take() == 0:
+            METRICS.observe(
+                "upstream_rate_limit_wait_seconds",
+                0.0,
+                upstream=self.name,
+                priority=priority,
+            )
+            return
+
+        start_time = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self.waiters, (priority, next(self._counter), future))
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.ensure_future(self._release_waiters())
+
+        # A cancelled waiter is skipped when it reaches the head of the queue
+        await future
+
+        METRICS.observe(
+            "upstream_rate_limit_wait_seconds",
+            time.perf_counter() - start_time,
+            upstream=self.name,
+            priority=priority,
+        )
+
+    async def block_for(self, seconds: float) -> None:
+        await self.bucket.block_for(seconds)
+
+    async def _release_waiters(self) -> None:
+        while self.waiters:
+            # Cancelled waiters are dropped first, so that no token is taken on their behalf
+            if self.waiters[0][2].done():
+                heapq.heappop(self.waiters)
+                continue
+
+            delay = await self.bucket.try_take()
+            if delay > 0:
+                await asyncio.sleep(delay)
+                continue
+
+            while self.waiters:
+                _, _, future = heapq.heappop(self.waiters)
+                if not future.done():
+                    future.set_result(None)
+                    break
+
+
+class UpstreamRateLimiter:
+    """
+    One `RateLimiter` per API key used with an upstream provider, since most providers count requests per key.
+
+    Args:
+        name (str): Name of the upstream
+        rate (float): Sustained number of requests per second allowed for each API key
+        burst (int): Number of requests which can be sent at once for each API key
+        per_api_key (bool): Whether each API key has its own bucket, otherwise the provider has a single one
+    """
+
+    def __init__(
+        self, name: str, rate: float, burst: int, per_api_key: bool = True
+    ) -> None:
+        self.name = name
+        self.rate = rate
+        self.burst = burst
+        self.per_api_key = per_api_key
+
+        self.limiters: Dict[str, RateLimiter] = {}
+
+    def generate_key(self, api_key: str) -> str:
+        # API keys are secrets, so only a digest of the key is stored in Redis
+        digest = hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+        return f"ratelimit_{self.name}_{digest}"
+
+    def __getitem__(self, api_key: Optional[str]) -> RateLimiter:
+        api_key = (api_key or "") if self.per_api_key else ""
+        limiter = self.limiters.get(api_key)
+
+        if limiter is None:
+            limiter = RateLimiter(
+                self.name, self.generate_key(api_key), self.rate, self.burst
+            )
+            self.limiters[api_key] = limiter
+
+        return limiter
+
+    def status(self) -> dict:
+        # API keys are secrets, so the buckets are only reported in aggregate
+        return {
+            "rate": self.rate,
+            "burst": self.burst,
+            "apiKeys": len(self.limiters),
+            "queueDepth": sum(
+                limiter.queue_depth for limiter in self.limiters.values()
+            ),
+        }
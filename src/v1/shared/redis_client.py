@@ -0,0 +1,180 @@
+"""
+Shared Redis connection pools and circuit breaker.
+
+Every RAO and Redis lock in a worker draws its connections from one synchronous and one asynchronous pool, both with
+socket and connect timeouts, so a slow ElastiCache node fails a call quickly rather than adding its full latency to
+the request.
+
+Connection failures and timeouts are counted by `REDIS_CIRCUIT_BREAKER`. After `REDIS_CIRCUIT_FAILURE_THRESHOLD`
+consecutive failures the circuit opens and callers bypass Redis, treating reads as misses and skipping writes, for
+`REDIS_CIRCUIT_COOLDOWN` seconds. A single trial call is then let through, which closes the circuit if it succeeds.
+"""
+import asyncio, logging, os, threading, time, dotenv, redis
+from redis import asyncio as aioredis
+
+from src.v1.shared.constants import (
+    REDIS_MAX_CONNECTIONS,
+    REDIS_POOL_TIMEOUT,
+    REDIS_SOCKET_TIMEOUT,
+    REDIS_SOCKET_CONNECT_TIMEOUT,
+    REDIS_HEALTH_CHECK_INTERVAL,
+    REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    REDIS_CIRCUIT_COOLDOWN,
+)
+from src.v1.shared.metrics import METRICS
+
+dotenv.load_dotenv()
+
+CLIENT_URL = os.environ.get("REDIS_CLIENT_URL")
+CLIENT_PORT = os.environ.get("REDIS_CLIENT_PORT")
+
+if not CLIENT_URL or not CLIENT_PORT:
+    logging.error(
+        f"Exception: Redis Client URL or Port not found in environment variables."
+    )
+    raise Exception(
+        "Exception: Redis Client URL or Port not found in environment variables."
+    )
+
+# Errors which indicate that Redis is unreachable or slow, as opposed to an invalid command
+REDIS_AVAILABILITY_ERRORS = (
+    redis.exceptions.ConnectionError,
+    redis.exceptions.TimeoutError,
+    OSError,
+    asyncio.TimeoutError,
+)
+
+POOL_SETTINGS = {
+    "host": CLIENT_URL,
+    "port": CLIENT_PORT,
+    "db": 0,
+    "max_connections": REDIS_MAX_CONNECTIONS,
+    "timeout": REDIS_POOL_TIMEOUT,
+    "socket_timeout": REDIS_SOCKET_TIMEOUT,
+    "socket_connect_timeout": REDIS_SOCKET_CONNECT_TIMEOUT,
+    "socket_keepalive": True,
+    "health_check_interval": REDIS_HEALTH_CHECK_INTERVAL,
+}
+
+REDIS_POOL = redis.BlockingConnectionPool(**POOL_SETTINGS)
+ASYNC_REDIS_POOL = aioredis.BlockingConnectionPool(**POOL_SETTINGS)
+
+
+def get_redis_client() -> redis.Redis:
+    return redis.Redis(connection_pool=REDIS_POOL)
+
+
+def get_async_redis_client() -> aioredis.Redis:
+    return aioredis.Redis(connection_pool=ASYNC_REDIS_POOL)
+
+
+class CircuitBreaker:
+    """
+    Tracks consecutive failures of a dependency and tells callers when to stop calling it.
+
+    Args:
+        name (str): Name of the dependency, used in logs and metrics
+        failure_threshold (int): Number of consecutive failures after which the circuit opens
+        cooldown (float): Time in seconds for which the circuit stays open before a trial call is allowed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, cooldown: float) -> None:
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+
+            # Only one trial call is let through per cooldown window, and a trial which never reports back is retried
+            if time.monotonic() - self.opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                self.opened_at = time.monotonic()
+                return True
+
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.state != self.CLOSED:
+                logging.info(f"Circuit for {self.name} closed, calls are resumed.")
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+
+            if self.state == self.HALF_OPEN or (
+                self.state == self.CLOSED and self.failures >= self.failure_threshold
+            ):
+                logging.error(
+                    f"Exception: Circuit for {self.name} opened after {self.failures} consecutive failures, bypassing it for {self.cooldown}s."
+                )
+                METRICS.increment("circuit_opened_total", circuit=self.name)
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
+
+    def status(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutiveFailures": self.failures,
+            "failureThreshold": self.failure_threshold,
+            "cooldown": self.cooldown,
+        }
+
+
+REDIS_CIRCUIT_BREAKER = CircuitBreaker(
+    "redis",
+    failure_threshold=REDIS_CIRCUIT_FAILURE_THRESHOLD,
+    cooldown=REDIS_CIRCUIT_COOLDOWN,
+)
+
+
+def call(operation: str, func, *args, **kwargs):
+    """
+    Run a synchronous Redis command, recording its latency and reporting its outcome to the circuit breaker.
+    """
+    start_time = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except REDIS_AVAILABILITY_ERRORS:
+        REDIS_CIRCUIT_BREAKER.record_failure()
+        METRICS.increment("redis_errors_total", operation=operation)
+        raise
+
+    REDIS_CIRCUIT_BREAKER.record_success()
+    METRICS.observe(
+        "redis_latency_seconds", time.perf_counter() - start_time, operation=operation
+    )
+    return result
+
+
+async def acall(operation: str, func, *args, **kwargs):
+    """
+    Await an asynchronous Redis command, recording its latency and reporting its outcome to the circuit breaker.
+    """
+    start_time = time.perf_counter()
+    try:
+        result = await func(*args, **kwargs)
+    except REDIS_AVAILABILITY_ERRORS:
+        REDIS_CIRCUIT_BREAKER.record_failure()
+        METRICS.increment("redis_errors_total", operation=operation)
+        raise
+
+    REDIS_CIRCUIT_BREAKER.record_success()
+    METRICS.observe(
+        "redis_latency_seconds", time.perf_counter() - start_time, operation=operation
+    )
+    return result
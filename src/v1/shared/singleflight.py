@@ -0,0 +1,256 @@
+"""
+Request coalescing (single-flight) for expensive cache-miss recomputations.
+
+When many requests miss the cache for the same key at the same time, only one of them recomputes the value. Within
+a worker, concurrent callers share a single task. Across workers, the computing worker holds a Redis lock for the
+key, and the other workers wait for the lock to be released before loading the value it has cached.
+
+Stale-while-revalidate refreshes go through `refresh`, which recomputes the value in the background and skips keys
+that are already being recomputed by any worker. `stale_while_revalidate` combines both for a cached value.
+"""
+import asyncio, logging, time, uuid
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.v1.shared.redis_client import (
+    REDIS_CIRCUIT_BREAKER,
+    get_async_redis_client,
+    acall,
+)
+from src.v1.shared.rate_limiter import REQUEST_PRIORITY, PRIORITY_BACKGROUND
+from src.v1.shared.constants import (
+    SINGLE_FLIGHT_LOCK_TTL,
+    SINGLE_FLIGHT_WAIT_TIMEOUT,
+    SINGLE_FLIGHT_POLL_INTERVAL,
+)
+
+# Delete the lock only if it is still held by the caller, so an expired lock taken over by another worker is kept
+RELEASE_LOCK_SCRIPT = """
+if redis.call("get", KEYS[1]) == ARGV[1] then
+    return redis.call("del", KEYS[1])
+else
+    return 0
+end
+"""
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent computations of the same key into one.
+
+    Args:
+        name (str): Name of the computation, used as a prefix for the Redis lock keys
+        lock_ttl (int): Expiry of the Redis lock in seconds, in case the computing worker dies whilst holding it
+        wait_timeout (int): Maximum time in seconds to wait for another worker before computing the value anyway
+        poll_interval (float): Time in seconds between checks of the lock held by another worker
+    """
+
+    def __init__(
+        self,
+        name: str,
+        lock_ttl: int = SINGLE_FLIGHT_LOCK_TTL,
+        wait_timeout: int = SINGLE_FLIGHT_WAIT_TIMEOUT,
+        poll_interval: float = SINGLE_FLIGHT_POLL_INTERVAL,
+    ) -> None:
+        self.name = name
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.poll_interval = poll_interval
+
+        self.client = get_async_redis_client()
+        self.in_flight: Dict[str, asyncio.Task] = {}
+        self.refreshing: Dict[str, asyncio.Task] = {}
+
+    def generate_lock_key(self, key: str) -> str:
+        return f"singleflight_{self.name}_{key}"
+
+    async def do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load: Optional[Callable[[], Awaitable[Any]]] = None,
+    ) -> Any:
+        """
+        Return the result of `compute()` for `key`, sharing one computation between all concurrent callers.
+
+        Args:
+            key (str): Key identifying the computation, e.g. the primary key of the report
+            compute: Coroutine function which computes, caches and returns the value
+            load: Coroutine function which returns the value cached by another worker, or None if it is missing
+
+        Returns:
+            Any: The result of `compute()`, or of `load()` when the value was computed by another worker
+        """
+        task = self.in_flight.get(key)
+
+        if task is None:
+            task = asyncio.ensure_future(self._do(key, compute, load))
+            self.in_flight[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        else:
+            logging.info(f"Joining in-flight {self.name} computation for {key}.")
+
+        # Shielded so that a cancelled caller does not cancel the computation shared with other callers
+        return await asyncio.shield(task)
+
+    def refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        """
+        Recompute the value for `key` in the background, without waiting for the result.
+
+        Nothing is scheduled if the value is already being recomputed for `key` in this worker or, going by the Redis
+        lock, in another worker.
+
+        Args:
+            key (str): Key identifying the computation, e.g. the primary key of the report
+            compute: Coroutine function which computes and caches the value
+        """
+        if key in self.in_flight or key in self.refreshing:
+            return
+
+        # References to the background tasks are kept until they finish, so they are not garbage collected
+        task = asyncio.ensure_future(self._refresh(key, compute))
+        self.refreshing[key] = task
+        task.add_done_callback(lambda _: self.refreshing.pop(key, None))
+
+    async def stale_while_revalidate(
+        self,
+        key: str,
+        find: Callable[[], Awaitable[Optional[Tuple[Any, bool]]]],
+        compute: Callable[[], Awaitable[Any]],
+    ) -> Any:
+        """
+        Return the cached value for `key`, refreshing it in the background if it is stale, or compute it if there is
+        no cached value which can be served.
+
+        Args:
+            key (str): Key identifying the computation, e.g. the primary key of the report
+            find: Coroutine function which returns the cached value and whether it is stale, or None if it is missing
+                or too stale to be served
+            compute: Coroutine function which computes, caches and returns the value
+
+        Returns:
+            Any: The cached value, or the result of `compute()`
+        """
+        cached = await find()
+
+        if cached is not None:
+            value, is_stale = cached
+
+            # Serve the stale value immediately and refresh it in the background
+            if is_stale:
+                logging.debug(
+                    f"Serving a stale {self.name} value for {key} and refreshing it in the background..."
+                )
+                self.refresh(key, compute=compute)
+
+            return value
+
+        async def load():
+            cached = await find()
+            return cached[0] if cached and not cached[1] else None
+
+        # Concurrent misses for the same key share a single recomputation
+        return await self.do(key, compute=compute, load=load)
+
+    def _forget(self, key: str, task: asyncio.Task) -> None:
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+
+        # Mark the exception as retrieved in case every caller has been cancelled
+        if not task.cancelled():
+            task.exception()
+
+    async def _acquire(self, lock_key: str, token: str) -> bool:
+        """
+        Try to take the Redis lock. If Redis is unavailable, the lock is treated as acquired.
+        """
+        if not REDIS_CIRCUIT_BREAKER.allow():
+            return True
+
+        try:
+            return bool(
+                await acall(
+                    "lock",
+                    self.client.set,
+                    lock_key,
+                    token,
+                    nx=True,
+                    px=int(self.lock_ttl * 1000),
+                )
+            )
+        except Exception as e:
+            logging.error(
+                f"Exception: Failed to acquire the single-flight lock {lock_key}, computing without it: {e}"
+            )
+            return True
+
+    async def _release(self, lock_key: str, token: str) -> None:
+        if not REDIS_CIRCUIT_BREAKER.allow():
+            return
+
+        try:
+            await acall(
+                "unlock", self.client.eval, RELEASE_LOCK_SCRIPT, 1, lock_key, token
+            )
+        except Exception as e:
+            logging.error(
+                f"Exception: Failed to release the single-flight lock {lock_key}: {e}"
+            )
+
+    async def _refresh(self, key: str, compute: Callable[[], Awaitable[Any]]) -> None:
+        # Upstream calls made by background refreshes queue behind those of user requests
+        REQUEST_PRIORITY.set(PRIORITY_BACKGROUND)
+        lock_key, token = self.generate_lock_key(key), uuid.uuid4().hex
+
+        if not await self._acquire(lock_key, token):
+            logging.info(
+                f"Another worker is already refreshing {self.name} for {key}, skipping."
+            )
+            return
+
+        try:
+            await compute()
+        except Exception as e:
+            logging.error(
+                f"Exception: Background refresh of {self.name} for {key} failed: {e}"
+            )
+        finally:
+            await self._release(lock_key, token)
+
+    async def _do(
+        self,
+        key: str,
+        compute: Callable[[], Awaitable[Any]],
+        load: Optional[Callable[[], Awaitable[Any]]],
+    ) -> Any:
+        lock_key, token = self.generate_lock_key(key), uuid.uuid4().hex
+
+        if await self._acquire(lock_key, token):
+            try:
+                return await compute()
+            finally:
+                await self._release(lock_key, token)
+
+        logging.info(
+            f"Another worker is computing {self.name} for {key}, waiting for it to finish."
+        )
+
+        deadline = time.time() + self.wait_timeout
+        try:
+            while time.time() < deadline and await acall(
+                "exists", self.client.exists, lock_key
+            ):
+                await asyncio.sleep(self.poll_interval)
+        except Exception as e:
+            logging.error(
+                f"Exception: Failed to check the single-flight lock {lock_key}: {e}"
+            )
+
+        if load is not None:
+            result = await load()
+            if result is not None:
+                return result
+
+        logging.warning(
+            f"No {self.name} result was cached by another worker for {key}, computing it in this worker."
+        )
+        return await compute()
@@ -0,0 +1,184 @@
+"""
+Columnar decoding of Timestream query results.
+
+The `ColumnInfo` of a result is read once, and each requested column is then decoded from the `Rows` of every page
+into a single list, converted according to the column's scalar type. Rows are never turned into dicts, and pages are
+decoded as they arrive whilst `NextToken` is followed, so a result does not have to be held in memory in its raw form.
+
+Results of single-measure tables, with one row per (dimensions, measure_name), are pivoted into one record per
+dimension value with `pivot_measures`.
+"""
+import logging
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+MEASURE_NAME_COLUMN = "measure_name"
+MEASURE_VALUE_COLUMNS = ["measure_value::double", "measure_value::varchar"]
+MEASURE_COLUMNS = [MEASURE_NAME_COLUMN, *MEASURE_VALUE_COLUMNS]
+
+SCALAR_TYPE_CONVERTERS = {
+    "BIGINT": int,
+    "INTEGER": int,
+    "DOUBLE": float,
+    "BOOLEAN": lambda value: value == "true",
+}
+
+
+def iterate_query_pages(client, query: str) -> Iterator[dict]:
+    """
+    Yields every page of the result of `query`, following `NextToken` until the result is exhausted.
+    """
+    kwargs = {"QueryString": query}
+
+    while True:
+        response = client.query(**kwargs)
+        yield response
+
+        next_token = response.get("NextToken")
+        if not next_token:
+            return
+
+        kwargs["NextToken"] = next_token
+
+
+def decode_column(rows: List[dict], index: int, scalar_type: Optional[str]) -> list:
+    # Null values are returned as {"NullValue": True}, without a "ScalarValue"
+    values = [row["Data"][index].get("ScalarValue") for row in rows]
+
+    converter = SCALAR_TYPE_CONVERTERS.get(scalar_type)
+    if converter is None:
+        return values
+
+    return [converter(value) if value is not None else None for value in values]
+
+
+def query_columns(
+    client,
+    query: str,
+    columns: Optional[List[str]] = None,
+    typed: bool = True,
+    status: Optional[dict] = None,
+) -> Dict[str, list]:
+    """
+    Runs `query` and returns its result as a dict mapping each column name to the list of its values.
+
+    Args:
+        client: boto3 `timestream-query` client
+        query (str): Query to run
+        columns (List[str]): Names of the columns to decode, defaults to every column of the result
+        typed (bool): Whether to convert numeric and boolean columns, otherwise values are kept as returned
+        status (dict): If given, updated with the `QueryStatus` of the last page, e.g. the bytes scanned
+    """
+    output, indices = None, None
+
+    for page in iterate_query_pages(client, query):
+        if output is None:
+            column_info = page["ColumnInfo"]
+            names = [column["Name"] for column in column_info]
+
+            missing = [column for column in columns or [] if column not in names]
+            if missing:
+                raise KeyError(f"Columns {missing} are not in the query result.")
+
+            indices = [
+                (
+                    name,
+                    i,
+                    column_info[i]["Type"].get("ScalarType") if typed else None,
+                )
+                for i, name in enumerate(names)
+                if columns is None or name in columns
+            ]
+            output = {name: [] for name, _, _ in indices}
+
+        if status is not None:
+            status.update(page.get("QueryStatus", {}))
+
+        rows = page.get("Rows", [])
+        # Pages without rows are returned whilst the query is still running
+        if not rows:
+            continue
+
+        for name, i, scalar_type in indices:
+            output[name].extend(decode_column(rows, i, scalar_type))
+
+    logging.info(
+        f"Decoded {len(next(iter(output.values()), []))} rows from Timestream."
+    )
+
+    return output
+
+
+def coalesce(*columns: list) -> list:
+    """
+    Returns the first value of each row which is not None.
+    """
+    if len(columns) == 1:
+        return list(columns[0])
+
+    output = list(columns[0])
+    for column in columns[1:]:
+        output = [
+            value if value is not None else other
+            for value, other in zip(output, column)
+        ]
+    return output
+
+
+def group_measures(
+    columns: Dict[str, list],
+    index: str,
+    names: str = MEASURE_NAME_COLUMN,
+    values: Optional[List[str]] = None,
+    converters: Optional[Dict[str, Callable]] = None,
+) -> Dict[Any, dict]:
+    """
+    Groups the rows of a single-measure table by the value of `index`, returning a dict mapping each value of `index`
+    to a record with a key for each measure.
+
+    Records carry every measure name found in the result, set to None where the measure is missing. When a measure
+    appears more than once for the same index value, the last value is kept.
+
+    Args:
+        columns (Dict[str, list]): Result of `query_columns`
+        index (str): Name of the column to group the rows by
+        names (str): Name of the column holding the measure name
+        values (List[str]): Names of the columns holding the measure value, of which the first not None is used
+        converters (Dict[str, Callable]): Functions applied to the values of the given measures
+    """
+    values = values or [column for column in MEASURE_VALUE_COLUMNS if column in columns]
+    converters = converters or {}
+
+    measure_values = coalesce(*[columns[column] for column in values])
+
+    grouped = {}
+    for key, name, value in zip(columns[index], columns[names], measure_values):
+        grouped.setdefault(key, {})[name] = value
+
+    measure_names = sorted(set(columns[names]))
+
+    output = {}
+    for key, measures in grouped.items():
+        record = {name: measures.get(name) for name in measure_names}
+
+        for name, converter in converters.items():
+            if record.get(name) is not None:
+                record[name] = converter(record[name])
+
+        output[key] = record
+
+    return output
+
+
+def pivot_measures(
+    columns: Dict[str, list],
+    index: str,
+    names: str = MEASURE_NAME_COLUMN,
+    values: Optional[List[str]] = None,
+    converters: Optional[Dict[str, Callable]] = None,
+) -> List[dict]:
+    """
+    Pivots the rows of a single-measure table into one record per value of `index`, sorted by `index`. See
+    `group_measures` for the arguments.
+    """
+    grouped = group_measures(columns, index, names, values, converters)
+    return [grouped[key] for key in sorted(grouped)]
@@ -0,0 +1,177 @@
+"""
+Templated, cached Timestream queries.
+
+Timestream has no bind parameters for ad hoc queries, so each query is written once as a `QueryTemplate` with named
+placeholders, and the values are rendered as SQL literals by type: integers are validated, strings are quoted with
+embedded quotes escaped, and lists become sorted, de-duplicated literal lists for use with `IN`. Templates are
+normalised (whitespace collapsed), so calls with equivalent parameters render the same query and share a cache key.
+
+`TimestreamQueryClient` caches the decoded columns of each template in Redis for the template's `ttl`, and merges
+identical queries issued concurrently, within a worker and across workers, with a `SingleFlight`. The latency and
+the bytes scanned by every query sent to Timestream are recorded per template in `METRICS`.
+"""
+import hashlib, logging, re, time
+from typing import Any, Dict, List, Optional
+
+from src.v1.shared.DAO import AsyncRAO, run_in_executor
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.singleflight import SingleFlight
+from src.v1.shared.timestream import query_columns
+
+
+def render_literal(value: Any) -> str:
+    """
+    Renders `value` as a Timestream SQL literal.
+    """
+    # bool is a subclass of int, so it is checked first
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, int):
+        return str(int(value))
+    if isinstance(value, float):
+        return repr(value)
+    if isinstance(value, str):
+        return "'" + value.replace("'", "''") + "'"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        if not value:
+            raise ValueError("Cannot render an empty list of values.")
+        return ", ".join(sorted({render_literal(item) for item in value}))
+
+    raise ValueError(f"Cannot render a value of type {type(value)} in a query.")
+
+
+def normalise_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip()
+
+
+class QueryTemplate:
+    """
+    Args:
+        name (str): Name of the query, used in cache keys and metrics
+        sql (str): Query with `{placeholder}` fields for its parameters
+        ttl (int): Time in seconds for which results are cached, or None to always query Timestream
+    """
+
+    def __init__(self, name: str, sql: str, ttl: Optional[int] = None) -> None:
+        self.name = name
+        # Only the template is normalised, so whitespace inside the rendered literals is kept
+        self.sql = normalise_query(sql)
+        self.ttl = ttl
+
+        self.rao = (
+            AsyncRAO(f"timestreamquery_{name}", tte=ttl, local_tte=ttl) if ttl else None
+        )
+
+    def render(self, **params) -> str:
+        return self.sql.format(
+            **{name: render_literal(value) for name, value in params.items()}
+        )
+
+    @staticmethod
+    def generate_key(
+        query: str, columns: Optional[List[str]] = None, typed: bool = True
+    ) -> str:
+        key = f"{query}|{','.join(columns or [])}|{typed}"
+        return hashlib.sha256(key.encode("utf-8")).hexdigest()
+
+
+class TimestreamQueryClient:
+    """
+    Runs `QueryTemplate`s against Timestream, with caching, request coalescing and metrics.
+
+    Args:
+        client: boto3 `timestream-query` client
+    """
+
+    def __init__(self, client) -> None:
+        self.client = client
+        self.flight = SingleFlight("timestreamquery")
+
+    async def query(
+        self,
+        template: QueryTemplate,
+        columns: Optional[List[str]] = None,
+        typed: bool = True,
+        **params,
+    ) -> Dict[str, list]:
+        """
+        Returns the result of `template` rendered with `params`, decoded into columns by `query_columns`.
+        """
+        query = template.render(**params)
+
+        if template.rao is None:
+            return await self.execute(template, query, columns, typed)
+
+        key = template.generate_key(query, columns, typed)
+
+        try:
+            data = await template.rao.get(key)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst fetching the cached {template.name} query: {e}"
+            )
+            data = None
+
+        if data is not None:
+            METRICS.increment(
+                "timestream_query_cache_total", query=template.name, result="hit"
+            )
+            return data
+
+        METRICS.increment(
+            "timestream_query_cache_total", query=template.name, result="miss"
+        )
+
+        async def compute():
+            result = await self.execute(template, query, columns, typed)
+            try:
+                await template.rao.put(key, result)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst caching the {template.name} query: {e}"
+                )
+            return result
+
+        return await self.flight.do(
+            f"{template.name}_{key}", compute, load=lambda: template.rao.get(key)
+        )
+
+    async def execute(
+        self,
+        template: QueryTemplate,
+        query: str,
+        columns: Optional[List[str]] = None,
+        typed: bool = True,
+    ) -> Dict[str, list]:
+        status, start_time = {}, time.perf_counter()
+
+        try:
+            result = await run_in_executor(
+                query_columns,
+                self.client,
+                query,
+                columns=columns,
+                typed=typed,
+                status=status,
+            )
+        except Exception:
+            METRICS.increment("timestream_query_errors_total", query=template.name)
+            raise
+
+        elapsed = time.perf_counter() - start_time
+        bytes_scanned = status.get("CumulativeBytesScanned", 0)
+
+        METRICS.observe("timestream_query_seconds", elapsed, query=template.name)
+        METRICS.increment(
+            "timestream_bytes_scanned_total", bytes_scanned, query=template.name
+        )
+        METRICS.increment(
+            "timestream_bytes_metered_total",
+            status.get("CumulativeBytesMetered", 0),
+            query=template.name,
+        )
+        logging.info(
+            f"Timestream query {template.name} took {elapsed:.3f}s and scanned {bytes_scanned} bytes."
+        )
+
+        return result
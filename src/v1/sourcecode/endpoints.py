@@ -1,9 +1,10 @@
 from fastapi import APIRouter, HTTPException, Depends
-import requests, json, time, dotenv, logging, os
+import json, time, dotenv, logging, os
 from botocore.exceptions import ClientError
 from pydantic import ValidationError
 
-from src.v1.shared.DAO import DAO
+from src.v1.shared.DAO import AsyncDAO
+from src.v1.shared.http_client import HTTP_CLIENTS
 from src.v1.shared.dependencies import get_primary_key
 from src.v1.shared.models import validate_token_address
 from src.v1.sourcecode.schemas import SourceCodeResponse, SourceCodeFile
@@ -29,7 +30,7 @@ dotenv.load_dotenv()
 #                                                    #
 ######################################################
 
-SOURCE_CODE_DAO = DAO("sourcecode")
+SOURCE_CODE_DAO = AsyncDAO("sourcecode")
 
 ######################################################
 #                                                    #
@@ -70,7 +71,7 @@ async def fetch_raw_code(
     }
 
     try:
-        response = requests.get(prefix, params=payload)
+        response = await HTTP_CLIENTS.get("block_explorer", prefix, params=payload)
         data = response.json()
     except Exception as e:
         logging.error(
@@ -201,7 +202,7 @@ async def get_source_code(
 
     # Attempt to fetch transfers from DAO object
     try:
-        _source_code_map = SOURCE_CODE_DAO.find_most_recent_by_pk(pk)
+        _source_code_map = await SOURCE_CODE_DAO.find_most_recent_by_pk(pk)
     except ClientError as e:
         logging.error(
             f"Exception: Boto3 exception whilst fetching data from 'sourcecode' with PK: {pk}"
@@ -227,7 +228,7 @@ async def get_source_code(
                 logging.info(
                     f"Writing source code map for {token_address} on chain {chain} to DAO..."
                 )
-                SOURCE_CODE_DAO.insert_one(
+                await SOURCE_CODE_DAO.insert_one(
                     partition_key_value=pk,
                     item={
                         "timestamp": int(time.time()),
@@ -186,3 +186,66 @@ SUPPLY_REPORT_STALENESS_THRESHOLD = 60 * 60 * 1  # 1 hour
 TRANSFERRABILITY_REPORT_STALENESS_THRESHOLD = 60 * 60 * 1  # 1 hour
 CLUSTERING_REPORT_STALENESS_THRESHOLD = 60 * 60 * 6  # 6 hours
 HOLDERS_STALENESS_THRESHOLD = 60 * 60 * 6  # 6 hours
+
+# Past the staleness threshold a report is served whilst it is refreshed in the background,
+# past the max staleness the request blocks on the refresh instead
+TOKEN_METRICS_MAX_STALENESS = 60 * 60 * 6  # 6 hours
+SUPPLY_REPORT_MAX_STALENESS = 60 * 60 * 6  # 6 hours
+TRANSFERRABILITY_REPORT_MAX_STALENESS = 60 * 60 * 6  # 6 hours
+
+##########################################################
+#                                                        #
+#               Score Deadline Constants                 #
+#                                                        #
+##########################################################
+
+SUPPLY_TRANSFERRABILITY_SCORE_TIMEOUT = 6.0  # 6 seconds
+LIQUIDITY_SCORE_TIMEOUT = 3.0  # 3 seconds
+AUDIT_SCORE_TIMEOUT = 3.0  # 3 seconds
+
+##########################################################
+#                                                        #
+#             Report Content Hash Constants              #
+#                                                        #
+##########################################################
+
+# GoPlus fields read by `get_supply_summary` and `get_transferrability_summary` respectively, a report is only
+# recomputed and rewritten when the hash of its fields changes
+SUPPLY_REPORT_FIELDS = [
+    "hidden_owner",
+    "is_open_source",
+    "is_proxy",
+    "selfdestruct",
+    "can_take_back_ownership",
+    "owner_address",
+    "is_mintable",
+]
+TRANSFERRABILITY_REPORT_FIELDS = [
+    "anti_whale_modifiable",
+    "is_honeypot",
+    "trading_cooldown",
+    "cannot_sell_all",
+    "owner_change_balance",
+    "is_blacklisted",
+    "is_whitelisted",
+    "honeypot_with_same_creator",
+    "buy_tax",
+    "sell_tax",
+    "can_take_back_ownership",
+    "owner_address",
+    "transfer_pausable",
+]
+
+# Must be bumped whenever the summary logic or the mappings above change, so that stored reports are recomputed
+REPORT_CONTENT_HASH_VERSION = 1
+
+##########################################################
+#                                                        #
+#             Holder Pagination Constants                #
+#                                                        #
+##########################################################
+
+HOLDERS_TOP_K = 1000  # Number of largest holders kept for each token
+HOLDERS_PAGE_SIZE = 10000
+HOLDERS_PAGE_CONCURRENCY = 3  # Pages requested at once, kept below the block explorer rate limit of 5 calls/s
+HOLDERS_PAGE_RETRIES = 3  # Retries of a page which was rejected by the block explorer rate limit
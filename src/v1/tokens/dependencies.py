@@ -1,8 +1,11 @@
-import requests, math, logging, os, dotenv
+import math, logging, os, dotenv, hashlib, json, asyncio
+from collections import deque
+from contextlib import aclosing
+from typing import AsyncIterator, List, Optional
 from fastapi import HTTPException
-from goplus.token import Token
 
 from src.v1.tokens.schemas import ContractResponse, ContractItem
+from src.v1.tokens.holders import TopHolders
 from src.v1.tokens.constants import (
     BURN_TAG,
     ZERO_ADDRESS,
@@ -18,14 +21,34 @@ from src.v1.tokens.constants import (
     BLACKLIST_MAPPING,
     WHITELIST_MAPPING,
     HONEYPOT_SAME_CREATOR,
+    REPORT_CONTENT_HASH_VERSION,
+    HOLDERS_PAGE_SIZE,
+    HOLDERS_PAGE_CONCURRENCY,
+    HOLDERS_PAGE_RETRIES,
 )
 
-from src.v1.shared.constants import CHAIN_ID_MAPPING
+from src.v1.shared.constants import (
+    CHAIN_ID_MAPPING,
+    GO_PLUS_TOKEN_SECURITY_URL,
+    GO_PLUS_CACHE_TTL,
+    GO_PLUS_LOCAL_CACHE_TTL,
+    GO_PLUS_BATCH_WINDOW,
+    GO_PLUS_BATCH_SIZE,
+)
 from src.v1.shared.models import ChainEnum
 from src.v1.shared.dependencies import load_access_token
+from src.v1.shared.http_client import HTTP_CLIENTS
+from src.v1.shared.DAO import AsyncRAO
+from src.v1.shared.singleflight import SingleFlight
+from src.v1.shared.batcher import Batcher
 
 dotenv.load_dotenv()
 
+GO_PLUS_RAO = AsyncRAO(
+    "goplus", tte=GO_PLUS_CACHE_TTL, local_tte=GO_PLUS_LOCAL_CACHE_TTL
+)
+GO_PLUS_FLIGHT = SingleFlight("goplus")
+
 simple_mapping = {
     "anti_whale_modifiable": ANTI_WHALE_MAPPING,
     "hidden_owner": HIDDEN_OWNER_MAPPING,
@@ -42,32 +65,90 @@ simple_mapping = {
 }
 
 
-def get_go_plus_data(chain: ChainEnum, token_address: str):
+async def get_go_plus_data(chain: ChainEnum, token_address: str):
+    """
+    Returns the GoPlus token security data for a token.
+
+    Responses are cached for `GO_PLUS_CACHE_TTL` seconds, and concurrent misses for the same token share a single
+    call to GoPlus, so the token, simulation and chart endpoints of one page load only call GoPlus once. The
+    returned dict is shared between callers and must not be modified.
+    """
+    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
+    _token_address = token_address.lower()
+
+    key = f"{CHAIN_ID_MAPPING[_chain]}_{_token_address}"
+
+    async def load():
+        try:
+            return await GO_PLUS_RAO.get(key)
+        except Exception as e:
+            logging.error(f"An exception occurred whilst fetching data from RAO: {e}")
+            return None
+
+    data = await load()
+    if data:
+        return data
+
+    async def compute():
+        # Concurrent lookups for other tokens on the same chain are sent in the same call
+        data = await GO_PLUS_BATCHER.get(_chain, _token_address)
+
+        try:
+            await GO_PLUS_RAO.put(key, data)
+        except Exception as e:
+            logging.error(f"An exception occurred whilst writing data to RAO: {e}")
+
+        return data
+
+    return await GO_PLUS_FLIGHT.do(key, compute=compute, load=load)
+
+
+async def fetch_go_plus_data_many(_chain: str, _token_addresses: List[str]) -> dict:
+    """
+    Fetches the GoPlus token security data for many tokens on the same chain in a single call.
+    """
     access_token = load_access_token()
 
     logging.info(
-        f"Access token loaded! Getting Go Plus data for {token_address} on chain {chain}."
+        f"Access token loaded! Getting Go Plus data for {len(_token_addresses)} tokens on chain {_chain}."
     )
 
-    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
-    _token_address = token_address.lower()
-
     try:
-        response = Token(access_token=access_token).token_security(
-            chain_id=str(CHAIN_ID_MAPPING[_chain]), addresses=[_token_address]
+        response = await HTTP_CLIENTS.get(
+            "goplus",
+            GO_PLUS_TOKEN_SECURITY_URL.format(CHAIN_ID_MAPPING[_chain]),
+            params={"contract_addresses": ",".join(_token_addresses)},
+            headers={"Authorization": access_token},
         )
-        data = response.result
+        response.raise_for_status()
+        body = response.json()
+
+        # Code 2 means that only some of the requested tokens were returned
+        if body.get("code") not in (1, 2):
+            raise Exception(
+                f"GoPlus returned code {body.get('code')} with message: {body.get('message')}"
+            )
+
+        data = body.get("result")
     except Exception as e:
-        logging.error(f"Exception: Whilst calling Token object from GoPlus: {e}")
+        logging.error(f"Exception: Whilst calling the GoPlus token security API: {e}")
         raise e
 
     logging.info(f"Success! GoPlus Data Loaded...")
 
-    return data[_token_address].to_dict()
+    return {address.lower(): value for address, value in (data or {}).items()}
+
 
+GO_PLUS_BATCHER = Batcher(
+    "goplus",
+    fetch_many=fetch_go_plus_data_many,
+    window=GO_PLUS_BATCH_WINDOW,
+    max_batch_size=GO_PLUS_BATCH_SIZE,
+)
 
-def get_go_plus_summary(chain: ChainEnum, token_address: str):
-    data = get_go_plus_data(chain, token_address)
+
+async def get_go_plus_summary(chain: ChainEnum, token_address: str):
+    data = await get_go_plus_data(chain, token_address)
 
     # Format response data into output format
     output = {}
@@ -147,7 +228,7 @@ def get_go_plus_summary(chain: ChainEnum, token_address: str):
     return output
 
 
-def get_block_explorer_data(chain: ChainEnum, token_address: str):
+async def get_block_explorer_data(chain: ChainEnum, token_address: str):
     _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
 
     try:
@@ -161,7 +242,7 @@ def get_block_explorer_data(chain: ChainEnum, token_address: str):
             "apikey": api_key,
         }
 
-        result = requests.get(prefix, params=params)
+        result = await HTTP_CLIENTS.get("block_explorer", prefix, params=params)
         result.raise_for_status()
 
         try:
@@ -199,6 +280,22 @@ def get_block_explorer_data(chain: ChainEnum, token_address: str):
     return output
 
 
+def get_content_hash(go_plus_response: dict, fields: list) -> str:
+    """
+    Hash of the GoPlus fields which a report is computed from, so unchanged reports can be detected without
+    recomputing them. Missing and empty fields are treated alike, since the summaries skip both.
+    """
+    normalised = {}
+    for field in fields:
+        value = go_plus_response.get(field)
+        normalised[field] = str(value).strip() if value not in (None, "") else None
+
+    payload = json.dumps(
+        [REPORT_CONTENT_HASH_VERSION, normalised], sort_keys=True, separators=(",", ":")
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
 def get_supply_summary(go_plus_response: dict) -> dict:
     items = []
 
@@ -559,49 +656,135 @@ def percentage_to_severity(percentage) -> int:
         )
 
 
-def call_fetch_token_holders(chain: str, token_address: str) -> dict:
-    api_key = os.getenv("ETHEREUM_BLOCK_EXPLORER_API_KEY")
+async def fetch_token_holder_page(token_address: str, page: int) -> list:
+    payload = {
+        "module": "token",
+        "action": "tokenholderlist",
+        "contractaddress": token_address,
+        "page": page,
+        "offset": HOLDERS_PAGE_SIZE,
+        "apikey": os.getenv("ETHEREUM_BLOCK_EXPLORER_API_KEY"),
+    }
 
-    # TODO: Add support for other chains to this query
+    for attempt in range(HOLDERS_PAGE_RETRIES + 1):
+        data = await HTTP_CLIENTS.get(
+            "block_explorer",
+            os.getenv("ETHEREUM_BLOCK_EXPLORER_URL"),
+            params=payload,
+        )
+        body = data.json()
+
+        # Verify if result is valid
+        # TODO: The API should return other than 200 for failed calls...
+        # We then, use their message OK
+        if body["message"] in ["OK", "No token holder found"]:
+            return body.get("result") or []
+
+        if "rate limit" in str(body.get("result")).lower() and (
+            attempt < HOLDERS_PAGE_RETRIES
+        ):
+            await asyncio.sleep(0.5 * 2**attempt)
+            continue
+
+        raise Exception(
+            f"Error while trying to get ETHERSCAN info about "
+            f"holders for token {token_address} on page {page}: {body.get('result')}"
+        )
 
-    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
 
-    if _chain == "ethereum":
-        payload = {
-            "module": "token",
-            "action": "tokenholderlist",
-            "contractaddress": token_address,
-            "offset": 10000,
-            "apikey": api_key,
-        }
+async def stream_token_holder_pages(token_address: str) -> AsyncIterator[list]:
+    """
+    Yields the pages of `tokenholderlist` in order until the first empty page.
 
-        output, found, page = [], False, 1
+    Up to `HOLDERS_PAGE_CONCURRENCY` pages are requested ahead of the page being consumed, so a token with many pages
+    costs roughly one round trip per `HOLDERS_PAGE_CONCURRENCY` pages. Requests for pages which are no longer
+    needed are cancelled when the consumer stops iterating.
+    """
+    tasks, next_page = deque(), 1
 
-        while not found:
-            payload["page"] = page
+    try:
+        while True:
+            while len(tasks) < HOLDERS_PAGE_CONCURRENCY:
+                tasks.append(
+                    asyncio.ensure_future(
+                        fetch_token_holder_page(token_address, next_page)
+                    )
+                )
+                next_page += 1
 
-            data = requests.get(
-                os.getenv("ETHEREUM_BLOCK_EXPLORER_URL"), params=payload
-            )
+            result = await tasks.popleft()
+            if len(result) == 0:
+                return
 
-            # Verify if result is valid
-            # TODO: The API should return other than 200 for failed calls...
-            # We then, use their message OK
-            if data.json()["message"] not in ["OK", "No token holder found"]:
-                raise Exception(
-                    f"Error while trying to get ETHERSCAN info about "
-                    f"holders for token {token_address} on chain {chain}."
-                )
+            yield result
+    finally:
+        for task in tasks:
+            task.cancel()
 
-            result = data.json().get("result")
 
-            if len(result) == 0:
-                found = True
+async def call_fetch_token_holders(
+    chain: str, token_address: str, limit: Optional[int] = None
+) -> dict:
+    """
+    Fetches the holders of a token from the block explorer, keeping only the `limit` largest holders if given.
+
+    Pages are streamed into a bounded heap, so memory is bounded by `limit` rather than by the number of holders.
+    While every quantity seen so far has been in descending order, pagination stops as soon as the heap is full and
+    the last quantity seen is no larger than the smallest one kept, since no later holder could then be kept.
 
-            output += result
-            page += 1
+    The response also carries "numHolders", the number of holders read, and "isComplete", whether every page was
+    read. When pagination stopped early, "numHolders" is only a lower bound on the number of holders.
+    """
+    # TODO: Add support for other chains to this query
 
-        return {"status": "1", "message": "OK", "result": output}
+    _chain = str(chain.value) if isinstance(chain, ChainEnum) else str(chain)
+
+    if _chain == "ethereum":
+        output, top_holders = [], TopHolders(limit) if limit else None
+        is_descending, last_quantity, num_pages, num_holders = True, None, 0, 0
+        is_complete = True
+
+        async with aclosing(stream_token_holder_pages(token_address)) as pages:
+            async for result in pages:
+                num_pages += 1
+                num_holders += len(result)
+
+                if top_holders is None:
+                    output += result
+                    continue
+
+                for item in result:
+                    quantity = int(item.get("TokenHolderQuantity"))
+                    top_holders.add(item.get("TokenHolderAddress"), quantity)
+
+                    if last_quantity is not None and quantity > last_quantity:
+                        is_descending = False
+                    last_quantity = quantity
+
+                if (
+                    is_descending
+                    and top_holders.is_full
+                    and last_quantity <= top_holders.min_quantity
+                ):
+                    logging.info(
+                        f"Remaining holders for token {token_address} cannot enter the top {limit}, stopping after {num_pages} pages."
+                    )
+                    is_complete = False
+                    break
+
+        if top_holders is not None:
+            output = [
+                {"TokenHolderAddress": address, "TokenHolderQuantity": str(quantity)}
+                for quantity, address in top_holders.items()
+            ]
+
+        return {
+            "status": "1",
+            "message": "OK",
+            "result": output,
+            "numHolders": num_holders,
+            "isComplete": is_complete,
+        }
     else:
         logging.warning(
             f"Chain {_chain} is not supported. Only Ethereum is supported at this time, returning an empty dictionary."
@@ -609,7 +792,30 @@ def call_fetch_token_holders(chain: str, token_address: str) -> dict:
         return {}
 
 
-def call_total_supply(token_address: str) -> float:
+async def call_token_holder_count(token_address: str) -> int:
+    payload = {
+        "module": "token",
+        "action": "tokenholdercount",
+        "contractaddress": token_address,
+        "apikey": os.getenv("ETHEREUM_BLOCK_EXPLORER_API_KEY"),
+    }
+
+    data = await HTTP_CLIENTS.get(
+        "block_explorer",
+        os.getenv("ETHEREUM_BLOCK_EXPLORER_URL"),
+        params=payload,
+    )
+    body = data.json()
+
+    if body.get("message") != "OK":
+        raise Exception(
+            f"Error while trying to get ETHERSCAN holder count for token {token_address}: {body.get('result')}"
+        )
+
+    return int(body.get("result"))
+
+
+async def call_total_supply(token_address: str) -> float:
     api_key = os.getenv("ETHERSCAN_API_KEY")
 
     total_supply_params = {
@@ -619,8 +825,10 @@ def call_total_supply(token_address: str) -> float:
         "apikey": api_key,
     }
 
-    total_supply = requests.get(
-        os.getenv("ETHEREUM_BLOCK_EXPLORER_URL"), params=total_supply_params
+    total_supply = await HTTP_CLIENTS.get(
+        "block_explorer",
+        os.getenv("ETHEREUM_BLOCK_EXPLORER_URL"),
+        params=total_supply_params,
     )
     total_supply.raise_for_status()
     total_supply = total_supply.json().get("result")
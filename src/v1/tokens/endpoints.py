@@ -1,4 +1,4 @@
-import time, os, logging, math, json
+import time, os, logging, math, json, asyncio
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi.responses import JSONResponse
 from typing import List
@@ -7,9 +7,16 @@ from decimal import Decimal
 from botocore.exceptions import ClientError
 from pydantic import ValidationError
 
-from src.v1.shared.dependencies import get_primary_key, get_chain, get_rpc_provider
+from src.v1.shared.dependencies import (
+    get_primary_key,
+    get_chain,
+    get_rpc_provider,
+    with_deadline,
+)
 from src.v1.shared.schemas import ScoreResponse, Score
-from src.v1.shared.DAO import DAO, DatabaseQueueObject
+from src.v1.shared.DAO import AsyncDAO, AsyncDatabaseQueueObject
+from src.v1.shared.metrics import METRICS
+from src.v1.shared.singleflight import SingleFlight
 from src.v1.shared.models import ChainEnum, validate_token_address
 from src.v1.shared.cloud_task_creator import create_http_task_rug_cf
 from src.v1.shared.exceptions import (
@@ -24,19 +31,34 @@ from src.v1.shared.exceptions import (
 
 from src.v1.tokens.constants import (
     HOLDERS_STALENESS_THRESHOLD,
+    HOLDERS_TOP_K,
     SUPPLY_REPORT_STALENESS_THRESHOLD,
     TRANSFERRABILITY_REPORT_STALENESS_THRESHOLD,
     TOKEN_METRICS_STALENESS_THRESHOLD,
     CLUSTERING_REPORT_STALENESS_THRESHOLD,
+    SUPPLY_REPORT_MAX_STALENESS,
+    TRANSFERRABILITY_REPORT_MAX_STALENESS,
+    TOKEN_METRICS_MAX_STALENESS,
+    SUPPLY_TRANSFERRABILITY_SCORE_TIMEOUT,
+    LIQUIDITY_SCORE_TIMEOUT,
+    AUDIT_SCORE_TIMEOUT,
+    SUPPLY_REPORT_FIELDS,
+    TRANSFERRABILITY_REPORT_FIELDS,
+)
+from src.v1.tokens.dependencies import (
+    get_supply_summary,
+    get_transferrability_summary,
+    get_content_hash,
 )
-from src.v1.tokens.dependencies import get_supply_summary, get_transferrability_summary
 from src.v1.tokens.dependencies import (
     get_go_plus_summary,
     get_block_explorer_data,
     get_go_plus_data,
     call_fetch_token_holders,
+    call_token_holder_count,
     call_total_supply,
 )
+from src.v1.tokens.holders import HolderDistribution
 from src.v1.tokens.schemas import (
     Holder,
     Cluster,
@@ -61,15 +83,18 @@ router = APIRouter()
 #                                                    #
 ######################################################
 
-SUPPLY_REPORT_DAO = DAO(table_name="supplyreports")
-TRANSFERRABILITY_REPORT_DAO = DAO(table_name="transferrabilityreports")
-TOKEN_METRICS_DAO = DAO(table_name="tokenmetrics")
-CLUSTER_REPORT_DAO = DAO(table_name="clusterreports")
-HOLDERS_DAO = DAO(table_name="holders")
-TOKEN_ANALYSIS_DAO = DAO(table_name="tokenanalysis")
+SUPPLY_REPORT_DAO = AsyncDAO(table_name="supplyreports")
+TRANSFERRABILITY_REPORT_DAO = AsyncDAO(table_name="transferrabilityreports")
+TOKEN_METRICS_DAO = AsyncDAO(table_name="tokenmetrics")
+CLUSTER_REPORT_DAO = AsyncDAO(table_name="clusterreports")
+HOLDERS_DAO = AsyncDAO(table_name="holders")
+TOKEN_ANALYSIS_DAO = AsyncDAO(table_name="tokenanalysis")
+
 
+SUPPLY_TRANSFERRABILITY_FLIGHT = SingleFlight("supplytransferrability")
+TOKEN_METRICS_FLIGHT = SingleFlight("tokenmetrics")
 
-CLUSTERING_QUEUE = DatabaseQueueObject(
+CLUSTERING_QUEUE = AsyncDatabaseQueueObject(
     table_name="clusterreports",
     queue_url=os.environ.get("CLUSTERING_QUEUE"),
     staleness=CLUSTERING_REPORT_STALENESS_THRESHOLD,
@@ -99,16 +124,14 @@ async def get_simulation_info(
     )
 
 
-async def get_supply_transferrability_info(
-    chain: ChainEnum, token_address: str = Depends(validate_token_address)
-):
-    _token_address = token_address.lower()
-
-    pk = get_primary_key(_token_address, chain)
-
+async def find_supply_transferrability_summaries(pk: str):
+    """
+    Returns the cached (supply, transferrability, is_stale) summaries for `pk`, where `is_stale` is True once the
+    staleness threshold has passed. Returns None if either summary is missing or older than the hard staleness limit.
+    """
     # Load existing data for the requested token if it exists
     try:
-        _supply_summary = SUPPLY_REPORT_DAO.find_most_recent_by_pk(pk)
+        _supply_summary = await SUPPLY_REPORT_DAO.find_most_recent_by_pk(pk)
     except ClientError as e:
         logging.error(
             f"Exception: Boto3 exception whilst fetching data from 'supplyreports' with PK: {pk}"
@@ -122,8 +145,8 @@ async def get_supply_transferrability_info(
         raise DatabaseLoadFailureException()
 
     try:
-        _transferrability_summary = TRANSFERRABILITY_REPORT_DAO.find_most_recent_by_pk(
-            pk
+        _transferrability_summary = (
+            await TRANSFERRABILITY_REPORT_DAO.find_most_recent_by_pk(pk)
         )
     except ClientError as e:
         logging.error(
@@ -137,52 +160,109 @@ async def get_supply_transferrability_info(
         logging.error(f"Exception: {e}")
         raise DatabaseLoadFailureException()
 
-    found = False
-
-    # If this data is found and is not stale, return it
-    if _supply_summary and _transferrability_summary:
-        # Check whether values are stale based on UNIX timestamp comparisons
-        supply_summary_is_not_stale = (
-            time.time() - int(_supply_summary.get("timestamp"))
-        ) < SUPPLY_REPORT_STALENESS_THRESHOLD
-        transferrability_summary_is_not_stale = (
-            time.time() - int(_transferrability_summary.get("timestamp"))
-        ) < TRANSFERRABILITY_REPORT_STALENESS_THRESHOLD
-
-        if supply_summary_is_not_stale and transferrability_summary_is_not_stale:
-            logging.warning(
-                f"A non-stale report was found, checking whether all data is present."
-            )
+    if not (_supply_summary and _transferrability_summary):
+        return None
 
-            supply_summary = _supply_summary.get("summary")
-            transferrability_summary = _transferrability_summary.get("summary")
+    supply_summary_age = time.time() - get_report_refreshed_at(_supply_summary)
+    transferrability_summary_age = time.time() - get_report_refreshed_at(
+        _transferrability_summary
+    )
 
-            if supply_summary and transferrability_summary:
-                logging.warning(
-                    f"Requested data is present in the database, setting `found = True` and continuing."
-                )
-                found = True
-            else:
-                logging.warning(
-                    f"A non-stale report was found but one of the summary values was null. Re-calculating and re-caching..."
-                )
-        else:
-            logging.warning(
-                f"A previous report was found but it did not pass the staleness check."
-            )
+    # Reports older than the hard staleness limit are never served
+    if (
+        supply_summary_age >= SUPPLY_REPORT_MAX_STALENESS
+        or transferrability_summary_age >= TRANSFERRABILITY_REPORT_MAX_STALENESS
+    ):
+        logging.warning(
+            f"A previous report was found but it did not pass the hard staleness check."
+        )
+        return None
 
-    if not found:
-        logging.debug(
-            f"Previous non-stale report was not found, fetching data from GoPlus API..."
+    supply_summary = _supply_summary.get("summary")
+    transferrability_summary = _transferrability_summary.get("summary")
+
+    if not (supply_summary and transferrability_summary):
+        logging.warning(
+            f"A report was found but one of the summary values was null. Re-calculating and re-caching..."
         )
+        return None
 
-        try:
-            data = get_go_plus_data(chain, _token_address)
-        except Exception as e:
-            logging.error(f"Exception: Raised in call to `get_go_plus_data`: {e}")
-            raise GoPlusDataException(chain, _token_address)
+    # Check whether values are stale based on UNIX timestamp comparisons
+    is_stale = (
+        supply_summary_age >= SUPPLY_REPORT_STALENESS_THRESHOLD
+        or transferrability_summary_age >= TRANSFERRABILITY_REPORT_STALENESS_THRESHOLD
+    )
+
+    return supply_summary, transferrability_summary, is_stale
+
+
+def get_report_refreshed_at(report: dict) -> int:
+    """
+    Returns the time at which `report` was last confirmed current, either when it was written or when it was last
+    found unchanged.
+    """
+    return max(int(report.get("timestamp")), int(report.get("refreshedAt") or 0))
+
+
+async def find_unchanged_summary(dao: AsyncDAO, pk: str, content_hash: str):
+    """
+    Returns the summary of the most recent report for `pk` if it was computed from GoPlus fields with the same
+    `content_hash`, or None if it has to be recomputed. The `refreshedAt` attribute of an unchanged report is set to
+    the current time, so that it is not considered stale.
+    """
+    try:
+        report = await dao.find_most_recent_by_pk(pk)
+    except Exception as e:
+        logging.error(
+            f"Exception: Whilst fetching the previous report from '{dao.table_name}' with PK: {pk}: {e}"
+        )
+        return None
+
+    if not (
+        report and report.get("contentHash") == content_hash and report.get("summary")
+    ):
+        return None
+
+    try:
+        await dao.update_one(pk, report, {"refreshedAt": int(time.time())})
+    except Exception as e:
+        # The report is still served, but is found stale again on the next request until the update succeeds
+        METRICS.increment("report_freshness_update_errors_total", table=dao.table_name)
+        logging.error(
+            f"Exception: Whilst updating the freshness of the report in '{dao.table_name}' with PK: {pk}: {e}"
+        )
+
+    METRICS.increment("report_writes_skipped_total", table=dao.table_name)
+    return report.get("summary")
+
+
+async def compute_supply_transferrability_summaries(
+    chain: ChainEnum, token_address: str, pk: str
+):
+    """
+    Computes the (supply, transferrability) summaries from GoPlus data and caches them in the database.
+
+    Each report is stored with the hash of the GoPlus fields it was computed from. When the hash is unchanged, the
+    stored summary is reused and only its `refreshedAt` attribute is updated in DynamoDB, instead of writing a copy.
+    """
+    _token_address = token_address.lower()
+
+    try:
+        data = await get_go_plus_data(chain, _token_address)
+    except Exception as e:
+        logging.error(f"Exception: Raised in call to `get_go_plus_data`: {e}")
+        raise GoPlusDataException(chain, _token_address)
+
+    supply_hash = get_content_hash(data, SUPPLY_REPORT_FIELDS)
+    transferrability_hash = get_content_hash(data, TRANSFERRABILITY_REPORT_FIELDS)
+
+    supply_summary = await find_unchanged_summary(SUPPLY_REPORT_DAO, pk, supply_hash)
+    transferrability_summary = await find_unchanged_summary(
+        TRANSFERRABILITY_REPORT_DAO, pk, transferrability_hash
+    )
 
-        # Process this data and produce a supply and a transferrability summary
+    if supply_summary is None:
+        # Process this data and produce a supply summary
         try:
             supply_summary = get_supply_summary(data)
         except Exception as e:
@@ -191,19 +271,15 @@ async def get_supply_transferrability_info(
             )
             raise GoPlusDataException(chain, _token_address)
 
-        try:
-            transferrability_summary = get_transferrability_summary(data)
-        except Exception as e:
-            logging.error(
-                f"Exception: An exception occurred whilst processing the transferrability summary for {token_address} on chain {chain}."
-            )
-            raise GoPlusDataException(chain, _token_address)
-
         # Cache this data to the `supplyreports` table
         try:
-            SUPPLY_REPORT_DAO.insert_new(
+            await SUPPLY_REPORT_DAO.insert_new(
                 partition_key_value=pk,
-                item={"timestamp": int(time.time()), "summary": dict(supply_summary)},
+                item={
+                    "timestamp": int(time.time()),
+                    "summary": dict(supply_summary),
+                    "contentHash": supply_hash,
+                },
             )
         except ClientError as e:
             logging.error(
@@ -215,14 +291,27 @@ async def get_supply_transferrability_info(
                 f"Exception: Whilst writing to 'supplyreports' using `insert_new` for PK: {pk}"
             )
             raise DatabaseInsertFailureException()
+    else:
+        logging.info(f"Supply report for PK {pk} is unchanged, skipping the write...")
+
+    if transferrability_summary is None:
+        # Process this data and produce a transferrability summary
+        try:
+            transferrability_summary = get_transferrability_summary(data)
+        except Exception as e:
+            logging.error(
+                f"Exception: An exception occurred whilst processing the transferrability summary for {token_address} on chain {chain}."
+            )
+            raise GoPlusDataException(chain, _token_address)
 
         # Cache this data to the `transferrabilityreports` table
         try:
-            TRANSFERRABILITY_REPORT_DAO.insert_new(
+            await TRANSFERRABILITY_REPORT_DAO.insert_new(
                 partition_key_value=pk,
                 item={
                     "timestamp": int(time.time()),
                     "summary": dict(transferrability_summary),
+                    "contentHash": transferrability_hash,
                 },
             )
         except ClientError as e:
@@ -235,6 +324,35 @@ async def get_supply_transferrability_info(
                 f"Exception: Whilst writing to 'transferrabilityreports' using `insert_new` for PK: {pk}"
             )
             raise DatabaseInsertFailureException()
+    else:
+        logging.info(
+            f"Transferrability report for PK {pk} is unchanged, skipping the write..."
+        )
+
+    return supply_summary, transferrability_summary
+
+
+async def get_supply_transferrability_info(
+    chain: ChainEnum, token_address: str = Depends(validate_token_address)
+):
+    _token_address = token_address.lower()
+
+    pk = get_primary_key(_token_address, chain)
+
+    async def find():
+        cached = await find_supply_transferrability_summaries(pk)
+        return (cached[:2], cached[2]) if cached is not None else None
+
+    (
+        supply_summary,
+        transferrability_summary,
+    ) = await SUPPLY_TRANSFERRABILITY_FLIGHT.stale_while_revalidate(
+        pk,
+        find=find,
+        compute=lambda: compute_supply_transferrability_summaries(
+            chain, token_address, pk
+        ),
+    )
 
     # Format the data and return it
     try:
@@ -279,19 +397,14 @@ async def get_supply_transferrability_info(
     return supply_summary, transferrability_summary
 
 
-@router.get(
-    "/metadata/{chain}/{token_address}",
-    dependencies=[Depends(decode_token)],
-    include_in_schema=True,
-)
-async def get_token_metrics(
-    chain: ChainEnum, token_address: str = Depends(validate_token_address)
-):
-    pk = get_primary_key(token_address, chain)
-
+async def find_token_metrics(pk: str):
+    """
+    Returns the cached (token metrics row, is_stale) for `pk`, where `is_stale` is True once the staleness threshold
+    has passed. Returns None if the row is missing or older than the hard staleness limit.
+    """
     # Attempt to fetch the latest token metrics row from the database
     try:
-        _token_metrics = TOKEN_METRICS_DAO.find_most_recent_by_pk(pk)
+        _token_metrics = await TOKEN_METRICS_DAO.find_most_recent_by_pk(pk)
     except ClientError as e:
         logging.error(
             f"Exception: Boto3 exception whilst fetching data from 'tokenmetrics' with PK: {pk}"
@@ -304,116 +417,128 @@ async def get_token_metrics(
         logging.error(f"Exception: {e}")
         raise DatabaseLoadFailureException()
 
-    found = False
+    if not _token_metrics:
+        return None
 
-    if _token_metrics:
-        token_metrics_last_updated = _token_metrics.get("timestamp")
-        token_metrics_is_not_stale = (
-            time.time() - int(token_metrics_last_updated)
-        ) < TOKEN_METRICS_STALENESS_THRESHOLD
+    token_metrics_age = time.time() - int(_token_metrics.get("timestamp"))
 
-        if token_metrics_is_not_stale:
-            logging.debug(
-                f"Token metrics for {token_address} on chain {chain} are not stale. Setting `found = True`."
-            )
-            found = True
-        else:
-            logging.debug(
-                f"A previous token metrics report was found but it did not pass the staleness check:"
-            )
-            logging.debug(
-                f"Token metrics staleness: {time.time() - int(token_metrics_last_updated)}"
-            )
-            logging.debug(f"Re-calculating token metrics and re-caching...")
-
-    if not found:
+    # Token metrics older than the hard staleness limit are never served
+    if token_metrics_age >= TOKEN_METRICS_MAX_STALENESS:
         logging.debug(
-            f"Attempting to fetch all metrics data from external endpoints..."
+            f"A previous token metrics report was found but it did not pass the hard staleness check:"
         )
+        logging.debug(f"Token metrics staleness: {token_metrics_age}")
+        return None
 
-        # Fetch the data from all sources and then cache it in the database
-        lastUpdatedTimestamp = int(time.time())
+    return _token_metrics, token_metrics_age >= TOKEN_METRICS_STALENESS_THRESHOLD
 
-        # First, check whether the address corresponds to a smart contract
-        # If not, throw a HTTP 404 exception
-        try:
-            rpc = get_rpc_provider(chain)
-            checksum_address = rpc.to_checksum_address(token_address)
-            is_token = rpc.eth.get_code(checksum_address).decode(
-                "utf-8", errors="replace"
-            )
 
-            if len(is_token) == 0:
-                raise HTTPException(
-                    status_code=404,
-                    detail=f"Token address {token_address} on chain {chain} is not a token.",
-                )
-        except Exception as e:
-            logging.error(e)
+async def compute_token_metrics(chain: ChainEnum, token_address: str, pk: str):
+    """
+    Computes the token metrics from GoPlus, the block explorer and the RPC and caches them in the database.
+    """
+    logging.debug(f"Attempting to fetch all metrics data from external endpoints...")
+
+    # Fetch the data from all sources and then cache it in the database
+    lastUpdatedTimestamp = int(time.time())
 
+    # First, check whether the address corresponds to a smart contract
+    # If not, throw a HTTP 404 exception
+    try:
+        rpc = get_rpc_provider(chain)
+        checksum_address = rpc.to_checksum_address(token_address)
+        is_token = rpc.eth.get_code(checksum_address).decode("utf-8", errors="replace")
+
+        if len(is_token) == 0:
             raise HTTPException(
                 status_code=404,
                 detail=f"Token address {token_address} on chain {chain} is not a token.",
             )
+    except Exception as e:
+        logging.error(e)
 
-        # Fetch and process market data from GoPlus
-        try:
-            market_data = get_go_plus_summary(chain, token_address)
-        except Exception as e:
-            logging.warning(
-                f"Exception: Failed to fetch GoPlus data for {token_address} on chain {chain}. Using empty dictionary and continuing..."
-            )
-            market_data = {}
+        raise HTTPException(
+            status_code=404,
+            detail=f"Token address {token_address} on chain {chain} is not a token.",
+        )
 
-        # Fetch and process token social data from Etherscan
-        try:
-            explorer_data = get_block_explorer_data(chain, token_address)
-        except Exception as e:
-            logging.warning(
-                f"Failed to fetch block explorer data for {token_address} on chain {chain}. Using empty dictionary and continuing..."
-            )
-            explorer_data = {}
-
-        # TODO: This check cannot occur because CoinGecko has heavy rate-limiting
-        # TODO: The backend service cannot call CoinGecko directly, this will be fixed when we create a backend service for this
-
-        # try:
-        #     # Fetch latestPrice information from chart data
-        #     chart = await get_chart_data(chain, _token_address, FrequencyEnum.one_day)
-        #     if chart:
-        #         market_data['latestPrice'] = chart.latestPrice if isinstance(chart, ChartResponse) else chart.get('latestPrice')
-        # except Exception as e:
-        #     logging.warning(f'Failed to fetch chart data as part of `info` for {_token_address} on chain {chain}. Using empty dictionary and continuing...')
-        #     market_data['latestPrice'] = None
-
-        _token_metrics = {
-            "timestamp": lastUpdatedTimestamp,
-            "summary": {
-                **market_data,
-                **explorer_data,
-                **{"lastUpdatedTimestamp": lastUpdatedTimestamp},
-            },
-        }
+    # Fetch and process market data from GoPlus
+    try:
+        market_data = await get_go_plus_summary(chain, token_address)
+    except Exception as e:
+        logging.warning(
+            f"Exception: Failed to fetch GoPlus data for {token_address} on chain {chain}. Using empty dictionary and continuing..."
+        )
+        market_data = {}
 
-        # Change floating point fields in the token metrics to Decimal type
-        for key in _token_metrics["summary"]:
-            if isinstance(_token_metrics["summary"][key], float):
-                _token_metrics["summary"][key] = Decimal(
-                    str(_token_metrics["summary"][key])
-                )
+    # Fetch and process token social data from Etherscan
+    try:
+        explorer_data = await get_block_explorer_data(chain, token_address)
+    except Exception as e:
+        logging.warning(
+            f"Failed to fetch block explorer data for {token_address} on chain {chain}. Using empty dictionary and continuing..."
+        )
+        explorer_data = {}
 
-        try:
-            TOKEN_METRICS_DAO.insert_new(partition_key_value=pk, item=_token_metrics)
-        except ClientError as e:
-            logging.error(
-                f"Failed to cache token metrics for {token_address} on chain {chain}."
-            )
-            raise DatabaseInsertFailureException()
-        except Exception as e:
-            logging.error(
-                f"An unknown exception occurred which was not caught by boto3 exception handling..."
+    # TODO: This check cannot occur because CoinGecko has heavy rate-limiting
+    # TODO: The backend service cannot call CoinGecko directly, this will be fixed when we create a backend service for this
+
+    # try:
+    #     # Fetch latestPrice information from chart data
+    #     chart = await get_chart_data(chain, _token_address, FrequencyEnum.one_day)
+    #     if chart:
+    #         market_data['latestPrice'] = chart.latestPrice if isinstance(chart, ChartResponse) else chart.get('latestPrice')
+    # except Exception as e:
+    #     logging.warning(f'Failed to fetch chart data as part of `info` for {_token_address} on chain {chain}. Using empty dictionary and continuing...')
+    #     market_data['latestPrice'] = None
+
+    _token_metrics = {
+        "timestamp": lastUpdatedTimestamp,
+        "summary": {
+            **market_data,
+            **explorer_data,
+            **{"lastUpdatedTimestamp": lastUpdatedTimestamp},
+        },
+    }
+
+    # Change floating point fields in the token metrics to Decimal type
+    for key in _token_metrics["summary"]:
+        if isinstance(_token_metrics["summary"][key], float):
+            _token_metrics["summary"][key] = Decimal(
+                str(_token_metrics["summary"][key])
             )
-            raise DatabaseInsertFailureException()
+
+    try:
+        await TOKEN_METRICS_DAO.insert_new(partition_key_value=pk, item=_token_metrics)
+    except ClientError as e:
+        logging.error(
+            f"Failed to cache token metrics for {token_address} on chain {chain}."
+        )
+        raise DatabaseInsertFailureException()
+    except Exception as e:
+        logging.error(
+            f"An unknown exception occurred which was not caught by boto3 exception handling..."
+        )
+        raise DatabaseInsertFailureException()
+
+    return _token_metrics
+
+
+@router.get(
+    "/metadata/{chain}/{token_address}",
+    dependencies=[Depends(decode_token)],
+    include_in_schema=True,
+)
+async def get_token_metrics(
+    chain: ChainEnum, token_address: str = Depends(validate_token_address)
+):
+    pk = get_primary_key(token_address, chain)
+
+    _token_metrics = await TOKEN_METRICS_FLIGHT.stale_while_revalidate(
+        pk,
+        find=lambda: find_token_metrics(pk),
+        compute=lambda: compute_token_metrics(chain, token_address, pk),
+    )
 
     _token_metrics = {
         **_token_metrics["summary"],
@@ -454,7 +579,9 @@ async def get_token_audit_summary(
     pk = get_primary_key(token_address=token_address, chain=chain)
 
     # Try to fetch the data from the database
-    db_response = TOKEN_ANALYSIS_DAO.find_most_recent_by_pk(partition_key_value=pk)
+    db_response = await TOKEN_ANALYSIS_DAO.find_most_recent_by_pk(
+        partition_key_value=pk
+    )
 
     if db_response is None:
         # TODO: Switch this on during production
@@ -551,7 +678,7 @@ async def get_token_clustering(
 
     # TODO: There is repeated logic inside lambda that allows to fetch_holders, get_cluster_response
     # TODO: We have duplicated code also in the src.v1.clustering, maybe create a package
-    response = CLUSTERING_QUEUE.get_item(
+    response = await CLUSTERING_QUEUE.get_item(
         pk=pk, MessageGroupId=f"cluster_{pk}", message_data=message_data
     )
 
@@ -605,7 +732,7 @@ async def get_holder_chart(
             f"Exception: No cluster summary was found for {token_address} on chain {chain}."
         )
         try:
-            data = fetch_holders(token_address=token_address, chain=chain)
+            data = await fetch_holders(token_address=token_address, chain=chain)
         except Exception as e:
             logging.error(
                 f"Exception: Whilst trying to obtain `holders` for {token_address} on chain {chain}: {e}"
@@ -613,22 +740,17 @@ async def get_holder_chart(
             raise RugAPIException()
 
         try:
-            top_holders = sorted(
-                data.keys(), key=lambda k: data[k]["percentTokens"], reverse=True
-            )[:numClusters]
-            holders = {holder: data[holder] for holder in top_holders}
-
             clusters = [
                 Cluster(
                     members=[
                         Holder(
-                            address=holder,
-                            numTokens=float(holders[holder]["numTokens"]),
-                            percentage=float(holders[holder]["percentTokens"]),
+                            address=data.addresses[i],
+                            numTokens=float(data.quantities[i]),
+                            percentage=float(data.percentages[i]),
                         )
                     ]
                 )
-                for holder in holders
+                for i in data.top_indices(numClusters)
             ]
             return ClusterResponse(clusters=clusters)
         except ValidationError as e:
@@ -691,7 +813,7 @@ async def get_holder_chart(
         raise OutputValidationError()
 
 
-def fetch_holders(token_address: str, chain: ChainEnum):
+async def fetch_holders(token_address: str, chain: ChainEnum):
     _token_address = token_address.lower()
     pk = get_primary_key(chain.value, _token_address)
 
@@ -699,7 +821,7 @@ def fetch_holders(token_address: str, chain: ChainEnum):
     logging.info(
         f"Attempting to find holders for token {token_address} on chain {chain.value} in the database..."
     )
-    holders = HOLDERS_DAO.find_most_recent_by_pk(pk)
+    holders = await HOLDERS_DAO.find_most_recent_by_pk(pk)
 
     # If holders are found, check if they are stale
     if holders:
@@ -711,52 +833,62 @@ def fetch_holders(token_address: str, chain: ChainEnum):
             logging.info(
                 f"Holders for token {token_address} on chain {chain.value} are not stale, returning..."
             )
-            return holders.get("holders")
+            return HolderDistribution.from_stored(
+                holders.get("holders"),
+                (holders.get("concentration") or {}).get("numHolders"),
+            )
 
     logging.info(
         f"Holders for token {token_address} on chain {chain.value} are stale or not found in the database, fetching from the blockchain..."
     )
-    data = call_fetch_token_holders(chain=chain.value, token_address=token_address)
-    total_supply = call_total_supply(token_address=token_address)
-
-    if data.get("status") and data["status"] == "1":
-        result = data.get("result")
-        output = {}
-        for item in result:
-            address, numTokens = (
-                item.get("TokenHolderAddress"),
-                int(item.get("TokenHolderQuantity")),
-            )
-            output[address] = {
-                "numTokens": numTokens,
-                "percentTokens": Decimal(str(numTokens / total_supply)),
-            }
-
-        # Reduce the size of the holders object to top holders
-        if len(output) > 1000:
-            top_holders = sorted(
-                output.keys(), key=lambda k: output[k]["percentTokens"], reverse=True
-            )[:1000]
-            output = {holder: output[holder] for holder in top_holders}
-
-        # Save transfers to DAO object
-        logging.error(
-            f"Saving holders to DAO object for token {token_address} on chain {chain.value}"
+    data, total_supply = await asyncio.gather(
+        call_fetch_token_holders(
+            chain=chain.value, token_address=token_address, limit=HOLDERS_TOP_K
+        ),
+        call_total_supply(token_address=token_address),
+    )
+
+    if not (data.get("status") and data["status"] == "1"):
+        raise Exception(
+            f"No holders were returned for token {token_address} on chain {chain.value}."
         )
 
+    # The holders read are only a lower bound on the number of holders when pagination stopped early
+    num_holders = data.get("numHolders")
+    if not data.get("isComplete"):
         try:
-            HOLDERS_DAO.insert_new(
-                partition_key_value=pk,
-                item={"timestamp": int(time.time()), "holders": output},
-            )
-        except ClientError as e:
+            num_holders = await call_token_holder_count(token_address=token_address)
+        except Exception as e:
             logging.error(
-                f"Error saving holders to DAO object for token {token_address} on chain {chain.value}: {e}"
+                f"Exception: Whilst fetching the number of holders for {token_address} on chain {chain.value}, using the {num_holders} holders read: {e}"
             )
-            logging.error(f"Primary key used for database insertion: {pk}")
-            raise e
 
-    return output
+    distribution = HolderDistribution.from_explorer(
+        data.get("result"), total_supply, num_holders=num_holders
+    )
+
+    # Save transfers to DAO object
+    logging.info(
+        f"Saving holders to DAO object for token {token_address} on chain {chain.value}"
+    )
+
+    try:
+        await HOLDERS_DAO.insert_new(
+            partition_key_value=pk,
+            item={
+                "timestamp": int(time.time()),
+                "holders": distribution.to_item(HOLDERS_TOP_K),
+                "concentration": distribution.concentration(),
+            },
+        )
+    except ClientError as e:
+        logging.error(
+            f"Error saving holders to DAO object for token {token_address} on chain {chain.value}: {e}"
+        )
+        logging.error(f"Primary key used for database insertion: {pk}")
+        raise e
+
+    return distribution
 
 
 @router.get(
@@ -768,95 +900,122 @@ def fetch_holders(token_address: str, chain: ChainEnum):
 async def get_score_info(
     chain: ChainEnum, token_address: str = Depends(validate_token_address)
 ):
-    # Fetch required data from various sources
-    try:
-        supplySummary, transferrabilitySummary = await get_supply_transferrability_info(
-            chain, token_address
-        )
+    async def get_supply_transferrability_scores():
+        try:
+            (
+                supplySummary,
+                transferrabilitySummary,
+            ) = await get_supply_transferrability_info(chain, token_address)
+
+            # Format data into Score format objects
+            supply = Score(
+                value=supplySummary.score, description=supplySummary.summaryDescription
+            )
+            transferrability = Score(
+                value=transferrabilitySummary.score,
+                description=transferrabilitySummary.summaryDescription,
+            )
+        except ValidationError as e:
+            logging.error(
+                f"Exception: ValidationError was raised on call to format supply/transferrability into Score responses for {token_address} on chain {chain}: {e}"
+            )
+            supply, transferrability = Score(), Score()
+        except Exception as e:
+            logging.error(
+                f"Exception: During call to `get_supply_transferrability_info` for {token_address} on chain {chain}."
+            )
+            supply, transferrability = Score(), Score()
 
-        # Format data into Score format objects
-        supply = Score(
-            value=supplySummary.score, description=supplySummary.summaryDescription
-        )
-        transferrability = Score(
-            value=transferrabilitySummary.score,
-            description=transferrabilitySummary.summaryDescription,
-        )
-    except ValidationError as e:
-        logging.error(
-            f"Exception: ValidationError was raised on call to format supply/transferrability into Score responses for {token_address} on chain {chain}: {e}"
-        )
-        supply, transferrability = Score(), Score()
-    except Exception as e:
-        logging.error(
-            f"Exception: During call to `get_supply_transferrability_info` for {token_address} on chain {chain}."
-        )
-        supply, transferrability = Score(), Score()
+        return supply, transferrability
 
-    try:
-        # Attempt to queue up the clustering job
-        liquiditySummary = await get_token_clustering(chain, token_address)
+    async def get_liquidity_score():
+        try:
+            # Attempt to queue up the clustering job
+            liquiditySummary = await get_token_clustering(chain, token_address)
 
-        if isinstance(liquiditySummary, JSONResponse):
-            if liquiditySummary.status_code == 202:
-                liquidity = Score()
-            else:
-                logging.warning(
-                    f"Exception: A JSONResponse was returned from `get_token_clustering` for {token_address} on chain {chain}."
+            if isinstance(liquiditySummary, JSONResponse):
+                if liquiditySummary.status_code != 202:
+                    logging.warning(
+                        f"Exception: A JSONResponse was returned from `get_token_clustering` for {token_address} on chain {chain}."
+                    )
+                return Score()
+
+            try:
+                liquidity = Score(
+                    value=liquiditySummary.get("score"),
+                    description=liquiditySummary.get("description"),
+                )
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst formatting the liquidity score for {token_address} on chain {chain}."
                 )
                 liquidity = Score()
-
-        try:
-            liquidity = Score(
-                value=liquiditySummary.get("score"),
-                description=liquiditySummary.get("description"),
+        except ValidationError as e:
+            logging.error(
+                f"Exception: ValidationError was raised on call to format into liquidity into Score responses for {token_address} on chain {chain}: {e}"
             )
+            liquidity = Score()
         except Exception as e:
             logging.error(
-                f"Exception: An exception occurred whilst formatting the liquidity score for {token_address} on chain {chain}."
+                f"Exception: During call to `get_clustering_summary_from_cache` for {token_address} on chain {chain}."
             )
             liquidity = Score()
-    except ValidationError as e:
-        logging.error(
-            f"Exception: ValidationError was raised on call to format into liquidity into Score responses for {token_address} on chain {chain}: {e}"
-        )
-        liquidity = Score()
-    except Exception as e:
-        logging.error(
-            f"Exception: During call to `get_clustering_summary_from_cache` for {token_address} on chain {chain}."
-        )
-        liquidity = Score()
 
-    try:
-        # Attempt to queue up the audit job
-        auditSummary = await get_token_audit_summary(chain, token_address)
-
-        if isinstance(auditSummary, JSONResponse):
-            if auditSummary.status_code == 202:
-                audit = Score()
-            else:
-                logging.warning(
-                    f"Exception: A JSONResponse was returned from `get_token_audit_summary` for {token_address} on chain {chain}."
-                )
-                audit = Score()
+        return liquidity
 
+    async def get_audit_score():
         try:
-            audit = Score(value=float(auditSummary.overallScore), description=None)
+            # Attempt to queue up the audit job
+            auditSummary = await get_token_audit_summary(chain, token_address)
+
+            if isinstance(auditSummary, JSONResponse):
+                if auditSummary.status_code != 202:
+                    logging.warning(
+                        f"Exception: A JSONResponse was returned from `get_token_audit_summary` for {token_address} on chain {chain}."
+                    )
+                return Score()
+
+            try:
+                audit = Score(value=float(auditSummary.overallScore), description=None)
+            except Exception as e:
+                logging.error(
+                    f"Exception: An exception occurred whilst formatting the audit score for {token_address} on chain {chain}: {e}"
+                )
+                audit = Score(value=None, description=None)
+        except ValidationError as e:
+            logging.error(
+                f"Exception: ValidationError was raised on call to format into audit into Score responses for {token_address} on chain {chain}: {e}"
+            )
+            audit = Score()
         except Exception as e:
             logging.error(
-                f"Exception: An exception occurred whilst formatting the audit score for {token_address} on chain {chain}: {e}"
+                f"Exception: During call to `get_token_audit_summary` for {token_address} on chain {chain}: {e}"
             )
-            audit = Score(value=None, description=None)
-    except ValidationError as e:
-        logging.error(
-            f"Exception: ValidationError was raised on call to format into audit into Score responses for {token_address} on chain {chain}: {e}"
-        )
-        audit = Score()
-    except Exception as e:
-        logging.error(
-            f"Exception: During call to `get_token_audit_summary` for {token_address} on chain {chain}: {e}"
-        )
-        audit = Score()
+            audit = Score()
+
+        return audit
+
+    # Fetch the components concurrently, each bounded by its own deadline
+    (supply, transferrability), liquidity, audit = await asyncio.gather(
+        with_deadline(
+            get_supply_transferrability_scores(),
+            SUPPLY_TRANSFERRABILITY_SCORE_TIMEOUT,
+            (Score(), Score()),
+            f"supply/transferrability score for {token_address} on chain {chain}",
+        ),
+        with_deadline(
+            get_liquidity_score(),
+            LIQUIDITY_SCORE_TIMEOUT,
+            Score(),
+            f"liquidity score for {token_address} on chain {chain}",
+        ),
+        with_deadline(
+            get_audit_score(),
+            AUDIT_SCORE_TIMEOUT,
+            Score(),
+            f"audit score for {token_address} on chain {chain}",
+        ),
+    )
 
     scores = [supply, transferrability, liquidity, audit]
 
@@ -0,0 +1,191 @@
+"""
+Token holder distributions and their concentration metrics.
+
+The block explorer lists every holder of a token, which can be millions of accounts. Only the largest holders are
+kept, in a `TopHolders` heap, so that reading them stays bounded in memory and can stop early. The concentration
+metrics are computed from those holders together with the total supply and the total number of holders, which stand
+in for the holders that were not read.
+"""
+import heapq, math, numpy as np
+from decimal import Decimal
+from typing import Optional
+
+
+class TopHolders:
+    """
+    Bounded min-heap of the `k` holders with the largest quantities seen so far.
+    """
+
+    def __init__(self, k: int) -> None:
+        self.k = k
+        self.heap = []
+
+    def __len__(self) -> int:
+        return len(self.heap)
+
+    @property
+    def is_full(self) -> bool:
+        return len(self.heap) >= self.k
+
+    @property
+    def min_quantity(self) -> int:
+        return self.heap[0][0]
+
+    def add(self, address: str, quantity: int) -> None:
+        if not self.is_full:
+            heapq.heappush(self.heap, (quantity, address))
+        elif quantity > self.min_quantity:
+            heapq.heapreplace(self.heap, (quantity, address))
+
+    def items(self) -> list:
+        return sorted(self.heap, reverse=True)
+
+
+class HolderDistribution:
+    """
+    Token holders held as NumPy arrays, with vectorised top-K selection and concentration metrics.
+
+    Percentages are float64. Exact token quantities are kept as Python integers, since they can exceed 64 bits, and
+    are only combined with the percentages as `Decimal` values when the holders are written to DynamoDB.
+
+    The holders given may be only the largest ones, out of `num_holders` holders of the token. The remaining holders
+    are assumed to hold equal shares of the supply which the holders given do not hold. This makes the Gini
+    coefficient a lower bound and the Nakamoto coefficient, when the holders given do not reach the threshold, an
+    upper bound. Both are exact when every holder is given.
+    """
+
+    def __init__(
+        self,
+        addresses: list,
+        quantities: list,
+        percentages: np.ndarray,
+        num_holders: Optional[int] = None,
+    ):
+        self.addresses = addresses
+        self.quantities = quantities
+        self.percentages = percentages
+        self.num_holders = max(len(addresses), int(num_holders or 0))
+
+    def __len__(self) -> int:
+        return len(self.addresses)
+
+    @classmethod
+    def from_explorer(
+        cls,
+        result: list,
+        total_supply: float,
+        num_holders: Optional[int] = None,
+    ) -> "HolderDistribution":
+        addresses = [item.get("TokenHolderAddress") for item in result]
+        quantities = [int(item.get("TokenHolderQuantity")) for item in result]
+        balances = np.fromiter(
+            map(float, quantities), dtype=np.float64, count=len(quantities)
+        )
+
+        return cls(addresses, quantities, balances / total_supply, num_holders)
+
+    @classmethod
+    def from_stored(
+        cls, holders: dict, num_holders: Optional[int] = None
+    ) -> "HolderDistribution":
+        addresses = list(holders)
+        quantities = [int(holders[address]["numTokens"]) for address in addresses]
+        percentages = np.fromiter(
+            (float(holders[address]["percentTokens"]) for address in addresses),
+            dtype=np.float64,
+            count=len(addresses),
+        )
+
+        return cls(addresses, quantities, percentages, num_holders)
+
+    @property
+    def num_remaining(self) -> int:
+        """
+        Number of holders of the token which were not given.
+        """
+        return self.num_holders - len(self)
+
+    @property
+    def remaining_share(self) -> float:
+        """
+        Share of the total supply held by each of the holders which were not given, assuming equal shares.
+        """
+        if self.num_remaining == 0:
+            return 0.0
+        return max(0.0, 1.0 - float(self.percentages.sum())) / self.num_remaining
+
+    def top_indices(self, k: int) -> np.ndarray:
+        """
+        Indices of the `k` largest holders in descending order, found in O(n + k log k).
+        """
+        k = min(k, len(self))
+        if k <= 0:
+            return np.array([], dtype=np.int64)
+
+        indices = np.argpartition(-self.percentages, k - 1)[:k]
+        return indices[np.argsort(-self.percentages[indices], kind="stable")]
+
+    def top_share(self, n: int = 10) -> float:
+        return float(self.percentages[self.top_indices(n)].sum())
+
+    def gini(self) -> float:
+        """
+        Gini coefficient of the balances of every holder, where the holders which were not given count as a single
+        group of equal balances, so that the cost does not depend on the number of holders.
+        """
+        values = np.append(self.percentages, self.remaining_share)
+        counts = np.append(np.ones(len(self)), self.num_remaining)
+
+        order = np.argsort(values, kind="stable")
+        values, counts = values[order], counts[order]
+
+        n, total = counts.sum(), np.dot(counts, values)
+        if n == 0 or total <= 0:
+            return 0.0
+
+        # Sum of rank * value over every holder, where each group takes the ranks following the groups before it
+        ranks_before = np.cumsum(counts) - counts
+        weighted_sum = np.dot(values, counts * ranks_before + counts * (counts + 1) / 2)
+        return float(2 * weighted_sum / (n * total) - (n + 1) / n)
+
+    def nakamoto_coefficient(self, threshold: float = 0.5) -> Optional[int]:
+        """
+        Smallest number of holders which together hold more than `threshold` of the total supply, or None if every
+        holder together does not reach it.
+        """
+        cumulative_shares = np.cumsum(-np.sort(-self.percentages))
+        position = int(np.searchsorted(cumulative_shares, threshold, side="right"))
+        if position < len(cumulative_shares):
+            return position + 1
+
+        remaining_share = self.remaining_share
+        if remaining_share <= 0:
+            return None
+
+        held = float(cumulative_shares[-1]) if len(cumulative_shares) else 0.0
+        # Shares are rounded, so a quotient within rounding error of an integer counts as that integer
+        num_remaining = int(math.floor((threshold - held) / remaining_share + 1e-9)) + 1
+        return (
+            len(self) + num_remaining if num_remaining <= self.num_remaining else None
+        )
+
+    def to_item(self, k: Optional[int] = None) -> dict:
+        """
+        The `k` largest holders, or all of them, in the format stored in the `holders` table.
+        """
+        return {
+            self.addresses[i]: {
+                "numTokens": self.quantities[i],
+                "percentTokens": Decimal(str(float(self.percentages[i]))),
+            }
+            for i in self.top_indices(len(self) if k is None else k)
+        }
+
+    def concentration(self) -> dict:
+        nakamoto_coefficient = self.nakamoto_coefficient()
+        return {
+            "numHolders": self.num_holders,
+            "top10Share": Decimal(str(self.top_share(10))),
+            "gini": Decimal(str(self.gini())),
+            "nakamotoCoefficient": nakamoto_coefficient,
+        }
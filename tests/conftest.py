@@ -0,0 +1,6 @@
+import os
+
+# Modules sharing the Redis connection pools read its address on import. Tests which reach Redis only exercise the
+# paths taken when it is unavailable, so no server is needed
+os.environ.setdefault("REDIS_CLIENT_URL", "localhost")
+os.environ.setdefault("REDIS_CLIENT_PORT", "6379")
@@ -0,0 +1,81 @@
+import asyncio
+
+
+from src.v1.shared.batcher import Batcher
+
+
+def create_batcher(calls, fail=False, max_batch_size=10):
+    async def fetch_many(group, keys):
+        calls.append((group, sorted(keys)))
+        if fail:
+            raise RuntimeError("upstream failed")
+        return {key: f"{group}:{key}" for key in keys if key != "missing"}
+
+    return Batcher(
+        "test", fetch_many=fetch_many, window=0.01, max_batch_size=max_batch_size
+    )
+
+
+def test_concurrent_lookups_share_a_call():
+    calls = []
+
+    async def run():
+        batcher = create_batcher(calls)
+        return await asyncio.gather(
+            batcher.get("ethereum", "a"),
+            batcher.get("ethereum", "b"),
+            batcher.get("ethereum", "a"),
+            batcher.get("base", "a"),
+        )
+
+    assert asyncio.run(run()) == ["ethereum:a", "ethereum:b", "ethereum:a", "base:a"]
+    assert sorted(calls) == [("base", ["a"]), ("ethereum", ["a", "b"])]
+
+
+def test_full_batch_is_sent_early():
+    calls = []
+
+    async def run():
+        batcher = create_batcher(calls, max_batch_size=2)
+        return await asyncio.gather(*[batcher.get("ethereum", key) for key in "abc"])
+
+    assert asyncio.run(run()) == ["ethereum:a", "ethereum:b", "ethereum:c"]
+    assert calls == [("ethereum", ["a", "b"]), ("ethereum", ["c"])]
+
+
+def test_missing_key_raises_key_error():
+    async def run():
+        batcher = create_batcher([])
+        return await asyncio.gather(
+            batcher.get("ethereum", "a"),
+            batcher.get("ethereum", "missing"),
+            return_exceptions=True,
+        )
+
+    found, missing = asyncio.run(run())
+    assert found == "ethereum:a"
+    assert isinstance(missing, KeyError)
+
+
+def test_failed_call_raises_in_every_caller():
+    async def run():
+        batcher = create_batcher([], fail=True)
+        return await asyncio.gather(
+            batcher.get("ethereum", "a"),
+            batcher.get("ethereum", "b"),
+            return_exceptions=True,
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+
+def test_cancelled_caller_does_not_affect_others():
+    async def run():
+        batcher = create_batcher([])
+        cancelled = asyncio.ensure_future(batcher.get("ethereum", "a"))
+        other = asyncio.ensure_future(batcher.get("ethereum", "a"))
+        await asyncio.sleep(0)
+        cancelled.cancel()
+        return await other
+
+    assert asyncio.run(run()) == "ethereum:a"
@@ -0,0 +1,84 @@
+import time
+
+from src.v1.shared.cache import LocalCache, CacheInvalidationListener, ORIGIN
+
+
+def test_get_returns_copy_of_entry():
+    cache = LocalCache(max_bytes=1024)
+    cache.put("key", {"items": [{"chain": "{}"}]}, size=10, ttl=60)
+
+    cache.get("key")["items"][0]["chain"] = {"id": 1}
+
+    assert cache.get("key") == {"items": [{"chain": "{}"}]}
+
+
+def test_size_is_tracked_in_bytes():
+    cache = LocalCache(max_bytes=1000)
+    cache.put("a", "a", size=100, ttl=60)
+    cache.put("b", "b", size=200, ttl=60)
+    assert cache.size == 300
+
+    # Replacing an entry releases the size of the previous value
+    cache.put("a", "a", size=50, ttl=60)
+    assert cache.size == 250
+    assert len(cache) == 2
+
+
+def test_least_recently_used_entries_are_evicted():
+    cache = LocalCache(max_bytes=1000)
+    for key in ["a", "b", "c", "d"]:
+        cache.put(key, key, size=250, ttl=60)
+
+    cache.get("a")
+    cache.put("e", "e", size=250, ttl=60)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "a"
+    assert cache.size == 1000
+
+
+def test_large_values_are_not_cached():
+    cache = LocalCache(max_bytes=1000)
+    cache.put("key", "old", size=10, ttl=60)
+    cache.put("key", "new", size=251, ttl=60)
+
+    # The previous value is dropped rather than served stale
+    assert cache.get("key") is None
+    assert cache.size == 0
+
+
+def test_entries_expire():
+    cache = LocalCache(max_bytes=1000)
+    cache.put("key", "value", size=10, ttl=0.01)
+    time.sleep(0.02)
+
+    assert cache.get("key") is None
+    assert cache.size == 0
+    assert cache.misses == 1
+
+
+def test_invalidate_and_clear():
+    cache = LocalCache(max_bytes=1000)
+    cache.put("a", "a", size=10, ttl=60)
+    cache.put("b", "b", size=10, ttl=60)
+
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.size == 10
+
+    cache.clear()
+    assert len(cache) == 0
+    assert cache.size == 0
+
+
+def test_invalidation_messages_from_other_workers():
+    cache = LocalCache(max_bytes=1000)
+    listener = CacheInvalidationListener(cache, create_client=None, channel="test")
+    cache.put("key", "value", size=10, ttl=60)
+
+    # Messages published by this worker are ignored
+    listener.handle_message(listener.encode_message("key").encode("utf-8"))
+    assert cache.get("key") == "value"
+
+    listener.handle_message(f"{'0' * len(ORIGIN)}|key".encode("utf-8"))
+    assert cache.get("key") is None
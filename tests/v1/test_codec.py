@@ -0,0 +1,105 @@
+import json
+from decimal import Decimal
+
+import pytest
+
+from src.v1.shared.codec import (
+    RAOCodec,
+    MAGIC,
+    HEADER_VERSION,
+    HEADER_SIZE,
+    FORMAT_JSON,
+    COMPRESSION_NONE,
+    COMPRESSION_ZSTD,
+)
+
+DATA = {
+    "address": "0x" + "ab" * 20,
+    "score": 87.5,
+    "holders": [{"numTokens": 10**18, "percentTokens": 0.25}] * 3,
+    "verified": True,
+    "owner": None,
+}
+
+
+@pytest.mark.parametrize("fmt", ["orjson", "msgpack", "json"])
+@pytest.mark.parametrize("compression", ["zstd", "zlib", None])
+def test_round_trip(fmt, compression):
+    codec = RAOCodec(fmt=fmt, compression=compression, compression_threshold=16)
+    encoded = codec.encode(DATA)
+
+    assert encoded[0] == MAGIC
+    assert encoded[1] == HEADER_VERSION
+    assert codec.decode(encoded) == DATA
+
+
+def test_decodes_legacy_json():
+    codec = RAOCodec()
+    legacy = json.dumps(DATA)
+
+    assert codec.decode(legacy) == DATA
+    assert codec.decode(legacy.encode("utf-8")) == DATA
+
+
+def test_decimals_are_encoded_as_floats():
+    codec = RAOCodec()
+    assert codec.decode(codec.encode({"value": Decimal("0.125")})) == {"value": 0.125}
+
+
+def test_integers_beyond_64_bits_fall_back_to_json():
+    codec = RAOCodec(fmt="orjson")
+    encoded = codec.encode({"numTokens": 2**70})
+
+    assert encoded[2] == FORMAT_JSON
+    assert codec.decode(encoded) == {"numTokens": 2**70}
+
+
+def test_values_below_threshold_are_not_compressed():
+    codec = RAOCodec(compression_threshold=1024)
+    encoded = codec.encode({"value": "a" * 100})
+
+    assert encoded[3] == COMPRESSION_NONE
+
+
+def test_values_above_threshold_are_compressed():
+    codec = RAOCodec(compression_threshold=1024)
+    data = {"value": "a" * 4096}
+    encoded = codec.encode(data)
+
+    assert encoded[3] == codec.compression
+    assert len(encoded) < 4096
+    assert codec.decode(encoded) == data
+
+
+def test_zstd_is_used_above_threshold():
+    pytest.importorskip("zstandard")
+
+    codec = RAOCodec(compression="zstd", compression_threshold=1024)
+    encoded = codec.encode({"value": "a" * 4096})
+
+    assert encoded[3] == COMPRESSION_ZSTD
+
+
+def test_compression_is_dropped_when_it_does_not_shrink_the_value():
+    # The zlib header and checksum make a short body larger
+    codec = RAOCodec(compression="zlib", compression_threshold=1)
+    encoded = codec.encode({"a": 1})
+
+    assert encoded[3] == COMPRESSION_NONE
+    assert codec.decode(encoded) == {"a": 1}
+
+
+def test_unknown_header_version_is_rejected():
+    codec = RAOCodec()
+    encoded = bytearray(codec.encode(DATA))
+    encoded[1] = HEADER_VERSION + 1
+
+    with pytest.raises(ValueError):
+        codec.decode(bytes(encoded))
+
+
+def test_header_size():
+    codec = RAOCodec(fmt="json", compression=None)
+    encoded = codec.encode([1, 2, 3])
+
+    assert json.loads(encoded[HEADER_SIZE:]) == [1, 2, 3]
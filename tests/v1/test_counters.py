@@ -0,0 +1,146 @@
+import asyncio
+from collections import defaultdict
+from types import SimpleNamespace
+
+import pytest
+
+from src.v1.feeds import counters
+from src.v1.feeds.counters import ViewCounter
+from src.v1.shared.redis_client import REDIS_CIRCUIT_BREAKER
+
+
+@pytest.fixture(autouse=True)
+def close_redis_circuit():
+    # Other tests run without a Redis server, which may have opened the shared circuit
+    REDIS_CIRCUIT_BREAKER.record_success()
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self.commands.append((name, args))
+
+    async def execute(self):
+        if self.client.error:
+            raise self.client.error
+        return [getattr(self.client, name)(*args) for name, args in self.commands]
+
+
+class FakeRedis:
+    """
+    Sorted sets held in memory, with members returned as bytes as redis-py does.
+    """
+
+    def __init__(self):
+        self.sets = defaultdict(dict)
+        self.error = None
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def zincrby(self, key, amount, member):
+        self.sets[key][member] = self.sets[key].get(member, 0) + amount
+
+    def expire(self, key, seconds):
+        pass
+
+    def zunionstore(self, key, keys):
+        union = defaultdict(float)
+        for source in keys:
+            for member, score in self.sets.get(source, {}).items():
+                union[member] += score
+        self.sets[key] = dict(union)
+
+    async def exists(self, key):
+        if self.error:
+            raise self.error
+        return int(key in self.sets)
+
+    async def zrevrange(self, key, start, end, withscores=False):
+        members = sorted(self.sets.get(key, {}).items(), key=lambda item: -item[1])
+        return [
+            (member.encode("utf-8"), float(score))
+            for member, score in members[start : end + 1]
+        ]
+
+
+def create_counter(monkeypatch, now):
+    clock = SimpleNamespace(time=lambda: now[0])
+    monkeypatch.setattr(counters, "time", clock)
+
+    counter = ViewCounter("test", window=3600, bucket_size=600)
+    counter.client = FakeRedis()
+    return counter
+
+
+def test_buckets_cover_the_window(monkeypatch):
+    counter = create_counter(monkeypatch, [6000])
+
+    assert counter.get_buckets() == [5, 6, 7, 8, 9, 10]
+    assert counter.generate_bucket_key(10) == "viewcounter_test_10"
+    assert counter.generate_leaderboard_key(10) == "viewcounter_test_top_10"
+
+
+def test_top_members_across_buckets(monkeypatch):
+    now = [6000]
+    counter = create_counter(monkeypatch, now)
+
+    async def run():
+        for member in ["a", "b", "b", "c"]:
+            await counter.increment(member)
+        now[0] += 600
+        for member in ["c", "c", "a"]:
+            await counter.increment(member)
+        return await counter.top(2)
+
+    assert asyncio.run(run()) == [("c", 3), ("a", 2)]
+
+
+def test_views_leave_the_window(monkeypatch):
+    now = [6000]
+    counter = create_counter(monkeypatch, now)
+
+    async def run():
+        await counter.increment("old")
+        now[0] += 3600
+        await counter.increment("new")
+        return await counter.top(10)
+
+    assert asyncio.run(run()) == [("new", 1)]
+
+
+def test_leaderboard_is_cached_for_a_bucket(monkeypatch):
+    now = [6000]
+    counter = create_counter(monkeypatch, now)
+
+    async def run():
+        await counter.increment("a")
+        first = await counter.top(10)
+        await counter.increment("b")
+        cached = await counter.top(10)
+        now[0] += 600
+        return first, cached, await counter.top(10)
+
+    first, cached, refreshed = asyncio.run(run())
+    assert first == cached == [("a", 1)]
+    assert sorted(refreshed) == [("a", 1), ("b", 1)]
+
+
+def test_redis_errors_are_not_raised(monkeypatch):
+    counter = create_counter(monkeypatch, [6000])
+    counter.client.error = RuntimeError("Redis is unavailable")
+
+    async def run():
+        await counter.increment("a")
+        return await counter.top(10)
+
+    assert asyncio.run(run()) is None
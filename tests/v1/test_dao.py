@@ -0,0 +1,186 @@
+import asyncio, uuid
+from decimal import Decimal
+
+import pytest
+from boto3.dynamodb.types import TypeSerializer
+
+from src.v1.shared.codec import RAOCodec
+from src.v1.shared.DAO import AsyncDAO, AsyncRAO
+from src.v1.shared.redis_client import REDIS_CIRCUIT_BREAKER
+
+
+@pytest.fixture(autouse=True)
+def close_redis_circuit():
+    # Other tests run without a Redis server, which may have opened the shared circuit
+    REDIS_CIRCUIT_BREAKER.record_success()
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        return False
+
+    def set(self, key, value, ex=None):
+        self.commands.append(("set", key, value))
+
+    def publish(self, channel, message):
+        self.commands.append(("publish", channel, message))
+
+    async def execute(self):
+        self.client.round_trips += 1
+        for command, key, value in self.commands:
+            if command == "set":
+                self.client.values[key] = value
+        return [True] * len(self.commands)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+        self.round_trips = 0
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    async def get(self, key):
+        self.round_trips += 1
+        return self.values.get(key)
+
+    async def mget(self, keys):
+        self.round_trips += 1
+        return [self.values.get(key) for key in keys]
+
+
+class FakeRAO(AsyncRAO):
+    def __init__(self, local_tte=None):
+        super().__init__(prefix=f"test_{uuid.uuid4().hex}", local_tte=local_tte)
+
+    def create_client(self):
+        return FakeRedis()
+
+
+class FakeTable:
+    """
+    Records the calls made to a DynamoDB table, serialising their arguments as boto3 does before sending them.
+    """
+
+    def __init__(self, items=None):
+        self.serializer = TypeSerializer()
+        self.items = items or {}
+        self.queries = []
+        self.updates = []
+
+    def query(self, **kwargs):
+        _, pk = kwargs["KeyConditionExpression"].get_expression()["values"]
+        self.queries.append(pk)
+        return {"Items": [self.items[pk]] if pk in self.items else []}
+
+    def update_item(self, **kwargs):
+        for value in [
+            *kwargs["Key"].values(),
+            *kwargs["ExpressionAttributeValues"].values(),
+        ]:
+            self.serializer.serialize(value)
+        self.updates.append(kwargs)
+        return {}
+
+
+class FakeDAO(AsyncDAO):
+    def __init__(self, rao=None, items=None):
+        self.table_name = "test"
+        self.region_name = "eu-west-2"
+        self.rao = rao
+        self.partition_key_name = "pk"
+        self.partition_range_name = "timestamp"
+        self.fake_table = FakeTable(items)
+
+    def _thread_table(self):
+        return self.fake_table
+
+
+def test_update_one_accepts_report_read_from_redis():
+    dao = FakeDAO()
+    report = {"pk": "ethereum_0xa", "timestamp": Decimal(1700000000), "summary": "S"}
+
+    # Numbers in documents cached in Redis are decoded as floats
+    cached = RAOCodec().decode(RAOCodec().encode(report))
+    assert isinstance(cached["timestamp"], float)
+
+    updated = asyncio.run(
+        dao.update_one("ethereum_0xa", cached, {"refreshedAt": 1700000600})
+    )
+
+    [update] = dao.fake_table.updates
+    assert update["Key"] == {"pk": "ethereum_0xa", "timestamp": Decimal(1700000000)}
+    assert update["UpdateExpression"] == "SET #a0 = :a0"
+    assert update["ExpressionAttributeNames"] == {"#a0": "refreshedAt"}
+    assert update["ExpressionAttributeValues"] == {":a0": 1700000600}
+    assert updated["refreshedAt"] == 1700000600
+
+
+def test_update_one_keeps_fractional_numbers():
+    dao = FakeDAO()
+    dao.partition_range_name = None
+
+    asyncio.run(dao.update_one("ethereum_0xa", {}, {"score": 87.5}))
+
+    [update] = dao.fake_table.updates
+    assert update["Key"] == {"pk": "ethereum_0xa"}
+    assert update["ExpressionAttributeValues"] == {":a0": Decimal("87.5")}
+
+
+def test_put_many_and_get_many_use_one_round_trip_each():
+    rao = FakeRAO()
+    asyncio.run(rao.put_many({"a": {"value": 1}, "b": {"value": 2}}))
+
+    assert rao.client.round_trips == 1
+    assert asyncio.run(rao.get_many(["a", "b", "c"])) == {
+        "a": {"value": 1},
+        "b": {"value": 2},
+        "c": None,
+    }
+    assert rao.client.round_trips == 2
+
+
+def test_get_many_only_fetches_keys_missing_locally():
+    rao = FakeRAO(local_tte=60)
+    asyncio.run(rao.put_many({"a": {"value": 1}}))
+    rao.client.values[rao.generate_key("b")] = rao.serialise({"value": 2})
+
+    fetched = []
+    mget = rao.client.mget
+
+    async def record_mget(keys):
+        fetched.extend(keys)
+        return await mget(keys)
+
+    rao.client.mget = record_mget
+
+    assert asyncio.run(rao.get_many(["a", "b"])) == {
+        "a": {"value": 1},
+        "b": {"value": 2},
+    }
+    assert fetched == [rao.generate_key("b")]
+
+
+def test_find_most_recent_many_only_queries_keys_missing_from_redis():
+    rao = FakeRAO()
+    asyncio.run(rao.put_many({"a": {"pk": "a", "timestamp": 1}}))
+    dao = FakeDAO(rao=rao, items={"b": {"pk": "b", "timestamp": 2}})
+
+    documents = asyncio.run(dao.find_most_recent_many(["a", "b", "c", "a"]))
+
+    assert documents == {
+        "a": {"pk": "a", "timestamp": 1},
+        "b": {"pk": "b", "timestamp": 2},
+        "c": None,
+    }
+    assert sorted(dao.fake_table.queries) == ["b", "c"]
+    # Documents found in DynamoDB are written back to Redis
+    assert asyncio.run(rao.get("b")) == {"pk": "b", "timestamp": 2}
@@ -0,0 +1,76 @@
+import asyncio
+
+from src.v1.feeds.enrichment import fetch_unique
+
+
+def test_identical_keys_are_fetched_once():
+    calls = []
+
+    async def fetch(chain, token_address):
+        calls.append((chain, token_address))
+        return f"{chain}:{token_address}"
+
+    keys = [("ethereum", "0xa"), ("base", "0xa"), ("ethereum", "0xa")]
+    output = asyncio.run(fetch_unique(keys, fetch, concurrency=4, timeout=1))
+
+    assert output == {("ethereum", "0xa"): "ethereum:0xa", ("base", "0xa"): "base:0xa"}
+    assert calls == [("ethereum", "0xa"), ("base", "0xa")]
+
+
+def test_concurrency_is_bounded():
+    running, peak = 0, 0
+
+    async def fetch(key):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return key
+
+    output = asyncio.run(fetch_unique(range(10), fetch, concurrency=3, timeout=1))
+
+    assert output == {key: key for key in range(10)}
+    assert peak == 3
+
+
+def test_slow_keys_are_cancelled_at_the_deadline():
+    cancelled = []
+
+    async def fetch(key):
+        try:
+            await asyncio.sleep(0 if key == "fast" else 10)
+        except asyncio.CancelledError:
+            cancelled.append(key)
+            raise
+        return key
+
+    async def run():
+        output = await fetch_unique(
+            ["fast", "slow"], fetch, concurrency=2, timeout=0.05
+        )
+        await asyncio.sleep(0)
+        return output
+
+    assert asyncio.run(run()) == {"fast": "fast"}
+    assert cancelled == ["slow"]
+
+
+def test_failed_and_empty_keys_are_left_out():
+    async def fetch(key):
+        if key == "error":
+            raise RuntimeError("Upstream is unavailable")
+        return None if key == "empty" else key
+
+    output = asyncio.run(
+        fetch_unique(["error", "empty", "value"], fetch, concurrency=2, timeout=1)
+    )
+
+    assert output == {"value": "value"}
+
+
+def test_no_keys():
+    async def fetch(key):
+        return key
+
+    assert asyncio.run(fetch_unique([], fetch, concurrency=2, timeout=1)) == {}
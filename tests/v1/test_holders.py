@@ -0,0 +1,157 @@
+import numpy as np
+import pytest
+from decimal import Decimal
+
+from src.v1.tokens.holders import TopHolders, HolderDistribution
+
+
+def make_distribution(quantities, total_supply=None, top_k=None):
+    total_supply = total_supply or sum(quantities)
+    result = [
+        {"TokenHolderAddress": f"0x{i:040x}", "TokenHolderQuantity": str(quantity)}
+        for i, quantity in enumerate(quantities)
+    ]
+    if top_k is None:
+        return HolderDistribution.from_explorer(result, total_supply)
+
+    top = sorted(result, key=lambda item: -int(item["TokenHolderQuantity"]))[:top_k]
+    return HolderDistribution.from_explorer(
+        top, total_supply, num_holders=len(quantities)
+    )
+
+
+def test_top_holders_keeps_largest_in_descending_order():
+    top_holders = TopHolders(3)
+    for address, quantity in [("a", 5), ("b", 1), ("c", 9), ("d", 7), ("e", 3)]:
+        top_holders.add(address, quantity)
+
+    assert len(top_holders) == 3
+    assert top_holders.is_full
+    assert top_holders.min_quantity == 5
+    assert top_holders.items() == [(9, "c"), (7, "d"), (5, "a")]
+
+
+def test_top_holders_ignores_quantities_below_minimum():
+    top_holders = TopHolders(2)
+    for address, quantity in [("a", 10), ("b", 20), ("c", 10), ("d", 1)]:
+        top_holders.add(address, quantity)
+
+    assert [quantity for quantity, _ in top_holders.items()] == [20, 10]
+
+
+def test_top_holders_keeps_quantities_beyond_64_bits():
+    top_holders = TopHolders(1)
+    top_holders.add("a", 2**64)
+    top_holders.add("b", 2**70)
+
+    assert top_holders.items() == [(2**70, "b")]
+
+
+def test_top_indices():
+    distribution = make_distribution([3, 10, 1, 7, 5])
+
+    assert distribution.top_indices(3).tolist() == [1, 3, 4]
+    assert distribution.top_indices(10).tolist() == [1, 3, 4, 0, 2]
+    assert distribution.top_indices(0).tolist() == []
+
+
+def test_gini_of_equal_balances_is_zero():
+    assert make_distribution([5] * 10).gini() == pytest.approx(0.0)
+
+
+def test_gini_of_single_holder_among_many():
+    # One holder with everything out of n holders has a Gini coefficient of (n - 1) / n
+    distribution = make_distribution([0] * 9 + [100])
+    assert distribution.gini() == pytest.approx(0.9)
+
+
+def test_gini_of_known_distribution():
+    # Mean absolute difference of [1, 2, 3, 4] is 1.25, divided by twice the mean of 2.5
+    assert make_distribution([1, 2, 3, 4]).gini() == pytest.approx(0.25)
+
+
+def test_nakamoto_coefficient():
+    distribution = make_distribution([40, 30, 20, 10])
+
+    assert distribution.nakamoto_coefficient() == 2
+    assert distribution.nakamoto_coefficient(0.4) == 2
+    assert distribution.nakamoto_coefficient(0.39) == 1
+
+
+def test_nakamoto_coefficient_not_reached():
+    # The holders listed only hold 40% of the total supply
+    assert (
+        make_distribution([20, 10, 10], total_supply=100).nakamoto_coefficient() is None
+    )
+
+
+def test_concentration_of_top_holders_with_equal_remaining_balances_is_exact():
+    quantities = [1000, 500, 21, 10] + [1] * 5000
+    distribution = make_distribution(quantities, top_k=10)
+    expected = make_distribution(quantities)
+
+    assert len(distribution) == 10
+    assert distribution.num_remaining == 4994
+    assert distribution.concentration() == pytest.approx(expected.concentration())
+    assert distribution.concentration()["numHolders"] == 5004
+
+
+def test_gini_of_top_holders_is_a_lower_bound():
+    quantities = [1000, 500] + list(range(1, 5001))
+    distribution = make_distribution(quantities, top_k=100)
+
+    assert distribution.gini() <= make_distribution(quantities).gini()
+    # The remaining holders count as holders of equal balances
+    top = sorted(quantities)[-100:]
+    remaining = [sum(sorted(quantities)[:-100]) / (len(quantities) - 100)] * (
+        len(quantities) - 100
+    )
+    expected = HolderDistribution(
+        [None] * len(quantities),
+        top + remaining,
+        np.array(top + remaining) / sum(quantities),
+    )
+    assert distribution.gini() == pytest.approx(expected.gini())
+
+
+def test_nakamoto_coefficient_beyond_top_holders():
+    # The top 2 holders hold 3050 of 10050 tokens, so 20 of the 70 remaining holders of 100 tokens are needed
+    quantities = [2050, 1000] + [100] * 70
+
+    assert make_distribution(quantities, top_k=2).nakamoto_coefficient() == 22
+    assert make_distribution(quantities).nakamoto_coefficient() == 22
+
+
+def test_nakamoto_coefficient_not_reached_without_remaining_holders():
+    distribution = HolderDistribution.from_explorer(
+        [{"TokenHolderAddress": "0xa", "TokenHolderQuantity": "20"}],
+        100,
+        num_holders=1,
+    )
+
+    assert distribution.nakamoto_coefficient() is None
+
+
+def test_concentration_of_stored_holders():
+    distribution = HolderDistribution.from_stored(
+        {
+            "0xa": {"numTokens": 60, "percentTokens": "0.6"},
+            "0xb": {"numTokens": 40, "percentTokens": "0.4"},
+        }
+    )
+    concentration = distribution.concentration()
+
+    assert concentration["numHolders"] == 2
+    assert float(concentration["gini"]) == pytest.approx(0.1)
+    assert concentration["nakamotoCoefficient"] == 1
+    assert float(concentration["top10Share"]) == pytest.approx(1.0)
+
+
+def test_concentration_of_stored_top_holders():
+    distribution = HolderDistribution.from_stored(
+        {"0xa": {"numTokens": 60, "percentTokens": "0.6"}}, num_holders=Decimal(5)
+    )
+
+    assert distribution.num_remaining == 4
+    assert distribution.remaining_share == pytest.approx(0.1)
+    assert distribution.concentration()["numHolders"] == 5
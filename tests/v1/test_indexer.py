@@ -0,0 +1,108 @@
+import pytest
+
+from src.v1.feeds.indexer import (
+    PoolRecord,
+    MappedPoolIndex,
+    apply_pools,
+    write_index_file,
+)
+
+
+def address(value: int) -> str:
+    return "0x%040x" % value
+
+
+def pool(value: int, token0: int, token1: int, dex: str = "uniswapv2") -> dict:
+    return {
+        "address": address(value),
+        "token0": address(token0),
+        "token1": address(token1),
+        "dex": dex,
+    }
+
+
+def test_apply_pools_keeps_newest_first_and_unique():
+    index = apply_pools({}, [pool(1, 10, 11), pool(2, 10, 12)])
+    apply_pools(index, [pool(3, 10, 13, "sushiswap"), pool(1, 10, 11, "uniswapv3")])
+
+    assert [record.address for record in index[address(10)]] == [
+        address(1),
+        address(3),
+        address(2),
+    ]
+    assert index[address(10)][0].dex == "uniswapv3"
+
+
+def test_apply_pools_skips_malformed_pools():
+    index = apply_pools({}, [{"address": address(1)}, pool(2, 10, 11)])
+
+    assert list(index) == [address(10), address(11)]
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / "ethereum.idx")
+    index = apply_pools(
+        {},
+        [
+            pool(1, 10, 11),
+            pool(2, 10, 12, "sushiswap"),
+            pool(3, 12, 11, "uniswapv3"),
+        ],
+    )
+    write_index_file(path, index)
+
+    view = MappedPoolIndex(path)
+    assert view.reload()
+    assert len(view) == 3
+
+    for token, records in index.items():
+        mapped = view.get(token)
+        assert [(r.address, r.token0, r.token1, r.dex) for r in mapped] == [
+            (r.address, r.token0, r.token1, r.dex) for r in records
+        ]
+
+    assert list(view.to_dict()) == sorted(index)
+
+
+def test_lookup_is_case_insensitive_and_defaults(tmp_path):
+    path = str(tmp_path / "ethereum.idx")
+    write_index_file(path, apply_pools({}, [pool(0xABC, 0xDEF, 0x123)]))
+
+    view = MappedPoolIndex(path)
+    view.reload()
+
+    records = view.get("0x" + address(0xDEF)[2:].upper())
+    assert records[0]["address"] == address(0xABC)
+    assert view.get(address(0x999)) is None
+    assert view.get("not an address", ()) == ()
+
+
+def test_reload_only_when_replaced(tmp_path):
+    path = str(tmp_path / "ethereum.idx")
+    view = MappedPoolIndex(path)
+    assert not view.reload()
+
+    write_index_file(path, apply_pools({}, [pool(1, 10, 11)]))
+    assert view.reload()
+    assert not view.reload()
+
+    write_index_file(path, apply_pools({}, [pool(1, 10, 11), pool(2, 12, 13)]))
+    assert view.reload()
+    assert len(view) == 4
+
+
+def test_unknown_format_is_rejected(tmp_path):
+    path = tmp_path / "ethereum.idx"
+    path.write_bytes(b"\x00" * 64)
+
+    with pytest.raises(ValueError):
+        MappedPoolIndex(str(path)).reload()
+
+
+def test_pool_record_item_access():
+    record = PoolRecord.from_dict(pool(1, 10, 11))
+
+    assert record["token0"] == address(10)
+    assert record.get("missing") is None
+    with pytest.raises(KeyError):
+        record["missing"]
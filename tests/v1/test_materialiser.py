@@ -0,0 +1,169 @@
+import asyncio
+
+from src.v1.feeds.materialiser import TokenEventFeed, ALL_CHAINS
+
+
+def rows(*events):
+    """
+    Columns of `TOKEN_EVENTS_SINCE_QUERY` for (event hash, chain, time in ms, name) tuples, as returned untyped.
+    """
+    columns = {
+        "eventHash": [],
+        "blockchain": [],
+        "time_ms": [],
+        "measure_name": [],
+        "measure_value::double": [],
+        "measure_value::varchar": [],
+    }
+
+    for event_hash, chain, time_ms, name in events:
+        for measure_name, double, varchar in [
+            ("timestamp", str(float(time_ms // 1000)), None),
+            ("name", None, name),
+        ]:
+            columns["eventHash"].append(event_hash)
+            columns["blockchain"].append(chain)
+            columns["time_ms"].append(str(time_ms))
+            columns["measure_name"].append(measure_name)
+            columns["measure_value::double"].append(double)
+            columns["measure_value::varchar"].append(varchar)
+
+    return columns
+
+
+class FakeQueryClient:
+    def __init__(self, columns=None):
+        self.columns = columns
+        self.queries = []
+
+    async def query(self, template, columns=None, typed=True, **params):
+        self.queries.append(template.name)
+        if self.columns is None:
+            raise RuntimeError("Timestream is unavailable")
+        return self.columns
+
+
+class FakeRAO:
+    def __init__(self, values=None):
+        self.values = values or {}
+
+    async def get(self, pk):
+        return self.values.get(pk)
+
+
+def create_feed(query_client=None, length=2):
+    feed = TokenEventFeed(
+        query_client or FakeQueryClient(), chains=["ethereum", "base"], length=length
+    )
+    feed.events = {}
+    return feed
+
+
+def test_apply_keeps_latest_record_of_each_event():
+    feed = create_feed()
+
+    assert (
+        feed.apply(rows(("0xa", "ethereum", 1000, "A"), ("0xb", "base", 2000, "B")))
+        == 2
+    )
+    assert feed.apply(rows(("0xa", "ethereum", 3000, "A2"))) == 1
+    # Older records and unchanged records are not counted
+    assert feed.apply(rows(("0xa", "ethereum", 1000, "A"))) == 0
+    assert feed.apply(rows(("0xa", "ethereum", 3000, "A2"))) == 0
+
+    assert feed.events["0xa"]["record"] == {"name": "A2", "timestamp": 3}
+    assert feed.high_water_mark == 3000
+
+
+def test_apply_ignores_measures_missing_from_an_event():
+    feed = create_feed()
+    feed.apply(rows(("0xa", "ethereum", 1000, "A")))
+
+    # The record of 0xa is padded with the score measure of 0xb, which 0xa does not have
+    columns = rows(("0xa", "ethereum", 1000, "A"), ("0xb", "base", 2000, "B"))
+    columns["eventHash"].append("0xb")
+    columns["blockchain"].append("base")
+    columns["time_ms"].append("2000")
+    columns["measure_name"].append("score")
+    columns["measure_value::double"].append("0.5")
+    columns["measure_value::varchar"].append(None)
+
+    assert feed.apply(columns) == 1
+
+
+def test_apply_does_not_modify_columns():
+    feed = create_feed()
+    columns = rows(("0xa", "ethereum", 1000, "A"))
+    feed.apply(columns)
+
+    assert "key" not in columns
+    assert columns["time_ms"] == ["1000", "1000"]
+
+
+def test_apply_without_rows():
+    feed = create_feed()
+
+    assert feed.apply(rows()) == 0
+    assert feed.high_water_mark is None
+
+
+def test_render_orders_and_trims_feeds():
+    feed = create_feed(length=2)
+    feed.apply(
+        rows(
+            ("0xa", "ethereum", 1000, "A"),
+            ("0xb", "ethereum", 2000, "B"),
+            ("0xc", "ethereum", 3000, "C"),
+            ("0xd", "base", 500, "D"),
+        )
+    )
+
+    feeds = feed.render()
+
+    assert [record["name"] for record in feeds[ALL_CHAINS]] == ["C", "B"]
+    assert [record["name"] for record in feeds["ethereum"]] == ["C", "B"]
+    assert [record["name"] for record in feeds["base"]] == ["D"]
+    # Events which are in no feed are dropped
+    assert sorted(feed.events) == ["0xb", "0xc", "0xd"]
+
+
+def test_get_rebuilds_feed_from_state():
+    query_client = FakeQueryClient()
+    feed = create_feed(query_client)
+    feed.apply(rows(("0xa", "ethereum", 1000, "A"), ("0xb", "base", 2000, "B")))
+
+    feed.feeds_rao = FakeRAO()
+    feed.state_rao = FakeRAO({feed.STATE_KEY: {"events": feed.events}})
+
+    assert asyncio.run(feed.get("base")) == [{"name": "B", "timestamp": 2}]
+    assert query_client.queries == []
+
+
+def test_get_falls_back_to_timestream():
+    query_client = FakeQueryClient(
+        rows(("0xa", "ethereum", 1000, "A"), ("0xb", "base", 2000, "B"))
+    )
+    feed = create_feed(query_client)
+    feed.feeds_rao, feed.state_rao = FakeRAO(), FakeRAO()
+
+    assert [record["name"] for record in asyncio.run(feed.get(ALL_CHAINS))] == [
+        "B",
+        "A",
+    ]
+    assert query_client.queries == ["tokeneventslatest"]
+
+
+def test_get_returns_none_when_every_source_fails():
+    feed = create_feed(FakeQueryClient(None))
+    feed.feeds_rao, feed.state_rao = FakeRAO(), FakeRAO()
+
+    assert asyncio.run(feed.get(ALL_CHAINS)) is None
+
+
+def test_get_returns_materialised_feed():
+    query_client = FakeQueryClient()
+    feed = create_feed(query_client)
+    feed.feeds_rao = FakeRAO({"ethereum": [{"name": "A"}]})
+
+    assert asyncio.run(feed.get("ethereum")) == [{"name": "A"}]
+    assert query_client.queries == []
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+# The executor is built on web3's contract encoding and ABI codec
+web3 = pytest.importorskip("web3", exc_type=ImportError)
+
+from src.v1.shared.multicall import Multicall
+
+with open("src/v1/shared/files/erc20.json", "r") as f:
+    ERC20_ABI = json.load(f)
+
+TOKEN_ADDRESS = "0x" + "11" * 20
+HOLDER_ADDRESS = "0x" + "22" * 20
+
+# Used without a provider, only to encode and decode ABI values
+W3 = web3.Web3()
+
+
+class FakeAggregate3:
+    def __init__(self, contract, calls):
+        self.contract = contract
+        self.calls = calls
+
+    def call(self):
+        self.contract.batches.append(self.calls)
+        return [self.contract.responses.pop(0) for _ in self.calls]
+
+
+class FakeMulticall3:
+    """
+    Multicall3 contract which answers `aggregate3` with the (success, return data) responses given, in order.
+    """
+
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.batches = []
+        self.functions = self
+
+    def aggregate3(self, calls):
+        return FakeAggregate3(self, calls)
+
+
+def create_multicall(responses, batch_size=2):
+    multicall = Multicall(W3, "ethereum", batch_size=batch_size)
+    multicall.contract = FakeMulticall3(responses)
+
+    token = W3.eth.contract(
+        address=web3.Web3.to_checksum_address(TOKEN_ADDRESS), abi=ERC20_ABI
+    )
+    return multicall, token
+
+
+def test_results_are_decoded_in_order_across_batches():
+    multicall, token = create_multicall(
+        [
+            (True, W3.codec.encode(["uint8"], [18])),
+            (True, W3.codec.encode(["string"], ["RUG"])),
+            (True, W3.codec.encode(["uint256"], [10**24])),
+        ]
+    )
+
+    decimals = multicall.add(token, "decimals", [])
+    symbol = multicall.add(token, "symbol", [])
+    balance = multicall.add(
+        token, "balanceOf", [web3.Web3.to_checksum_address(HOLDER_ADDRESS)]
+    )
+    results = multicall.execute()
+
+    assert (decimals, symbol, balance) == (0, 1, 2)
+    assert results == [(18,), ("RUG",), (10**24,)]
+    assert [len(batch) for batch in multicall.contract.batches] == [2, 1]
+    assert all(
+        allow_failure
+        for batch in multicall.contract.batches
+        for _, allow_failure, _ in batch
+    )
+    assert len(multicall) == 0
+
+
+def test_failed_and_undecodable_calls_return_none():
+    multicall, token = create_multicall(
+        [
+            (False, b""),
+            (True, b""),
+            (True, b"\x01"),
+            (True, W3.codec.encode(["uint8"], [6])),
+        ],
+        batch_size=10,
+    )
+
+    for _ in range(4):
+        multicall.add(token, "decimals", [])
+
+    assert multicall.execute() == [None, None, None, (6,)]
@@ -0,0 +1,110 @@
+import asyncio, time, uuid
+
+import pytest
+
+from src.v1.shared.rate_limiter import (
+    TokenBucket,
+    RateLimiter,
+    UpstreamRateLimiter,
+    PRIORITY_USER,
+    PRIORITY_BACKGROUND,
+    REQUEST_PRIORITY,
+)
+
+
+def test_bucket_starts_full():
+    bucket = TokenBucket(rate=1, burst=3)
+
+    assert [bucket.try_take() for _ in range(3)] == [0, 0, 0]
+    assert bucket.try_take() > 0
+
+
+def test_bucket_refills_at_rate():
+    bucket = TokenBucket(rate=100, burst=1)
+    bucket.try_take()
+
+    assert bucket.time_until_token() == pytest.approx(0.01, abs=0.005)
+    time.sleep(0.02)
+    assert bucket.try_take() == 0
+
+
+def test_bucket_never_holds_more_than_burst():
+    bucket = TokenBucket(rate=1000, burst=2)
+    time.sleep(0.01)
+
+    assert [bucket.try_take() for _ in range(3)][-1] > 0
+
+
+def test_blocked_bucket_hands_out_no_tokens():
+    bucket = TokenBucket(rate=1000, burst=10)
+    bucket.block_for(0.05)
+
+    assert bucket.try_take() == pytest.approx(0.05, abs=0.01)
+
+
+def test_waiters_are_released_by_priority():
+    async def run():
+        limiter = RateLimiter("test", f"ratelimit_test_{uuid.uuid4().hex}", 50, 1)
+        await limiter.acquire()
+
+        order = []
+
+        async def acquire(priority, i):
+            await limiter.acquire(priority)
+            order.append((priority, i))
+
+        await asyncio.gather(
+            *[
+                acquire(PRIORITY_BACKGROUND if i % 2 else PRIORITY_USER, i)
+                for i in range(6)
+            ]
+        )
+        return order
+
+    assert asyncio.run(run()) == [
+        (PRIORITY_USER, 0),
+        (PRIORITY_USER, 2),
+        (PRIORITY_USER, 4),
+        (PRIORITY_BACKGROUND, 1),
+        (PRIORITY_BACKGROUND, 3),
+        (PRIORITY_BACKGROUND, 5),
+    ]
+
+
+def test_priority_defaults_to_context():
+    async def run():
+        limiter = RateLimiter("test", f"ratelimit_test_{uuid.uuid4().hex}", 50, 1)
+        await limiter.acquire()
+
+        order = []
+
+        async def background():
+            REQUEST_PRIORITY.set(PRIORITY_BACKGROUND)
+            await limiter.acquire()
+            order.append("background")
+
+        async def user():
+            await asyncio.sleep(0)
+            await limiter.acquire()
+            order.append("user")
+
+        await asyncio.gather(background(), user())
+        return order
+
+    assert asyncio.run(run()) == ["user", "background"]
+
+
+def test_buckets_per_api_key():
+    limiter = UpstreamRateLimiter("test", rate=1, burst=1)
+
+    assert limiter["a"] is limiter["a"]
+    assert limiter["a"] is not limiter["b"]
+    # API keys are secrets and are not stored in Redis keys
+    assert "SECRETKEY" not in limiter["SECRETKEY"].bucket.key
+
+
+def test_single_bucket_per_provider():
+    limiter = UpstreamRateLimiter("test", rate=1, burst=1, per_api_key=False)
+
+    assert limiter["a"] is limiter["b"]
+    assert limiter.status()["apiKeys"] == 1
@@ -0,0 +1,50 @@
+from src.v1.shared.redis_client import CircuitBreaker
+
+
+def test_circuit_opens_after_consecutive_failures():
+    breaker = CircuitBreaker("test", failure_threshold=3, cooldown=60)
+
+    for _ in range(2):
+        breaker.record_failure()
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_success_resets_failure_count():
+    breaker = CircuitBreaker("test", failure_threshold=2, cooldown=60)
+
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_single_trial_call_after_cooldown():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_failed_trial_call_reopens_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+
+
+def test_successful_trial_call_closes_circuit():
+    breaker = CircuitBreaker("test", failure_threshold=1, cooldown=0)
+    breaker.record_failure()
+    breaker.allow()
+
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.status()["consecutiveFailures"] == 0
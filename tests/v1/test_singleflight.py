@@ -0,0 +1,159 @@
+import asyncio, uuid
+
+
+from src.v1.shared.singleflight import SingleFlight
+
+
+def create_flight():
+    return SingleFlight(f"test_{uuid.uuid4().hex}", wait_timeout=1, poll_interval=0.01)
+
+
+def test_concurrent_callers_share_one_computation():
+    calls = []
+
+    async def run():
+        flight = create_flight()
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.05)
+            return "value"
+
+        results = await asyncio.gather(*[flight.do("key", compute) for _ in range(5)])
+        return results, flight.in_flight
+
+    results, in_flight = asyncio.run(run())
+    assert results == ["value"] * 5
+    assert len(calls) == 1
+    assert in_flight == {}
+
+
+def test_different_keys_are_computed_separately():
+    async def run():
+        flight = create_flight()
+
+        async def compute(key):
+            await asyncio.sleep(0.01)
+            return key
+
+        return await asyncio.gather(
+            flight.do("a", lambda: compute("a")), flight.do("b", lambda: compute("b"))
+        )
+
+    assert asyncio.run(run()) == ["a", "b"]
+
+
+def test_exception_is_raised_in_every_caller():
+    async def run():
+        flight = create_flight()
+
+        async def compute():
+            await asyncio.sleep(0.01)
+            raise RuntimeError("failed")
+
+        return await asyncio.gather(
+            *[flight.do("key", compute) for _ in range(3)], return_exceptions=True
+        )
+
+    assert all(isinstance(result, RuntimeError) for result in asyncio.run(run()))
+
+
+def test_cancelled_caller_does_not_cancel_computation():
+    async def run():
+        flight = create_flight()
+
+        async def compute():
+            await asyncio.sleep(0.05)
+            return "value"
+
+        cancelled = asyncio.ensure_future(flight.do("key", compute))
+        other = asyncio.ensure_future(flight.do("key", compute))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        return await other
+
+    assert asyncio.run(run()) == "value"
+
+
+def test_refresh_runs_in_background_once():
+    calls = []
+
+    async def run():
+        flight = create_flight()
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+
+        flight.refresh("key", compute)
+        flight.refresh("key", compute)
+        await asyncio.gather(*flight.refreshing.values())
+
+    asyncio.run(run())
+    assert len(calls) == 1
+
+
+def test_fresh_value_is_served_from_cache():
+    calls = []
+
+    async def run():
+        flight = create_flight()
+
+        async def find():
+            return "cached", False
+
+        async def compute():
+            calls.append(1)
+            return "computed"
+
+        value = await flight.stale_while_revalidate("key", find, compute)
+        return value, dict(flight.refreshing)
+
+    assert asyncio.run(run()) == ("cached", {})
+    assert calls == []
+
+
+def test_stale_value_is_served_and_refreshed_in_background():
+    calls = []
+
+    async def run():
+        flight = create_flight()
+
+        async def find():
+            return "stale", True
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "computed"
+
+        values = [
+            await flight.stale_while_revalidate("key", find, compute) for _ in range(3)
+        ]
+        await asyncio.gather(*flight.refreshing.values())
+        return values
+
+    assert asyncio.run(run()) == ["stale"] * 3
+    assert len(calls) == 1
+
+
+def test_missing_value_is_computed_once():
+    calls = []
+
+    async def run():
+        flight = create_flight()
+
+        async def find():
+            return None
+
+        async def compute():
+            calls.append(1)
+            await asyncio.sleep(0.02)
+            return "computed"
+
+        return await asyncio.gather(
+            *[flight.stale_while_revalidate("key", find, compute) for _ in range(3)]
+        )
+
+    assert asyncio.run(run()) == ["computed"] * 3
+    assert len(calls) == 1
@@ -0,0 +1,132 @@
+import pytest
+
+from src.v1.shared.timestream import (
+    MEASURE_COLUMNS,
+    query_columns,
+    coalesce,
+    group_measures,
+    pivot_measures,
+)
+
+COLUMN_INFO = [
+    {"Name": "eventHash", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "count", "Type": {"ScalarType": "BIGINT"}},
+    {"Name": "measure_name", "Type": {"ScalarType": "VARCHAR"}},
+    {"Name": "measure_value::double", "Type": {"ScalarType": "DOUBLE"}},
+    {"Name": "measure_value::varchar", "Type": {"ScalarType": "VARCHAR"}},
+]
+
+
+def row(*values):
+    return {
+        "Data": [
+            {"NullValue": True} if value is None else {"ScalarValue": value}
+            for value in values
+        ]
+    }
+
+
+class FakeQueryClient:
+    """Serves pre-built pages in place of the `timestream-query` client."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.calls = []
+
+    def query(self, QueryString, NextToken=None):
+        self.calls.append(NextToken)
+        return self.pages[int(NextToken) if NextToken else 0]
+
+
+def create_client():
+    return FakeQueryClient(
+        [
+            {
+                "ColumnInfo": COLUMN_INFO,
+                "Rows": [
+                    row("0xa", "1", "name", None, "Token A"),
+                    row("0xa", "1", "timestamp", "100.0", None),
+                ],
+                "NextToken": "1",
+            },
+            # Pages without rows are returned whilst the query is still running
+            {"ColumnInfo": COLUMN_INFO, "Rows": [], "NextToken": "2"},
+            {
+                "ColumnInfo": COLUMN_INFO,
+                "Rows": [row("0xb", None, "name", None, "Token B")],
+                "QueryStatus": {"CumulativeBytesScanned": 1024},
+            },
+        ]
+    )
+
+
+def test_query_columns_follows_every_page():
+    client = create_client()
+    status = {}
+    columns = query_columns(client, "SELECT", status=status)
+
+    assert client.calls == [None, "1", "2"]
+    assert columns["eventHash"] == ["0xa", "0xa", "0xb"]
+    assert status["CumulativeBytesScanned"] == 1024
+
+
+def test_query_columns_converts_types_and_keeps_nulls():
+    columns = query_columns(create_client(), "SELECT")
+
+    assert columns["count"] == [1, 1, None]
+    assert columns["measure_value::double"] == [None, 100.0, None]
+    assert columns["measure_value::varchar"] == ["Token A", None, "Token B"]
+
+
+def test_query_columns_untyped():
+    columns = query_columns(create_client(), "SELECT", typed=False)
+
+    assert columns["count"] == ["1", "1", None]
+    assert columns["measure_value::double"] == [None, "100.0", None]
+
+
+def test_query_columns_selects_columns():
+    columns = query_columns(create_client(), "SELECT", columns=["eventHash"])
+    assert list(columns) == ["eventHash"]
+
+    with pytest.raises(KeyError):
+        query_columns(create_client(), "SELECT", columns=["missing"])
+
+
+def test_coalesce():
+    assert coalesce([None, 1, None], [2, 3, None]) == [2, 1, None]
+    assert coalesce([1, None]) == [1, None]
+
+
+def test_group_measures():
+    columns = query_columns(
+        create_client(), "SELECT", columns=["eventHash", *MEASURE_COLUMNS]
+    )
+    grouped = group_measures(columns, index="eventHash", converters={"timestamp": int})
+
+    assert grouped == {
+        "0xa": {"name": "Token A", "timestamp": 100},
+        # Measures missing for an index value are set to None
+        "0xb": {"name": "Token B", "timestamp": None},
+    }
+
+
+def test_group_measures_keeps_last_value():
+    columns = {
+        "eventHash": ["0xa", "0xa"],
+        "measure_name": ["name", "name"],
+        "measure_value::varchar": ["Old", "New"],
+    }
+
+    assert group_measures(columns, index="eventHash") == {"0xa": {"name": "New"}}
+
+
+def test_pivot_measures_is_sorted_by_index():
+    columns = {
+        "eventHash": ["0xb", "0xa"],
+        "measure_name": ["name", "name"],
+        "measure_value::double": [None, None],
+        "measure_value::varchar": ["B", "A"],
+    }
+
+    assert pivot_measures(columns, index="eventHash") == [{"name": "A"}, {"name": "B"}]
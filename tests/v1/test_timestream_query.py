@@ -0,0 +1,72 @@
+import pytest
+
+from src.v1.shared.timestream_query import (
+    QueryTemplate,
+    render_literal,
+    normalise_query,
+)
+
+
+def test_render_scalars():
+    assert render_literal(42) == "42"
+    assert render_literal(True) == "true"
+    assert render_literal(False) == "false"
+    assert render_literal(0.5) == "0.5"
+
+
+def test_render_strings_escapes_quotes():
+    assert render_literal("ethereum") == "'ethereum'"
+    assert render_literal("it's") == "'it''s'"
+    assert render_literal("' OR '1'='1") == "''' OR ''1''=''1'"
+
+
+def test_render_lists_sorted_and_unique():
+    assert render_literal(["0xb", "0xa", "0xb"]) == "'0xa', '0xb'"
+    assert render_literal((2, 1)) == "1, 2"
+
+
+def test_render_rejects_empty_lists_and_other_types():
+    with pytest.raises(ValueError):
+        render_literal([])
+
+    with pytest.raises(ValueError):
+        render_literal(None)
+
+    with pytest.raises(ValueError):
+        render_literal({"key": "value"})
+
+
+def test_template_is_normalised():
+    assert normalise_query("  SELECT *\n    FROM t  ") == "SELECT * FROM t"
+
+    template = QueryTemplate(
+        "test",
+        """
+        SELECT *
+        FROM t
+        WHERE name = {name} AND id IN ({ids})
+        """,
+    )
+
+    # Whitespace inside the rendered literals is kept
+    assert (
+        template.render(name="a  b", ids=[2, 1])
+        == "SELECT * FROM t WHERE name = 'a  b' AND id IN (1, 2)"
+    )
+
+
+def test_equivalent_parameters_share_a_key():
+    template = QueryTemplate("test", "SELECT * FROM t WHERE id IN ({ids})")
+
+    first = template.render(ids=["0xb", "0xa"])
+    second = template.render(ids=["0xa", "0xb", "0xa"])
+
+    assert first == second
+    assert template.generate_key(first) == template.generate_key(second)
+    assert template.generate_key(first) != template.generate_key(first, columns=["id"])
+    assert template.generate_key(first) != template.generate_key(first, typed=False)
+
+
+def test_template_cache():
+    assert QueryTemplate("test", "SELECT 1").rao is None
+    assert QueryTemplate("test", "SELECT 1", ttl=60).rao.tte == 60
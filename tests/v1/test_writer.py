@@ -0,0 +1,117 @@
+import asyncio
+
+import pytest
+from botocore.exceptions import ClientError
+
+from src.v1.feeds.exceptions import TimestreamWriteException
+from src.v1.feeds.writer import TimestreamBatchWriter
+
+
+def client_error(code):
+    return ClientError({"Error": {"Code": code, "Message": code}}, "WriteRecords")
+
+
+class FakeClient:
+    def __init__(self, errors=None):
+        self.errors = list(errors or [])
+        self.calls = []
+
+    def write_records(self, DatabaseName, TableName, Records):
+        self.calls.append((TableName, len(Records)))
+        if self.errors:
+            raise self.errors.pop(0)
+        return {"ResponseMetadata": {"HTTPStatusCode": 200}}
+
+
+class FakeAdapter:
+    def __init__(self, errors=None):
+        self.database = "test"
+        self.client = FakeClient(errors)
+        self.posted = []
+
+    def generate_records(self, table_name, data):
+        return [{"MeasureName": "user_id", "MeasureValue": data.get("user_id")}]
+
+    def post(self, table_name, message):
+        self.posted.append((table_name, message))
+
+
+def create_writer(adapter, **kwargs):
+    return TimestreamBatchWriter(
+        adapter,
+        **{
+            "batch_size": 2,
+            "flush_interval": 0.01,
+            "max_retries": 2,
+            "retry_backoff": 0,
+            **kwargs,
+        },
+    )
+
+
+def test_records_are_written_in_batches_per_table():
+    adapter = FakeAdapter()
+
+    async def run():
+        writer = create_writer(adapter)
+        writer.start()
+        for i in range(5):
+            await writer.post("eventlogs", {"user_id": f"user{i}"})
+        await writer.post("reviewlogs", {"user_id": "user"})
+        await writer.stop()
+
+    asyncio.run(run())
+    assert sorted(adapter.client.calls) == [
+        ("eventlogs", 1),
+        ("eventlogs", 2),
+        ("eventlogs", 2),
+        ("reviewlogs", 1),
+    ]
+
+
+def test_records_are_written_directly_before_start():
+    adapter = FakeAdapter()
+    asyncio.run(create_writer(adapter).post("eventlogs", {"user_id": "user"}))
+
+    assert adapter.posted == [("eventlogs", {"user_id": "user"})]
+
+
+def test_throttled_batch_is_retried():
+    adapter = FakeAdapter(
+        errors=[
+            client_error("ThrottlingException"),
+            client_error("ThrottlingException"),
+        ]
+    )
+    asyncio.run(create_writer(adapter).write_batch("eventlogs", [{}, {}]))
+
+    assert adapter.client.calls == [("eventlogs", 2)] * 3
+
+
+def test_batch_is_dropped_after_the_last_retry():
+    adapter = FakeAdapter(errors=[client_error("ThrottlingException")] * 5)
+    asyncio.run(create_writer(adapter).write_batch("eventlogs", [{}]))
+
+    assert len(adapter.client.calls) == 3
+
+
+def test_invalid_batch_is_not_retried():
+    adapter = FakeAdapter(errors=[client_error("ValidationException")])
+    asyncio.run(create_writer(adapter).write_batch("eventlogs", [{}]))
+
+    assert len(adapter.client.calls) == 1
+
+
+def test_post_waits_for_space_then_raises_when_queue_is_full():
+    async def run():
+        writer = create_writer(FakeAdapter(), max_queue_size=1, enqueue_timeout=0.01)
+        # The queue is not drained, as if Timestream were unavailable
+        writer.queue = asyncio.Queue(maxsize=writer.max_queue_size)
+
+        await writer.post("eventlogs", {"user_id": "first"})
+        with pytest.raises(TimestreamWriteException):
+            await writer.post("eventlogs", {"user_id": "second"})
+
+        return writer.status()
+
+    assert asyncio.run(run())["queueDepth"] == 1